@@ -21,6 +21,26 @@ class Settings(BaseSettings):
     min_confidence_r_squared: float = 0.65
     low_confidence_scenario_policy: Literal["hold", "block"] = "hold"
 
+    bootstrap_samples: int = 200
+    bootstrap_block_days: int = 7
+    bootstrap_time_budget_seconds: float = 2.0
+    bootstrap_workers: Optional[int] = None
+    backtest_workers: Optional[int] = None
+    refit_worker_enabled: bool = True
+    refit_poll_seconds: float = 30.0
+    refit_max_attempts: int = 5
+    refit_retry_backoff_seconds: float = 60.0
+    refit_lease_seconds: float = 600.0
+    job_workers: int = 2
+    job_poll_seconds: float = 2.0
+    job_max_attempts: int = 3
+    job_retry_backoff_seconds: float = 5.0
+    job_lease_seconds: float = 60.0
+
+    metrics_enabled: bool = True
+    server_timing_enabled: bool = False
+    log_request_timings: bool = False
+
     require_api_key: bool = False
     app_api_key: Optional[str] = None
     google_ads_max_sync_days: int = 93
@@ -30,6 +50,13 @@ class Settings(BaseSettings):
     google_ads_client_secret: Optional[str] = None
     google_ads_refresh_token: Optional[str] = None
     google_ads_login_customer_id: Optional[str] = None
+    google_ads_mock_channels: int = 2
+    google_ads_mock_campaigns_per_channel: int = 0
+    google_ads_mock_latency_ms: float = 0.0
+    google_ads_mock_error_rate: float = 0.0
+    google_ads_cache_dir: Optional[str] = None
+    google_ads_cache_recent_days: int = 3
+    google_ads_cache_recent_ttl_seconds: int = 3600
 
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -1,12 +1,29 @@
+import json
+import logging
 import secrets
+import time
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 
 from app.config import get_settings
-from app.routers import analysis, import_data, google_ads, scenarios
+from app.routers import analysis, backtest, import_data, google_ads, jobs, scenarios, what_if
+from app.services.backtest import shutdown_backtest_pool
+from app.services.bootstrap import shutdown_bootstrap_pool
 from app.services.database import init_db
+from app.services.jobs import JOB_POOL, requeue_interrupted_jobs
+from app.services.metrics import (
+    DB_ROUND_TRIPS,
+    HTTP_REQUEST_DURATION,
+    REGISTRY,
+    start_db_round_trip_count,
+    stop_db_round_trip_count,
+)
+from app.services.refit_worker import REFIT_WORKER
+from app.services.timing import start_request_timings, stop_request_timings
+
+timing_logger = logging.getLogger("app.timing")
 
 app = FastAPI(
     title="Marginal Efficiency Radar API",
@@ -17,6 +34,19 @@ app = FastAPI(
 @app.on_event("startup")
 async def startup():
     init_db()
+    settings = get_settings()
+    if settings.refit_worker_enabled:
+        REFIT_WORKER.start()
+    if settings.job_workers > 0:
+        requeue_interrupted_jobs()
+        JOB_POOL.start(settings.job_workers)
+
+@app.on_event("shutdown")
+async def shutdown():
+    JOB_POOL.stop()
+    REFIT_WORKER.stop()
+    shutdown_bootstrap_pool()
+    shutdown_backtest_pool()
 
 @app.middleware("http")
 async def optional_api_key_guard(request: Request, call_next):
@@ -43,18 +73,85 @@ async def optional_api_key_guard(request: Request, call_next):
 
     return await call_next(request)
 
+@app.middleware("http")
+async def request_timing(request: Request, call_next):
+    settings = get_settings()
+    if not (settings.server_timing_enabled or settings.log_request_timings):
+        return await call_next(request)
+
+    timings, token = start_request_timings()
+    try:
+        response = await call_next(request)
+    finally:
+        stop_request_timings(token)
+
+    if settings.server_timing_enabled:
+        response.headers["Server-Timing"] = timings.server_timing_header()
+    if settings.log_request_timings:
+        timing_logger.info(
+            json.dumps(
+                {
+                    "event": "request_timing",
+                    "method": request.method,
+                    "path": request.url.path,
+                    "status_code": response.status_code,
+                    "total_ms": round(timings.elapsed() * 1000, 3),
+                    "spans": timings.as_dict(),
+                }
+            )
+        )
+    return response
+
+@app.middleware("http")
+async def request_metrics(request: Request, call_next):
+    settings = get_settings()
+    if not settings.metrics_enabled or request.url.path == "/metrics":
+        return await call_next(request)
+
+    started = time.perf_counter()
+    round_trips, token = start_db_round_trip_count()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+    finally:
+        stop_db_round_trip_count(token)
+        # Label by route template, not raw path, to keep series cardinality bounded.
+        route = request.scope.get("route")
+        route_label = getattr(route, "path", "unmatched")
+        HTTP_REQUEST_DURATION.observe(
+            time.perf_counter() - started,
+            method=request.method,
+            route=route_label,
+            status=str(status_code),
+        )
+        DB_ROUND_TRIPS.observe(round_trips.count, route=route_label)
+    return response
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:3000"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "ETag"],
 )
 
 app.include_router(analysis.router)
 app.include_router(import_data.router)
 app.include_router(google_ads.router)
 app.include_router(scenarios.router)
+app.include_router(what_if.router)
+app.include_router(backtest.router)
+app.include_router(jobs.router)
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return PlainTextResponse(
+        REGISTRY.render(),
+        media_type="text/plain; version=0.0.4",
+    )
 
 
 @app.get("/")
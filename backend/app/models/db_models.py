@@ -1,5 +1,4 @@
-from sqlalchemy import Column, String, Numeric, Date, DateTime, Integer, ForeignKey, UniqueConstraint, JSON
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, Text, Numeric, Float, Date, DateTime, Integer, Boolean, ForeignKey, Index, UniqueConstraint, JSON, Uuid
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.sql import func
 import uuid
@@ -10,8 +9,10 @@ Base = declarative_base()
 class Account(Base):
     __tablename__ = "accounts"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(String, nullable=False)
+    # Bumped by ingest and background refits, never by an analysis saving its own fit.
+    model_generation = Column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
@@ -19,8 +20,8 @@ class Account(Base):
 class DailyMetric(Base):
     __tablename__ = "daily_metrics"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    account_id = Column(UUID(as_uuid=True), ForeignKey("accounts.id"), nullable=False, index=True)
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    account_id = Column(Uuid(as_uuid=True), ForeignKey("accounts.id"), nullable=False, index=True)
     date = Column(Date, nullable=False, index=True)
     channel_name = Column(String, nullable=False)
     spend = Column(Numeric(10, 2), nullable=False)
@@ -36,14 +37,26 @@ class DailyMetric(Base):
 class MMMModel(Base):
     __tablename__ = "mmm_models"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    account_id = Column(UUID(as_uuid=True), ForeignKey("accounts.id"), nullable=False, index=True)
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    account_id = Column(Uuid(as_uuid=True), ForeignKey("accounts.id"), nullable=False, index=True)
     channel_name = Column(String, nullable=False)
     alpha = Column(Numeric(10, 4), nullable=False)
     beta = Column(Numeric(10, 4), nullable=False)
     kappa = Column(Numeric(10, 2), nullable=False)
     max_yield = Column(Numeric(10, 2), nullable=False)
     r_squared = Column(Numeric(10, 4), nullable=False)
+    # End-of-history adstock at `alpha`, kept current as days are ingested.
+    adstock_state = Column(Float, nullable=True)
+    adstock_prior_state = Column(Float, nullable=True)
+    adstock_last_date = Column(Date, nullable=True)
+    # Covariance of (max_yield, beta, kappa) from the fit, as nested lists.
+    covariance = Column(JSON, nullable=True)
+    # Set when ingestion changes the channel's data; cleared by a refit.
+    refit_requested_at = Column(DateTime(timezone=True), nullable=True)
+    # Refit worker attempts on the current mark; `refit_retry_after` holds
+    # the mark while a worker fits it and backs off after a failed attempt.
+    refit_attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    refit_retry_after = Column(DateTime(timezone=True), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
@@ -52,12 +65,58 @@ class MMMModel(Base):
     )
 
 
+class ChannelRefitRequest(Base):
+    """Refit marker for a channel whose data changed before it had a stored model."""
+
+    __tablename__ = "channel_refit_requests"
+
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    account_id = Column(Uuid(as_uuid=True), ForeignKey("accounts.id"), nullable=False, index=True)
+    channel_name = Column(String, nullable=False)
+    requested_at = Column(DateTime(timezone=True), nullable=False)
+    # Same claim and backoff bookkeeping as `MMMModel.refit_attempts`.
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    retry_after = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        UniqueConstraint('account_id', 'channel_name', name='uix_channel_refit_request_account_channel'),
+    )
+
+
 class Scenario(Base):
     __tablename__ = "scenarios"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    account_id = Column(UUID(as_uuid=True), ForeignKey("accounts.id"), nullable=False, index=True)
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    account_id = Column(Uuid(as_uuid=True), ForeignKey("accounts.id"), nullable=False, index=True)
     name = Column(String, nullable=False)
     budget_allocation = Column(JSON, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class Job(Base):
+    __tablename__ = "jobs"
+
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    kind = Column(String, nullable=False)
+    # queued -> running -> succeeded | failed | cancelled (running -> queued on retry)
+    status = Column(String, nullable=False, default="queued")
+    priority = Column(Integer, nullable=False, default=0)
+    account_id = Column(Uuid(as_uuid=True), nullable=True, index=True)
+    payload = Column(JSON, nullable=False)
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=1)
+    cancel_requested = Column(Boolean, nullable=False, default=False)
+    # Worker running the job; its lease is renewed while the handler runs.
+    claimed_by = Column(String, nullable=True)
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)
+    run_after = Column(DateTime(timezone=True), nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("idx_jobs_queue", "status", "priority", "run_after"),
+    )
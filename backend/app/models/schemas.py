@@ -1,7 +1,7 @@
 from datetime import date, datetime
 from typing import Any, Literal, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
 DataQualityState = Literal["ok", "low_confidence", "insufficient_history"]
 
@@ -24,6 +24,8 @@ class CurvePoint(BaseModel):
     spend: float
     marginal_cpa: float
     zone: Literal["green", "yellow", "red"]
+    marginal_cpa_lower: Optional[float] = None
+    marginal_cpa_upper: Optional[float] = None
 
 
 class CurrentPoint(BaseModel):
@@ -35,6 +37,8 @@ class MarginalCpaResult(BaseModel):
     channel_name: str
     current_spend: float
     marginal_cpa: Optional[float]
+    marginal_cpa_lower: Optional[float] = None
+    marginal_cpa_upper: Optional[float] = None
     target_cpa: float
     effective_target_cpa: Optional[float] = None
     target_source: Optional[Literal["default", "override"]] = None
@@ -42,6 +46,9 @@ class MarginalCpaResult(BaseModel):
     recommendation: str
     data_quality_state: DataQualityState = "ok"
     data_quality_reason: Optional[str] = None
+    uncertainty_method: Optional[Literal["covariance", "bootstrap"]] = None
+    bootstrap_samples: Optional[int] = None
+    bootstrap_timed_out: Optional[bool] = None
     model_params: Optional[HillParameters]
     curve_points: list[CurvePoint] = Field(default_factory=list)
     current_point: Optional[CurrentPoint] = None
@@ -51,6 +58,8 @@ class FitModelRequest(BaseModel):
     account_id: str
     channel_name: str
     target_cpa: float = 50.0
+    curve_max_points: Optional[int] = Field(default=None, ge=8, le=500)
+    uncertainty_method: Literal["covariance", "bootstrap"] = "covariance"
 
 
 class FitModelResponse(BaseModel):
@@ -69,10 +78,48 @@ class ChannelAnalysisRequest(BaseModel):
     account_id: str
     target_cpa: float = 50.0
     target_cpa_overrides: list[TargetCpaOverride] = Field(default_factory=list)
+    curve_max_points: Optional[int] = Field(default=None, ge=8, le=500)
+    uncertainty_method: Literal["covariance", "bootstrap"] = "covariance"
+    freshness: Literal["fresh", "stale_while_revalidate"] = "fresh"
 
 
 class ChannelAnalysisResponse(BaseModel):
     channels: list[MarginalCpaResult]
+    data_fingerprint: Optional[str] = None
+    computed_at: Optional[datetime] = None
+    age_seconds: Optional[float] = None
+    # Served from an earlier analysis whose data fingerprint no longer matches.
+    stale: bool = False
+    revalidating: bool = False
+
+
+class RefitBacklogItem(BaseModel):
+    account_id: str
+    channel_name: str
+    requested_at: datetime
+    waiting_seconds: float
+
+
+class RefitBacklogResponse(BaseModel):
+    worker_running: bool
+    pending: int
+    channels: list[RefitBacklogItem]
+
+
+class JobResponse(BaseModel):
+    job_id: str
+    kind: str
+    status: Literal["queued", "running", "succeeded", "failed", "cancelled"]
+    priority: int
+    account_id: Optional[str] = None
+    attempts: int
+    max_attempts: int
+    cancel_requested: bool
+    error: Optional[str] = None
+    result: Optional[Any] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
 
 
 class AccountResponse(BaseModel):
@@ -80,12 +127,29 @@ class AccountResponse(BaseModel):
     name: str
 
 
+class ChannelSpendConstraint(BaseModel):
+    channel_name: str = Field(min_length=1)
+    min_spend: Optional[float] = Field(default=None, ge=0)
+    max_spend: Optional[float] = Field(default=None, ge=0)
+    # Largest allowed move away from current spend, in percent.
+    max_change_percent: Optional[float] = Field(default=None, ge=0)
+
+    @model_validator(mode="after")
+    def validate_spend_range(self):
+        if self.min_spend is not None and self.max_spend is not None and self.min_spend > self.max_spend:
+            raise ValueError("min_spend must not exceed max_spend")
+        return self
+
+
 class ScenarioRecommendationRequest(BaseModel):
     account_id: str
     target_cpa: float = 50.0
     budget_delta_percent: float = 0.0
     locked_channels: list[str] = Field(default_factory=list)
     target_cpa_overrides: list[TargetCpaOverride] = Field(default_factory=list)
+    allocation_mode: Literal["greedy", "greedy_legacy", "optimal"] = "greedy"
+    channel_constraints: list[ChannelSpendConstraint] = Field(default_factory=list)
+    horizon_weeks: Optional[int] = Field(default=None, ge=1, le=26)
 
 
 class ScenarioChannelRecommendation(BaseModel):
@@ -98,6 +162,9 @@ class ScenarioChannelRecommendation(BaseModel):
     spend_delta_percent: float
     current_marginal_cpa: Optional[float]
     projected_marginal_cpa: Optional[float]
+    current_conversions: Optional[float] = None
+    projected_conversions: Optional[float] = None
+    projected_cpa: Optional[float] = None
     traffic_light: Literal["green", "yellow", "red", "grey"]
     locked: bool = False
     data_quality_state: DataQualityState = "ok"
@@ -116,12 +183,126 @@ class ScenarioProjectedSummary(BaseModel):
     channels_maintain: int
     channels_locked: int
     channels_insufficient_data: int
+    # Model-based totals over channels with a fitted curve.
+    current_conversions: Optional[float] = None
+    projected_conversions: Optional[float] = None
+    conversions_delta: Optional[float] = None
+    current_cpa: Optional[float] = None
+    projected_cpa: Optional[float] = None
+
+
+class ScenarioWeekSummary(BaseModel):
+    week: int
+    spend: float
+    conversions: float
+    baseline_spend: float
+    baseline_conversions: float
+    incremental_conversions: float
+    cpa: Optional[float]
 
 
 class ScenarioRecommendationResponse(BaseModel):
     scenario_name: str
     recommendations: list[ScenarioChannelRecommendation]
     projected_summary: ScenarioProjectedSummary
+    weekly_projection: list[ScenarioWeekSummary] = Field(default_factory=list)
+
+
+class ScenarioSweepRange(BaseModel):
+    start: float
+    stop: float
+    step: float = Field(gt=0)
+
+
+class ScenarioSweepRequest(BaseModel):
+    account_id: str
+    target_cpa: float = 50.0
+    budget_delta_percents: list[float] = Field(default_factory=list)
+    budget_delta_range: Optional[ScenarioSweepRange] = None
+    locked_channels: list[str] = Field(default_factory=list)
+    target_cpa_overrides: list[TargetCpaOverride] = Field(default_factory=list)
+    allocation_mode: Literal["greedy", "greedy_legacy", "optimal"] = "optimal"
+    channel_constraints: list[ChannelSpendConstraint] = Field(default_factory=list)
+
+
+class ScenarioFrontierAllocation(BaseModel):
+    channel_name: str
+    recommended_spend: float
+    projected_conversions: Optional[float]
+    projected_marginal_cpa: Optional[float]
+
+
+class ScenarioFrontierPoint(BaseModel):
+    budget_delta_percent: float
+    total_spend: float
+    projected_conversions: float
+    projected_cpa: Optional[float]
+    allocations: list[ScenarioFrontierAllocation]
+
+
+class ScenarioSweepResponse(BaseModel):
+    current_total_spend: float
+    points: list[ScenarioFrontierPoint]
+
+
+class WhatIfRequest(BaseModel):
+    account_id: str
+    target_cpa: float = 50.0
+    # Channel name -> spend; channels left out are evaluated at current spend.
+    spends: dict[str, float] = Field(default_factory=dict)
+    target_cpa_overrides: list[TargetCpaOverride] = Field(default_factory=list)
+
+
+class WhatIfChannelResult(BaseModel):
+    channel_name: str
+    spend: float
+    current_spend: float
+    target_cpa: float
+    marginal_cpa: Optional[float]
+    traffic_light: Literal["green", "yellow", "red", "grey"]
+    projected_conversions: Optional[float]
+
+
+class WhatIfResponse(BaseModel):
+    channels: list[WhatIfChannelResult]
+    total_spend: float
+    projected_conversions: float
+    projected_cpa: Optional[float]
+    fitted_at: datetime
+
+
+class BacktestRequest(BaseModel):
+    account_id: str
+    channels: list[str] = Field(default_factory=list)
+    initial_train_days: int = Field(default=56, ge=21)
+    horizon_days: int = Field(default=7, ge=1, le=90)
+    step_days: Optional[int] = Field(default=None, ge=1)
+    max_windows: Optional[int] = Field(default=None, ge=1, le=500)
+
+
+class BacktestWindowResult(BaseModel):
+    train_days: int
+    test_days: int
+    alpha: float
+    in_sample_r_squared: float
+    actual_conversions: float
+    predicted_conversions: float
+    mae: float
+    wape: Optional[float]
+
+
+class ChannelBacktestResult(BaseModel):
+    channel_name: str
+    status: str
+    windows: list[BacktestWindowResult]
+    mae: Optional[float]
+    wape: Optional[float]
+    curve_fits: int
+
+
+class BacktestResponse(BaseModel):
+    account_id: str
+    channels: list[ChannelBacktestResult]
 
 
 class ScenarioCreateRequest(BaseModel):
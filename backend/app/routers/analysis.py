@@ -1,8 +1,13 @@
 from dataclasses import dataclass
+from datetime import datetime, timezone
+import logging
+import threading
+import time
 from typing import Literal
 
 import numpy as np
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Header, HTTPException, Response
+from fastapi.concurrency import run_in_threadpool
 
 from app.config import get_settings
 from app.models.schemas import (
@@ -13,25 +18,44 @@ from app.models.schemas import (
     MarginalCpaResult,
     HillParameters,
     AccountResponse,
+    RefitBacklogItem,
+    RefitBacklogResponse,
     TargetCpaOverride,
 )
+from app.routers.jobs import accept_background_job
 from app.services.hill_function import (
+    AdstockState,
     HillFitResult,
     fit_hill_model,
     calculate_marginal_cpa,
+    calculate_marginal_cpa_interval,
     generate_marginal_curve_points,
-    get_prior_adstock_state,
     get_traffic_light,
     get_recommendation,
     evaluate_data_quality,
 )
+from app.services.analysis_snapshots import ANALYSIS_SNAPSHOTS, AnalysisSnapshot
+from app.services.bootstrap import bootstrap_hill_fit
 from app.services.database import (
+    StoredChannelFit,
     fetch_daily_metrics,
     fetch_channels_for_account,
+    fetch_data_fingerprint,
+    fetch_refit_backlog,
+    fetch_stored_fits,
     get_current_spend,
     get_or_create_default_account,
     save_model_params,
 )
+from app.services.etags import etag_matches, make_etag, not_modified
+from app.services.fit_cache import FIT_CACHE, CachedChannelFit
+from app.services.jobs import register_job_handler
+from app.services.metrics import ANALYSIS_SINGLE_FLIGHT, HILL_FIT_DURATION, fit_outcome
+from app.services.refit_worker import REFIT_WORKER
+from app.services.single_flight import SingleFlight
+from app.services.timing import timing_span
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api", tags=["analysis"])
 
@@ -65,6 +89,39 @@ def _resolve_channel_target_cpa(
     return default_target_cpa, "default"
 
 
+# Fewer finished bootstrap draws than this fall back to the covariance band.
+MIN_BOOTSTRAP_DRAWS = 20
+
+
+def _resolve_uncertainty(
+    spend: np.ndarray,
+    conversions: np.ndarray,
+    fit_result: HillFitResult,
+    uncertainty_method: str,
+    time_budget_seconds: float | None = None,
+) -> tuple[np.ndarray | None, dict]:
+    """Return bootstrap draws (or None for covariance bands) and the result fields describing them."""
+    covariance_method = "covariance" if fit_result.covariance is not None else None
+    if uncertainty_method != "bootstrap":
+        return None, {"uncertainty_method": covariance_method}
+
+    with timing_span("bootstrap"):
+        bootstrap = bootstrap_hill_fit(
+            spend,
+            conversions,
+            fit_result,
+            time_budget_seconds=time_budget_seconds,
+        )
+    fields = {
+        "uncertainty_method": "bootstrap",
+        "bootstrap_samples": bootstrap.completed,
+        "bootstrap_timed_out": bootstrap.timed_out,
+    }
+    if bootstrap.completed < MIN_BOOTSTRAP_DRAWS:
+        return None, {**fields, "uncertainty_method": covariance_method}
+    return bootstrap.draws, fields
+
+
 @dataclass
 class ChannelComputation:
     result: MarginalCpaResult
@@ -78,21 +135,40 @@ def compute_channel_analysis(
     channel_name: str,
     target_cpa: float,
     target_source: Literal["default", "override"] = "default",
+    curve_max_points: int | None = None,
+    uncertainty_method: str = "covariance",
+    bootstrap_time_budget_seconds: float | None = None,
+    stored_fit: StoredChannelFit | None = None,
 ) -> ChannelComputation | None:
     """
     Shared channel analysis context for dashboard + scenario recommendation APIs.
+
+    A `stored_fit` that is current with the channel's data is used as is;
+    otherwise the channel is fitted and the fit saved.
     """
-    spend, conversions = fetch_daily_metrics(account_id, channel_name)
+    data_read_at = datetime.now(timezone.utc)
+    with timing_span("db_fetch"):
+        spend, conversions, last_date = fetch_daily_metrics(account_id, channel_name)
     if len(spend) == 0:
         return None
 
     settings = get_settings()
-    fit_result = fit_hill_model(spend, conversions)
+    if stored_fit is not None:
+        fit_result = stored_fit.fit_result
+    else:
+        fit_started = time.perf_counter()
+        with timing_span("hill_fit"):
+            fit_result = fit_hill_model(spend, conversions)
+        HILL_FIT_DURATION.observe(
+            time.perf_counter() - fit_started,
+            outcome=fit_outcome(fit_result.status if fit_result else None),
+        )
     data_quality = evaluate_data_quality(
         fit_result,
         min_confidence_r_squared=settings.min_confidence_r_squared,
     )
-    current_spend = get_current_spend(account_id, channel_name)
+    with timing_span("db_fetch"):
+        current_spend = get_current_spend(account_id, channel_name)
 
     if fit_result is None or fit_result.status != "success":
         total_conversions = float(conversions.sum())
@@ -126,31 +202,62 @@ def compute_channel_analysis(
         r_squared=fit_result.r_squared,
     )
 
-    save_model_params(account_id, channel_name, params)
+    if stored_fit is not None:
+        adstock = stored_fit.adstock
+    else:
+        with timing_span("db_save_params"):
+            adstock = save_model_params(
+                account_id,
+                channel_name,
+                params,
+                spend_history=spend,
+                covariance=fit_result.covariance,
+                data_read_at=data_read_at,
+                history_last_date=last_date,
+            )
 
-    prior_adstock_state = get_prior_adstock_state(
-        current_spend=current_spend,
-        alpha=fit_result.alpha,
-        spend_history=spend,
-    )
-    marginal_cpa = calculate_marginal_cpa(
-        current_spend,
+    band_draws, uncertainty_fields = _resolve_uncertainty(
+        spend,
+        conversions,
         fit_result,
-        prior_adstock_state=prior_adstock_state,
+        uncertainty_method,
+        time_budget_seconds=bootstrap_time_budget_seconds,
     )
+
+    with timing_span("marginal_cpa"):
+        if adstock is None:
+            adstock = AdstockState.from_history(fit_result.alpha, spend)
+        prior_adstock_state = adstock.prior_state
+        marginal_cpa = calculate_marginal_cpa(
+            current_spend,
+            fit_result,
+            prior_adstock_state=prior_adstock_state,
+        )
+        marginal_cpa_lower, marginal_cpa_upper = calculate_marginal_cpa_interval(
+            current_spend,
+            fit_result,
+            prior_adstock_state=prior_adstock_state,
+            draws=band_draws,
+        )
     traffic_light = get_traffic_light(marginal_cpa, target_cpa)
-    curve_points, current_point = generate_marginal_curve_points(
-        current_spend=current_spend,
-        params=fit_result,
-        target_cpa=target_cpa,
-        spend_history=spend,
-    )
+    with timing_span("curve_points"):
+        curve_points, current_point = generate_marginal_curve_points(
+            current_spend=current_spend,
+            params=fit_result,
+            target_cpa=target_cpa,
+            spend_history=spend,
+            max_points=curve_max_points,
+            band_draws=band_draws,
+            prior_adstock_state=prior_adstock_state,
+        )
 
     return ChannelComputation(
         result=MarginalCpaResult(
             channel_name=channel_name,
             current_spend=current_spend,
             marginal_cpa=marginal_cpa,
+            marginal_cpa_lower=marginal_cpa_lower,
+            marginal_cpa_upper=marginal_cpa_upper,
             target_cpa=target_cpa,
             effective_target_cpa=target_cpa,
             target_source=target_source,
@@ -158,6 +265,7 @@ def compute_channel_analysis(
             recommendation=get_recommendation(traffic_light),
             data_quality_state=data_quality.state,
             data_quality_reason=data_quality.reason,
+            **uncertainty_fields,
             model_params=params,
             curve_points=curve_points,
             current_point=current_point,
@@ -168,16 +276,147 @@ def compute_channel_analysis(
     )
 
 
+ANALYSIS_FLIGHTS = SingleFlight()
+
+
+def _analysis_request_key(
+    account_id: str,
+    target_cpa: float,
+    target_cpa_overrides: list[TargetCpaOverride] | None,
+    curve_max_points: int | None,
+    uncertainty_method: str,
+) -> tuple:
+    """Identity of an account analysis apart from its data: fit settings and request parameters."""
+    settings = get_settings()
+    fit_settings = (
+        settings.min_data_days,
+        settings.marginal_increment,
+        settings.alpha_min,
+        settings.alpha_max,
+        settings.alpha_step,
+        settings.beta_min,
+        settings.beta_max,
+        settings.max_yield_multiplier,
+        settings.min_confidence_r_squared,
+    )
+    if uncertainty_method == "bootstrap":
+        fit_settings += (
+            settings.bootstrap_samples,
+            settings.bootstrap_block_days,
+            settings.bootstrap_time_budget_seconds,
+        )
+    return (
+        str(account_id).strip().lower(),
+        fit_settings,
+        float(target_cpa),
+        tuple(sorted(_build_channel_target_overrides(target_cpa_overrides).items())),
+        curve_max_points,
+        uncertainty_method,
+    )
+
+
+def compute_account_analysis_snapshot(
+    account_id: str,
+    target_cpa: float,
+    target_cpa_overrides: list[TargetCpaOverride] | None = None,
+    curve_max_points: int | None = None,
+    uncertainty_method: str = "covariance",
+    data_fingerprint: str | None = None,
+) -> AnalysisSnapshot:
+    """
+    Analyze every channel of an account and record the result as the latest
+    snapshot for this request shape.
+
+    Concurrent calls with the same account, data fingerprint, fit settings
+    and request parameters share one computation: the first runs it and the
+    rest wait for its result. Callers that have just read the fingerprint
+    pass it in to skip reading it again.
+    """
+    read_at = datetime.now(timezone.utc)
+    if data_fingerprint is None:
+        with timing_span("db_fingerprint"):
+            data_fingerprint = fetch_data_fingerprint(account_id)
+    request_key = _analysis_request_key(
+        account_id,
+        target_cpa,
+        target_cpa_overrides,
+        curve_max_points,
+        uncertainty_method,
+    )
+
+    def compute() -> AnalysisSnapshot:
+        snapshot = AnalysisSnapshot(
+            data_fingerprint=data_fingerprint,
+            computations=tuple(
+                _compute_account_channel_analysis(
+                    account_id,
+                    target_cpa,
+                    target_cpa_overrides,
+                    curve_max_points,
+                    uncertainty_method,
+                )
+            ),
+            computed_at=read_at,
+        )
+        if snapshot.computations:
+            ANALYSIS_SNAPSHOTS.put(request_key, snapshot)
+        return snapshot
+
+    snapshot, shared = ANALYSIS_FLIGHTS.do((*request_key, data_fingerprint), compute)
+    ANALYSIS_SINGLE_FLIGHT.inc(role="follower" if shared else "leader")
+    return snapshot
+
+
 def compute_account_channel_analysis(
     account_id: str,
     target_cpa: float,
     target_cpa_overrides: list[TargetCpaOverride] | None = None,
+    curve_max_points: int | None = None,
+    uncertainty_method: str = "covariance",
+) -> list[ChannelComputation]:
+    """Analyze every channel of an account (coalesced, see compute_account_analysis_snapshot)."""
+    snapshot = compute_account_analysis_snapshot(
+        account_id,
+        target_cpa,
+        target_cpa_overrides,
+        curve_max_points,
+        uncertainty_method,
+    )
+    return list(snapshot.computations)
+
+
+def cached_channel_fits(computations: list[ChannelComputation]) -> list[CachedChannelFit]:
+    return [
+        CachedChannelFit(
+            channel_name=item.result.channel_name,
+            fit_result=item.fit_result,
+            prior_adstock_state=float(item.prior_adstock_state or 0.0),
+            current_spend=float(item.result.current_spend),
+        )
+        for item in computations
+    ]
+
+
+def _compute_account_channel_analysis(
+    account_id: str,
+    target_cpa: float,
+    target_cpa_overrides: list[TargetCpaOverride] | None,
+    curve_max_points: int | None,
+    uncertainty_method: str,
 ) -> list[ChannelComputation]:
-    channels = fetch_channels_for_account(account_id)
+    # Read before the data, so an ingest during the fits keeps these out of the cache.
+    cache_generation = FIT_CACHE.generation(account_id)
+    with timing_span("db_channels"):
+        channels = fetch_channels_for_account(account_id)
+    with timing_span("db_stored_fits"):
+        stored_fits = fetch_stored_fits(account_id)
     results: list[ChannelComputation] = []
     channel_overrides = _build_channel_target_overrides(target_cpa_overrides)
+    # The bootstrap time budget covers the whole request; each channel gets
+    # an even share of what is left when its turn comes.
+    bootstrap_deadline = time.perf_counter() + get_settings().bootstrap_time_budget_seconds
 
-    for channel_name in channels:
+    for index, channel_name in enumerate(channels):
         effective_target_cpa, target_source = _resolve_channel_target_cpa(
             channel_name=channel_name,
             default_target_cpa=target_cpa,
@@ -188,6 +427,13 @@ def compute_account_channel_analysis(
             channel_name=channel_name,
             target_cpa=effective_target_cpa,
             target_source=target_source,
+            curve_max_points=curve_max_points,
+            uncertainty_method=uncertainty_method,
+            bootstrap_time_budget_seconds=max(
+                (bootstrap_deadline - time.perf_counter()) / (len(channels) - index),
+                0.0,
+            ),
+            stored_fit=stored_fits.get(channel_name),
         )
         if computation is not None:
             results.append(computation)
@@ -196,6 +442,7 @@ def compute_account_channel_analysis(
         {"green": 0, "yellow": 1, "red": 2, "grey": 3}[x.result.traffic_light],
         x.result.marginal_cpa or float("inf")
     ))
+    FIT_CACHE.put_account(account_id, cached_channel_fits(results), generation=cache_generation)
     return results
 
 
@@ -210,7 +457,8 @@ async def fit_model(request: FitModelRequest):
     """
     Fit Hill Function model for a specific channel and calculate marginal CPA.
     """
-    spend, conversions = fetch_daily_metrics(request.account_id, request.channel_name)
+    data_read_at = datetime.now(timezone.utc)
+    spend, conversions, last_date = fetch_daily_metrics(request.account_id, request.channel_name)
     
     if len(spend) == 0:
         raise HTTPException(status_code=404, detail="No data found for this channel")
@@ -264,13 +512,36 @@ async def fit_model(request: FitModelRequest):
         r_squared=fit_result.r_squared,
     )
     
-    save_model_params(request.account_id, request.channel_name, params)
+    adstock = save_model_params(
+        request.account_id,
+        request.channel_name,
+        params,
+        spend_history=spend,
+        covariance=fit_result.covariance,
+        data_read_at=data_read_at,
+        history_last_date=last_date,
+    )
     
     current_spend = get_current_spend(request.account_id, request.channel_name)
+    if adstock is None:
+        adstock = AdstockState.from_history(fit_result.alpha, spend)
+    prior_adstock_state = adstock.prior_state
     marginal_cpa = calculate_marginal_cpa(
         current_spend,
         fit_result,
-        spend_history=spend,
+        prior_adstock_state=prior_adstock_state,
+    )
+    band_draws, uncertainty_fields = _resolve_uncertainty(
+        spend,
+        conversions,
+        fit_result,
+        request.uncertainty_method,
+    )
+    marginal_cpa_lower, marginal_cpa_upper = calculate_marginal_cpa_interval(
+        current_spend,
+        fit_result,
+        prior_adstock_state=prior_adstock_state,
+        draws=band_draws,
     )
     traffic_light = get_traffic_light(marginal_cpa, request.target_cpa)
     curve_points, current_point = generate_marginal_curve_points(
@@ -278,6 +549,9 @@ async def fit_model(request: FitModelRequest):
         params=fit_result,
         target_cpa=request.target_cpa,
         spend_history=spend,
+        max_points=request.curve_max_points,
+        band_draws=band_draws,
+        prior_adstock_state=prior_adstock_state,
     )
 
     return FitModelResponse(
@@ -287,6 +561,8 @@ async def fit_model(request: FitModelRequest):
             channel_name=request.channel_name,
             current_spend=current_spend,
             marginal_cpa=marginal_cpa,
+            marginal_cpa_lower=marginal_cpa_lower,
+            marginal_cpa_upper=marginal_cpa_upper,
             target_cpa=request.target_cpa,
             effective_target_cpa=request.target_cpa,
             target_source="default",
@@ -294,6 +570,7 @@ async def fit_model(request: FitModelRequest):
             recommendation=get_recommendation(traffic_light),
             data_quality_state=data_quality.state,
             data_quality_reason=data_quality.reason,
+            **uncertainty_fields,
             model_params=params,
             curve_points=curve_points,
             current_point=current_point,
@@ -301,21 +578,181 @@ async def fit_model(request: FitModelRequest):
     )
 
 
-@router.post("/analyze-channels", response_model=ChannelAnalysisResponse)
-async def analyze_channels(request: ChannelAnalysisRequest):
+# Someone is usually waiting on a dashboard, so analysis jobs run ahead of ingestion.
+ANALYSIS_JOB_PRIORITY = 10
+
+
+_REFRESH_LOCK = threading.Lock()
+_REFRESHING: set[tuple] = set()
+
+
+def _refresh_in_background(request: ChannelAnalysisRequest, request_key: tuple) -> None:
+    """Recompute a served-stale analysis on a daemon thread, one refresh per request shape."""
+    with _REFRESH_LOCK:
+        if request_key in _REFRESHING:
+            return
+        _REFRESHING.add(request_key)
+
+    def refresh() -> None:
+        try:
+            compute_account_analysis_snapshot(
+                request.account_id,
+                request.target_cpa,
+                request.target_cpa_overrides,
+                request.curve_max_points,
+                request.uncertainty_method,
+            )
+        except Exception:
+            logger.exception("Background analysis refresh failed for account %s", request.account_id)
+        finally:
+            with _REFRESH_LOCK:
+                _REFRESHING.discard(request_key)
+
+    threading.Thread(target=refresh, name="analysis-refresh", daemon=True).start()
+
+
+def _snapshot_response(
+    snapshot: AnalysisSnapshot,
+    stale: bool = False,
+    revalidating: bool = False,
+) -> ChannelAnalysisResponse:
+    return ChannelAnalysisResponse(
+        channels=[item.result for item in snapshot.computations],
+        data_fingerprint=snapshot.data_fingerprint,
+        computed_at=snapshot.computed_at,
+        age_seconds=snapshot.age_seconds(),
+        stale=stale,
+        revalidating=revalidating,
+    )
+
+
+def _analysis_etag(request_key: tuple, data_fingerprint: str, stale: bool = False) -> str:
+    return make_etag("analysis", request_key, data_fingerprint, stale)
+
+
+def serve_channel_analysis(
+    request: ChannelAnalysisRequest,
+    if_none_match: str | None = None,
+) -> tuple[str, ChannelAnalysisResponse | None]:
     """
-    Analyze all channels for an account and return marginal CPA + traffic lights.
+    Answer an analysis request with its ETag.
+
+    The response is None when `if_none_match` already names what would be
+    served; that is decided from the data fingerprint before any fitting.
     """
-    computations = compute_account_channel_analysis(
+    request_key = _analysis_request_key(
+        request.account_id,
+        request.target_cpa,
+        request.target_cpa_overrides,
+        request.curve_max_points,
+        request.uncertainty_method,
+    )
+    with timing_span("db_fingerprint"):
+        data_fingerprint = fetch_data_fingerprint(request.account_id)
+
+    if request.freshness == "stale_while_revalidate":
+        cached = ANALYSIS_SNAPSHOTS.get(request_key)
+        if cached is not None:
+            stale = cached.data_fingerprint != data_fingerprint
+            if stale:
+                _refresh_in_background(request, request_key)
+            etag = _analysis_etag(request_key, cached.data_fingerprint, stale)
+            if etag_matches(if_none_match, etag):
+                return etag, None
+            return etag, _snapshot_response(cached, stale=stale, revalidating=stale)
+
+    etag = _analysis_etag(request_key, data_fingerprint)
+    if etag_matches(if_none_match, etag):
+        return etag, None
+
+    snapshot = compute_account_analysis_snapshot(
         account_id=request.account_id,
         target_cpa=request.target_cpa,
         target_cpa_overrides=request.target_cpa_overrides,
+        curve_max_points=request.curve_max_points,
+        uncertainty_method=request.uncertainty_method,
+        data_fingerprint=data_fingerprint,
     )
 
-    if not computations:
+    if not snapshot.computations:
         raise HTTPException(status_code=404, detail="No channels found for this account")
 
-    return ChannelAnalysisResponse(channels=[item.result for item in computations])
+    return _analysis_etag(request_key, snapshot.data_fingerprint), _snapshot_response(snapshot)
+
+
+def run_channel_analysis(request: ChannelAnalysisRequest) -> ChannelAnalysisResponse:
+    _, response = serve_channel_analysis(request)
+    return response
+
+
+@register_job_handler("analyze_channels")
+def _analyze_channels_job(payload: dict) -> dict:
+    return run_channel_analysis(ChannelAnalysisRequest(**payload)).model_dump(mode="json")
+
+
+@router.post("/analyze-channels", response_model=ChannelAnalysisResponse)
+async def analyze_channels(
+    request: ChannelAnalysisRequest,
+    response: Response,
+    background: bool = False,
+    priority: int = ANALYSIS_JOB_PRIORITY,
+    if_none_match: str | None = Header(default=None),
+):
+    """
+    Analyze all channels for an account and return marginal CPA + traffic lights.
+
+    With `freshness: "stale_while_revalidate"` the last analysis computed for
+    the same parameters is returned at once, flagged `stale` when the data
+    fingerprint has changed since, and a refresh runs in the background.
+
+    Responses carry an `ETag` derived from the data fingerprint and the
+    request parameters. Sending it back in `If-None-Match` returns 304
+    without a body, and without refitting, while neither has changed.
+
+    With `background=true` the analysis is queued as a job instead; the 202
+    response points at `/api/jobs/{job_id}` for its status and result.
+    """
+    if background:
+        return accept_background_job(
+            "analyze_channels",
+            request.model_dump(mode="json"),
+            account_id=request.account_id,
+            priority=priority,
+        )
+    # Off the event loop, so identical concurrent requests overlap and coalesce.
+    etag, result = await run_in_threadpool(serve_channel_analysis, request, if_none_match)
+    if result is None:
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+    return result
+
+
+@router.get("/refit-backlog", response_model=RefitBacklogResponse)
+async def get_refit_backlog(account_id: str | None = None):
+    """
+    Channels whose data changed since their stored fit, oldest first.
+
+    Analysis fits these channels on the request until the refit worker has
+    caught up with them.
+    """
+    now = datetime.now(timezone.utc)
+    channels = []
+    for marked_account_id, channel_name, requested_at in fetch_refit_backlog(account_id):
+        if requested_at.tzinfo is None:
+            requested_at = requested_at.replace(tzinfo=timezone.utc)
+        channels.append(
+            RefitBacklogItem(
+                account_id=marked_account_id,
+                channel_name=channel_name,
+                requested_at=requested_at,
+                waiting_seconds=max((now - requested_at).total_seconds(), 0.0),
+            )
+        )
+    return RefitBacklogResponse(
+        worker_running=REFIT_WORKER.running,
+        pending=len(channels),
+        channels=channels,
+    )
 
 
 @router.get("/health")
@@ -0,0 +1,67 @@
+from dataclasses import asdict
+
+import numpy as np
+from fastapi import APIRouter, HTTPException
+
+from app.models.schemas import BacktestRequest, BacktestResponse, BacktestWindowResult, ChannelBacktestResult
+from app.services.backtest import ChannelBacktest, run_backtests
+from app.services.database import fetch_channels_for_account, fetch_daily_metrics
+from app.services.timing import timing_span
+
+router = APIRouter(prefix="/api/backtest", tags=["backtest"])
+
+
+def load_channel_series(
+    account_id: str,
+    channels: list[str] | None = None,
+) -> dict[str, tuple[np.ndarray, np.ndarray]]:
+    """(spend, conversions) per channel; `channels` are matched case-insensitively."""
+    available = fetch_channels_for_account(account_id)
+    if channels:
+        by_key = {channel.strip().lower(): channel for channel in available}
+        unknown = [channel for channel in channels if channel.strip().lower() not in by_key]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown channels: {', '.join(unknown)}")
+        available = [by_key[channel.strip().lower()] for channel in channels]
+
+    history = {channel: fetch_daily_metrics(account_id, channel) for channel in available}
+    return {channel: (spend, conversions) for channel, (spend, conversions, _) in history.items()}
+
+
+def backtest_result(backtest: ChannelBacktest) -> ChannelBacktestResult:
+    return ChannelBacktestResult(
+        channel_name=backtest.channel_name,
+        status=backtest.status,
+        windows=[BacktestWindowResult(**asdict(window)) for window in backtest.windows],
+        mae=backtest.mae,
+        wape=backtest.wape,
+        curve_fits=backtest.curve_fits,
+    )
+
+
+@router.post("", response_model=BacktestResponse)
+def backtest_account(request: BacktestRequest):
+    """
+    Rolling-origin backtest: refit each channel on expanding windows and score
+    the following `horizon_days` of conversions.
+
+    A plain `def`, so the refits run on the threadpool, not the event loop.
+    """
+    with timing_span("db_fetch"):
+        series = load_channel_series(request.account_id, request.channels)
+    if not series:
+        raise HTTPException(status_code=404, detail="No channels found for this account")
+
+    with timing_span("backtest"):
+        backtests = run_backtests(
+            series,
+            initial_train_days=request.initial_train_days,
+            horizon_days=request.horizon_days,
+            step_days=request.step_days,
+            max_windows=request.max_windows,
+        )
+
+    return BacktestResponse(
+        account_id=request.account_id,
+        channels=[backtest_result(backtest) for backtest in backtests],
+    )
@@ -1,5 +1,6 @@
 from datetime import date
 import re
+import time
 from typing import Any, Literal
 
 from fastapi import APIRouter, HTTPException
@@ -12,8 +13,14 @@ from app.routers.import_data import (
     parse_account_id,
     upsert_daily_metrics_rows,
 )
+from app.routers.jobs import accept_background_job
 from app.services.database import get_session
+from app.services.fit_cache import FIT_CACHE
 from app.services.google_ads_client import get_google_ads_client
+from app.services.google_ads_provider_types import rollup_campaign_rows
+from app.services.jobs import register_job_handler
+from app.services.metrics import observe_ingest
+from app.services.refit_worker import REFIT_WORKER
 
 router = APIRouter(prefix="/api/import", tags=["import"])
 
@@ -62,8 +69,7 @@ async def google_ads_capabilities():
     )
 
 
-@router.post("/google-ads/sync", response_model=GoogleAdsSyncResponse)
-async def sync_google_ads(request: GoogleAdsSyncRequest):
+def validate_sync_range(request: GoogleAdsSyncRequest) -> None:
     settings = get_settings()
     total_days = (request.date_to - request.date_from).days + 1
     if total_days > settings.google_ads_max_sync_days:
@@ -75,6 +81,10 @@ async def sync_google_ads(request: GoogleAdsSyncRequest):
             ),
         )
 
+
+def run_google_ads_sync(request: GoogleAdsSyncRequest) -> GoogleAdsSyncResponse:
+    validate_sync_range(request)
+
     session = get_session()
     try:
         account_uuid = parse_account_id(request.account_id)
@@ -86,6 +96,8 @@ async def sync_google_ads(request: GoogleAdsSyncRequest):
             date_from=request.date_from,
             date_to=request.date_to,
         )
+        if any(row.campaign_name for row in provider_rows):
+            provider_rows = rollup_campaign_rows(provider_rows)
 
         upsert_rows = [
             DailyMetricUpsertRow(
@@ -98,12 +110,16 @@ async def sync_google_ads(request: GoogleAdsSyncRequest):
             for row in provider_rows
         ]
 
+        ingest_started = time.perf_counter()
         rows_imported, channels, date_range = upsert_daily_metrics_rows(
             session=session,
             account_id=account_uuid,
             rows=upsert_rows,
         )
         session.commit()
+        observe_ingest("google_ads", rows_imported, time.perf_counter() - ingest_started)
+        FIT_CACHE.invalidate(str(account_uuid))
+        REFIT_WORKER.wake()
 
         return GoogleAdsSyncResponse(
             success=True,
@@ -122,3 +138,31 @@ async def sync_google_ads(request: GoogleAdsSyncRequest):
         raise HTTPException(status_code=502, detail=f"Google Ads sync failed: {exc}") from exc
     finally:
         session.close()
+
+
+@register_job_handler("google_ads_sync")
+def _google_ads_sync_job(payload: dict[str, Any]) -> dict[str, Any]:
+    return run_google_ads_sync(GoogleAdsSyncRequest(**payload)).model_dump(mode="json")
+
+
+@router.post("/google-ads/sync", response_model=GoogleAdsSyncResponse)
+async def sync_google_ads(
+    request: GoogleAdsSyncRequest,
+    background: bool = False,
+    priority: int = 0,
+):
+    """
+    Pull daily metrics from Google Ads and upsert them.
+
+    With `background=true` the sync is queued as a job (provider failures are
+    retried) and the 202 response points at `/api/jobs/{job_id}`.
+    """
+    if background:
+        validate_sync_range(request)
+        return accept_background_job(
+            "google_ads_sync",
+            request.model_dump(mode="json"),
+            account_id=request.account_id,
+            priority=priority,
+        )
+    return run_google_ads_sync(request)
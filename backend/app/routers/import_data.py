@@ -1,9 +1,10 @@
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
 from datetime import date, datetime
 import json
 import math
 from typing import Any, Dict, Iterable, Optional
 import io
+import time
 import uuid
 
 import pandas as pd
@@ -11,7 +12,12 @@ from fastapi import APIRouter, UploadFile, File, Form, HTTPException
 from fastapi.responses import Response
 
 from app.models.db_models import Account, DailyMetric
-from app.services.database import get_session
+from app.routers.jobs import accept_background_job
+from app.services.database import get_session, mark_channels_changed
+from app.services.fit_cache import FIT_CACHE
+from app.services.jobs import register_job_handler
+from app.services.metrics import observe_ingest
+from app.services.refit_worker import REFIT_WORKER
 
 router = APIRouter(prefix="/api/import", tags=["import"])
 
@@ -62,6 +68,7 @@ def upsert_daily_metrics_rows(
 ) -> tuple[int, set[str], dict[str, Optional[str]]]:
     rows_processed = 0
     channels: set[str] = set()
+    earliest_dates: dict[str, date] = {}
     start_date: Optional[date] = None
     end_date: Optional[date] = None
 
@@ -90,12 +97,16 @@ def upsert_daily_metrics_rows(
 
         channels.add(row.channel_name)
         rows_processed += 1
+        if row.channel_name not in earliest_dates or row.date < earliest_dates[row.channel_name]:
+            earliest_dates[row.channel_name] = row.date
 
         if start_date is None or row.date < start_date:
             start_date = row.date
         if end_date is None or row.date > end_date:
             end_date = row.date
 
+    mark_channels_changed(session, account_id, earliest_dates)
+
     date_range = {
         "start": start_date.isoformat() if start_date else None,
         "end": end_date.isoformat() if end_date else None,
@@ -282,16 +293,58 @@ def apply_column_map(
     return mapped
 
 
+def ingest_csv_rows(account_id: uuid.UUID, rows: list[DailyMetricUpsertRow]) -> Dict[str, Any]:
+    session = get_session()
+    try:
+        ensure_account_exists(session, account_id, create_if_missing=True)
+
+        ingest_started = time.perf_counter()
+        rows_processed, channels, date_range = upsert_daily_metrics_rows(
+            session=session,
+            account_id=account_id,
+            rows=rows,
+        )
+
+        session.commit()
+        observe_ingest("csv", rows_processed, time.perf_counter() - ingest_started)
+        FIT_CACHE.invalidate(str(account_id))
+        REFIT_WORKER.wake()
+
+        return {
+            "success": True,
+            "rows_imported": rows_processed,
+            "channels": list(channels),
+            "date_range": date_range,
+        }
+    finally:
+        session.close()
+
+
+@register_job_handler("import_csv")
+def _import_csv_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+    rows = [
+        DailyMetricUpsertRow(**{**row, "date": date.fromisoformat(row["date"])})
+        for row in payload["rows"]
+    ]
+    return ingest_csv_rows(uuid.UUID(payload["account_id"]), rows)
+
+
 @router.post("/csv")
 async def import_csv(
     file: UploadFile = File(...),
     account_id: str = Form(...),
     column_map: Optional[str] = Form(None),
+    background: bool = False,
+    priority: int = 0,
 ) -> Dict[str, Any]:
     """
     Import daily metrics from a CSV file.
     Required columns: date, channel_name, spend, conversions
     Optional columns: impressions
+
+    The file is validated on the request either way. With `background=true`
+    the validated rows are written by a queued job and the 202 response
+    points at `/api/jobs/{job_id}`.
     """
     if not file.filename.endswith(".csv"):
         raise HTTPException(status_code=400, detail="File must be a CSV")
@@ -324,26 +377,14 @@ async def import_csv(
             )
 
         acc_uuid = parse_account_id(account_id)
-        session = get_session()
-        try:
-            ensure_account_exists(session, acc_uuid, create_if_missing=True)
-
-            rows_processed, channels, date_range = upsert_daily_metrics_rows(
-                session=session,
-                account_id=acc_uuid,
-                rows=rows,
-            )
-
-            session.commit()
-
-            return {
-                "success": True,
-                "rows_imported": rows_processed,
-                "channels": list(channels),
-                "date_range": date_range,
+        if background:
+            payload = {
+                "account_id": str(acc_uuid),
+                "rows": [{**asdict(row), "date": row.date.isoformat()} for row in rows],
             }
-        finally:
-            session.close()
+            return accept_background_job("import_csv", payload, account_id=acc_uuid, priority=priority)
+
+        return ingest_csv_rows(acc_uuid, rows)
 
     except Exception as e:
         if isinstance(e, HTTPException):
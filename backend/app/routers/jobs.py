@@ -0,0 +1,90 @@
+from datetime import timezone
+from typing import Any, Optional
+import uuid
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import JSONResponse
+
+from app.models.db_models import Job
+from app.models.schemas import JobResponse
+from app.services.jobs import SUCCEEDED, cancel_job, enqueue_job, get_job
+
+router = APIRouter(prefix="/api/jobs", tags=["jobs"])
+
+
+def _utc(value):
+    # SQLite hands timestamps back naive; they are stored in UTC.
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def job_response(job: Job) -> JobResponse:
+    return JobResponse(
+        job_id=str(job.id),
+        kind=job.kind,
+        status=job.status,
+        priority=job.priority,
+        account_id=str(job.account_id) if job.account_id else None,
+        attempts=job.attempts,
+        max_attempts=job.max_attempts,
+        cancel_requested=job.cancel_requested,
+        error=job.error,
+        result=job.result,
+        created_at=_utc(job.created_at),
+        started_at=_utc(job.started_at),
+        finished_at=_utc(job.finished_at),
+    )
+
+
+def accept_background_job(
+    kind: str,
+    payload: dict[str, Any],
+    account_id: Optional[str | uuid.UUID],
+    priority: int,
+) -> JSONResponse:
+    """Enqueue `kind` and answer 202 with the job's status document."""
+    try:
+        account_uuid = uuid.UUID(str(account_id)) if account_id is not None else None
+    except ValueError:
+        # The job itself reports the bad id; it is only kept for filtering.
+        account_uuid = None
+    job = enqueue_job(kind, payload, account_id=account_uuid, priority=priority)
+    return JSONResponse(
+        status_code=202,
+        content=job_response(job).model_dump(mode="json"),
+        headers={"Location": f"/api/jobs/{job.id}"},
+    )
+
+
+def _load_job(job_id: str) -> Job:
+    try:
+        job = get_job(uuid.UUID(job_id))
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail="Invalid job_id format") from exc
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job_status(job_id: str):
+    return job_response(_load_job(job_id))
+
+
+@router.get("/{job_id}/result")
+async def get_job_result(job_id: str):
+    """The job's result once it has succeeded; 409 while pending or after failure."""
+    job = _load_job(job_id)
+    if job.status != SUCCEEDED:
+        raise HTTPException(
+            status_code=409,
+            detail={"message": f"Job is {job.status}", "status": job.status, "error": job.error},
+        )
+    return job.result
+
+
+@router.post("/{job_id}/cancel", response_model=JobResponse)
+async def cancel_job_request(job_id: str):
+    _load_job(job_id)
+    return job_response(cancel_job(uuid.UUID(job_id)))
@@ -1,26 +1,41 @@
+from dataclasses import dataclass
 from datetime import datetime
+import heapq
 import uuid
 
-from fastapi import APIRouter, HTTPException
+import numpy as np
+from fastapi import APIRouter, Header, HTTPException, Response
 
 from app.config import get_settings
 from app.models.schemas import (
+    ChannelSpendConstraint,
     ScenarioChannelRecommendation,
     ScenarioCreateRequest,
+    ScenarioFrontierAllocation,
+    ScenarioFrontierPoint,
     ScenarioListResponse,
     ScenarioProjectedSummary,
     ScenarioRecommendationRequest,
     ScenarioRecommendationResponse,
     ScenarioRecord,
+    ScenarioSweepRequest,
+    ScenarioSweepResponse,
+    ScenarioWeekSummary,
 )
-from app.routers.analysis import compute_account_channel_analysis
-from app.services.database import list_scenarios, save_scenario
+from app.routers.analysis import ChannelComputation, compute_account_channel_analysis
+from app.services.budget_allocation import allocate_equal_marginal_cpa
+from app.services.database import fetch_scenarios_fingerprint, list_scenarios, save_scenario
+from app.services.etags import etag_matches, make_etag, not_modified
 from app.services.hill_function import (
     apply_spend_step,
     calculate_marginal_cpa,
+    calculate_marginal_cpa_batch,
+    calculate_projected_conversions,
+    simulate_adstock_horizon,
     get_scenario_action,
     get_scenario_rationale,
 )
+from app.services.timing import timing_span
 
 router = APIRouter(prefix="/api/scenarios", tags=["scenarios"])
 
@@ -32,6 +47,9 @@ def _validate_account_id(account_id: str) -> None:
         raise HTTPException(status_code=400, detail="Invalid account_id format") from exc
 
 
+MAX_SWEEP_POINTS = 201
+
+
 def _build_scenario_name(budget_delta_percent: float) -> str:
     timestamp = datetime.utcnow().strftime("%Y-%m-%d %H:%M UTC")
     return f"Auto Scenario ({budget_delta_percent:+.1f}% budget) - {timestamp}"
@@ -119,27 +137,178 @@ def _rebalance_budget(
             return
 
 
-@router.post("/recommend", response_model=ScenarioRecommendationResponse)
-async def recommend_scenario(request: ScenarioRecommendationRequest):
-    _validate_account_id(request.account_id)
+def _live_marginal_cpa_key(channel: dict, direction: str, increment: float) -> float:
+    """Heap key: marginal CPA relative to target at the current recommended spend."""
+    fit_result = channel["fit_result"]
+    if fit_result is None:
+        marginal_cpa = channel["current_marginal_cpa"]
+    else:
+        marginal_cpa = calculate_marginal_cpa(
+            current_spend=channel["recommended_spend"],
+            params=fit_result,
+            increment=increment,
+            prior_adstock_state=channel["prior_adstock_state"],
+        )
+    if marginal_cpa is None:
+        return float("inf")
 
-    computations = compute_account_channel_analysis(
-        account_id=request.account_id,
-        target_cpa=request.target_cpa,
-        target_cpa_overrides=request.target_cpa_overrides,
+    ratio = marginal_cpa / channel["target_cpa"]
+    # Increases go to the cheapest marginal conversion first, cuts to the dearest.
+    return ratio if direction == "increase" else -ratio
+
+
+def _rebalance_budget_incremental(
+    channels: list[dict],
+    target_total_spend: float,
+    increment: float,
+) -> None:
+    """
+    Step spend toward the target total one channel at a time.
+
+    Movable channels sit in a heap keyed by their live marginal CPA, so each
+    step moves the best channel and re-keys only that channel instead of
+    re-sorting every candidate.
+    """
+    projected_total = sum(channel["recommended_spend"] for channel in channels)
+    remaining_delta = target_total_spend - projected_total
+    tolerance = max(1.0, target_total_spend * 0.005)
+
+    movable = [
+        idx
+        for idx, channel in enumerate(channels)
+        if (
+            not channel["locked"]
+            and not channel["policy_hold"]
+            and channel["traffic_light"] != "grey"
+        )
+    ]
+    direction = None
+    heap: list[tuple[float, int]] = []
+
+    max_steps = 500 * len(movable)
+    for _ in range(max_steps):
+        if abs(remaining_delta) <= tolerance:
+            return
+
+        step_direction = "increase" if remaining_delta > 0 else "decrease"
+        if step_direction != direction:
+            direction = step_direction
+            heap = [
+                (_live_marginal_cpa_key(channels[idx], direction, increment), idx)
+                for idx in movable
+            ]
+            heapq.heapify(heap)
+        if not heap:
+            return
+
+        _, idx = heapq.heappop(heap)
+        channel = channels[idx]
+        current_spend = channel["recommended_spend"]
+        next_spend = apply_spend_step(current_spend, direction, increment=increment)
+        next_spend = min(max(next_spend, channel["min_spend"]), channel["max_spend"])
+        if abs(next_spend - current_spend) < 1e-6:
+            continue
+
+        channel["recommended_spend"] = next_spend
+        remaining_delta -= (next_spend - current_spend)
+        heapq.heappush(heap, (_live_marginal_cpa_key(channel, direction, increment), idx))
+
+
+def _allocate_optimal(
+    channels: list[dict],
+    target_total_spend: float,
+    increment: float,
+) -> None:
+    """
+    Re-spread the budget left after locked, held and unfitted channels so the
+    remaining channels end at the same marginal CPA relative to their target,
+    except where a spend bound binds. On S-shaped (beta > 1) curves only the
+    concave branch above the inflection point is used; see
+    `allocate_equal_marginal_cpa`.
+    """
+    free = [
+        idx
+        for idx, channel in enumerate(channels)
+        if (
+            not channel["locked"]
+            and not channel["policy_hold"]
+            and channel["traffic_light"] != "grey"
+            and channel["fit_result"] is not None
+        )
+    ]
+    if not free:
+        return
+
+    free_set = set(free)
+    fixed_total = sum(
+        channel["recommended_spend"]
+        for idx, channel in enumerate(channels)
+        if idx not in free_set
     )
-    if not computations:
-        raise HTTPException(status_code=404, detail="No channels found for this account")
+    spends = allocate_equal_marginal_cpa(
+        [channels[idx]["fit_result"] for idx in free],
+        np.array([channels[idx]["target_cpa"] for idx in free], dtype=float),
+        budget=max(0.0, target_total_spend - fixed_total),
+        prior_adstock_states=np.array(
+            [channels[idx]["prior_adstock_state"] or 0.0 for idx in free],
+            dtype=float,
+        ),
+        increment=increment,
+        lower_bounds=np.array([channels[idx]["min_spend"] for idx in free], dtype=float),
+        upper_bounds=np.array([channels[idx]["max_spend"] for idx in free], dtype=float),
+    )
+    for idx, spend in zip(free, spends.tolist()):
+        channels[idx]["recommended_spend"] = spend
+
+
+def _spend_bounds(
+    channel_name: str,
+    current_spend: float,
+    constraint: ChannelSpendConstraint | None,
+) -> tuple[float, float]:
+    if constraint is None:
+        return 0.0, float("inf")
+
+    lower = constraint.min_spend or 0.0
+    upper = constraint.max_spend if constraint.max_spend is not None else float("inf")
+    if constraint.max_change_percent is not None:
+        step = current_spend * constraint.max_change_percent / 100
+        lower = max(lower, current_spend - step)
+        upper = min(upper, current_spend + step)
+    if lower > upper:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Spend constraints for {channel_name} leave no feasible spend",
+        )
+    return lower, upper
 
-    locked_channels = {channel.strip().lower() for channel in request.locked_channels}
-    settings = get_settings()
-    increment = settings.marginal_increment
-    low_confidence_policy = settings.low_confidence_scenario_policy
+
+def _build_working_channels(
+    computations: list[ChannelComputation],
+    locked_channels: list[str],
+    increment: float,
+    low_confidence_policy: str,
+    channel_constraints: list[ChannelSpendConstraint] | None = None,
+) -> list[dict]:
+    """Seed per-channel scenario state with the single-step traffic-light move."""
+    locked_names = {channel.strip().lower() for channel in locked_channels}
+    constraints = {
+        constraint.channel_name.strip().lower(): constraint
+        for constraint in channel_constraints or []
+    }
+    known_names = {computation.result.channel_name.strip().lower() for computation in computations}
+    unknown = sorted(
+        constraint.channel_name
+        for constraint in channel_constraints or []
+        if constraint.channel_name.strip().lower() not in known_names
+    )
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown channels: {', '.join(unknown)}")
 
     working_channels: list[dict] = []
     for computation in computations:
         result = computation.result
-        is_locked = result.channel_name.lower() in locked_channels
+        is_locked = result.channel_name.lower() in locked_names
         data_quality_state = result.data_quality_state
         data_quality_reason = result.data_quality_reason
         policy_hold = data_quality_state == "low_confidence"
@@ -162,11 +331,20 @@ async def recommend_scenario(request: ScenarioRecommendationRequest):
         else:
             action = get_scenario_action(result.traffic_light, locked=False)
 
+        min_spend, max_spend = _spend_bounds(
+            result.channel_name,
+            result.current_spend,
+            constraints.get(result.channel_name.strip().lower()),
+        )
         recommended_spend = result.current_spend
         if action == "increase":
             recommended_spend = apply_spend_step(result.current_spend, "increase", increment)
         elif action == "decrease":
             recommended_spend = apply_spend_step(result.current_spend, "decrease", increment)
+        # Every channel the rebalancer may move starts inside its bounds, even
+        # when its own action is "maintain" or no rebalancing step is needed.
+        if not is_locked and not policy_hold and result.traffic_light != "grey":
+            recommended_spend = min(max(recommended_spend, min_spend), max_spend)
 
         working_channels.append(
             {
@@ -174,6 +352,8 @@ async def recommend_scenario(request: ScenarioRecommendationRequest):
                 "traffic_light": result.traffic_light,
                 "current_spend": result.current_spend,
                 "recommended_spend": recommended_spend,
+                "min_spend": min_spend,
+                "max_spend": max_spend,
                 "current_marginal_cpa": result.marginal_cpa,
                 "target_cpa": result.target_cpa,
                 "fit_result": computation.fit_result,
@@ -187,12 +367,187 @@ async def recommend_scenario(request: ScenarioRecommendationRequest):
             }
         )
 
+    return working_channels
+
+
+@dataclass
+class ScenarioProjection:
+    """Per-channel model outputs for a scenario; NaN for unmodeled channels."""
+
+    current_conversions: np.ndarray
+    projected_conversions: np.ndarray
+    projected_marginal_cpa: np.ndarray
+
+
+def _project_channels(channels: list[dict], increment: float) -> ScenarioProjection:
+    """
+    Evaluate current and recommended spend for every modeled channel in one
+    batched Hill evaluation, plus one batched marginal CPA evaluation.
+    """
+    count = len(channels)
+    projection = ScenarioProjection(
+        current_conversions=np.full(count, np.nan),
+        projected_conversions=np.full(count, np.nan),
+        projected_marginal_cpa=np.full(count, np.nan),
+    )
+    modeled = [idx for idx, channel in enumerate(channels) if channel["fit_result"] is not None]
+    if not modeled:
+        return projection
+
+    params = [channels[idx]["fit_result"] for idx in modeled]
+    priors = np.array([channels[idx]["prior_adstock_state"] or 0.0 for idx in modeled], dtype=float)
+    current = np.array([channels[idx]["current_spend"] for idx in modeled], dtype=float)
+    recommended = np.array([channels[idx]["recommended_spend"] for idx in modeled], dtype=float)
+
+    conversions = calculate_projected_conversions(
+        params + params,
+        np.concatenate([current, recommended]),
+        prior_adstock_states=np.concatenate([priors, priors]),
+    )
+    projection.current_conversions[modeled] = conversions[: len(modeled)]
+    projection.projected_conversions[modeled] = conversions[len(modeled):]
+    projection.projected_marginal_cpa[modeled] = calculate_marginal_cpa_batch(
+        params,
+        recommended,
+        prior_adstock_states=priors,
+        increment=increment,
+    )
+    return projection
+
+
+def _optional_round(value: float) -> float | None:
+    return None if np.isnan(value) else round(float(value), 2)
+
+
+def _blended_cpa(spend: float, conversions: float) -> float | None:
+    if np.isnan(conversions) or conversions <= 0:
+        return None
+    return round(spend / conversions, 2)
+
+
+def _projection_totals(channels: list[dict], projection: ScenarioProjection) -> dict:
+    """
+    Account-level conversions and blended CPA over modeled channels only, so
+    spend on channels without a fitted curve does not inflate the CPA.
+    """
+    modeled = ~np.isnan(projection.projected_conversions)
+    if not modeled.any():
+        return {}
+
+    current_spend = np.array([channel["current_spend"] for channel in channels], dtype=float)
+    recommended_spend = np.array([channel["recommended_spend"] for channel in channels], dtype=float)
+    current_conversions = float(projection.current_conversions[modeled].sum())
+    projected_conversions = float(projection.projected_conversions[modeled].sum())
+    return {
+        "current_conversions": round(current_conversions, 2),
+        "projected_conversions": round(projected_conversions, 2),
+        "conversions_delta": round(projected_conversions - current_conversions, 2),
+        "current_cpa": _blended_cpa(float(current_spend[modeled].sum()), current_conversions),
+        "projected_cpa": _blended_cpa(float(recommended_spend[modeled].sum()), projected_conversions),
+    }
+
+
+def _simulate_weekly_projection(channels: list[dict], weeks: int) -> list[ScenarioWeekSummary]:
+    """
+    Run the recommended and current daily spend forward from each channel's
+    last observed adstock, in one simulation over both plans stacked, and
+    roll days up into weeks. Only modeled channels are included.
+    """
+    modeled = [channel for channel in channels if channel["fit_result"] is not None]
+    if not modeled:
+        return []
+
+    days = weeks * 7
+    params = [channel["fit_result"] for channel in modeled]
+    current = np.array([channel["current_spend"] for channel in modeled], dtype=float)
+    recommended = np.array([channel["recommended_spend"] for channel in modeled], dtype=float)
+    alpha = np.array([fit.alpha for fit in params], dtype=float)
+    priors = np.array([channel["prior_adstock_state"] or 0.0 for channel in modeled], dtype=float)
+    last_adstock = current + alpha * priors
+
+    simulation = simulate_adstock_horizon(
+        params + params,
+        np.concatenate([recommended, current]),
+        np.concatenate([last_adstock, last_adstock]),
+        days,
+    )
+    # (plan, channel, week, day) -> per-plan weekly totals
+    weekly_spend = simulation.spend.reshape(2, len(modeled), weeks, 7).sum(axis=(1, 3))
+    weekly_conversions = simulation.conversions.reshape(2, len(modeled), weeks, 7).sum(axis=(1, 3))
+
+    summaries: list[ScenarioWeekSummary] = []
+    for week in range(weeks):
+        spend, baseline_spend = weekly_spend[0, week], weekly_spend[1, week]
+        conversions, baseline_conversions = weekly_conversions[0, week], weekly_conversions[1, week]
+        summaries.append(
+            ScenarioWeekSummary(
+                week=week + 1,
+                spend=round(float(spend), 2),
+                conversions=round(float(conversions), 2),
+                baseline_spend=round(float(baseline_spend), 2),
+                baseline_conversions=round(float(baseline_conversions), 2),
+                incremental_conversions=round(float(conversions - baseline_conversions), 2),
+                cpa=round(float(spend / conversions), 2) if conversions > 0 else None,
+            )
+        )
+    return summaries
+
+
+def _validate_allocation_mode(allocation_mode: str, channel_constraints: list) -> None:
+    if channel_constraints and allocation_mode == "greedy_legacy":
+        raise HTTPException(
+            status_code=400,
+            detail="channel_constraints require allocation_mode 'greedy' or 'optimal'",
+        )
+
+
+def _allocate(
+    channels: list[dict],
+    target_total_spend: float,
+    increment: float,
+    allocation_mode: str,
+) -> None:
+    if allocation_mode == "optimal":
+        _allocate_optimal(channels, target_total_spend, increment)
+    elif allocation_mode == "greedy_legacy":
+        _rebalance_budget(channels, target_total_spend, increment)
+    else:
+        _rebalance_budget_incremental(channels, target_total_spend, increment)
+
+
+@router.post("/recommend", response_model=ScenarioRecommendationResponse)
+def recommend_scenario(request: ScenarioRecommendationRequest):
+    _validate_account_id(request.account_id)
+    _validate_allocation_mode(request.allocation_mode, request.channel_constraints)
+
+    computations = compute_account_channel_analysis(
+        account_id=request.account_id,
+        target_cpa=request.target_cpa,
+        target_cpa_overrides=request.target_cpa_overrides,
+    )
+    if not computations:
+        raise HTTPException(status_code=404, detail="No channels found for this account")
+
+    settings = get_settings()
+    increment = settings.marginal_increment
+    working_channels = _build_working_channels(
+        computations,
+        locked_channels=request.locked_channels,
+        increment=increment,
+        low_confidence_policy=settings.low_confidence_scenario_policy,
+        channel_constraints=request.channel_constraints,
+    )
+
     current_total = sum(channel["current_spend"] for channel in working_channels)
     target_total = max(0.0, current_total * (1 + (request.budget_delta_percent / 100)))
-    _rebalance_budget(working_channels, target_total, increment)
+    with timing_span("scenario_rebalance"):
+        _allocate(working_channels, target_total, increment, request.allocation_mode)
+
+    with timing_span("scenario_projection"):
+        projection = _project_channels(working_channels, increment)
 
     recommendations: list[ScenarioChannelRecommendation] = []
-    for channel in working_channels:
+    for idx, channel in enumerate(working_channels):
         current_spend = float(channel["current_spend"])
         recommended_spend = float(channel["recommended_spend"])
         spend_delta = recommended_spend - current_spend
@@ -211,16 +566,6 @@ async def recommend_scenario(request: ScenarioRecommendationRequest):
         else:
             final_action = "maintain"
 
-        projected_marginal_cpa = None
-        fit_result = channel["fit_result"]
-        if fit_result is not None:
-            projected_marginal_cpa = calculate_marginal_cpa(
-                current_spend=recommended_spend,
-                params=fit_result,
-                increment=increment,
-                prior_adstock_state=channel["prior_adstock_state"],
-            )
-
         rationale = get_scenario_rationale(
             traffic_light=channel["traffic_light"],
             target_cpa=channel["target_cpa"],
@@ -246,11 +591,10 @@ async def recommend_scenario(request: ScenarioRecommendationRequest):
                     if channel["current_marginal_cpa"] is not None
                     else None
                 ),
-                projected_marginal_cpa=(
-                    round(float(projected_marginal_cpa), 2)
-                    if projected_marginal_cpa is not None
-                    else None
-                ),
+                projected_marginal_cpa=_optional_round(projection.projected_marginal_cpa[idx]),
+                current_conversions=_optional_round(projection.current_conversions[idx]),
+                projected_conversions=_optional_round(projection.projected_conversions[idx]),
+                projected_cpa=_blended_cpa(recommended_spend, projection.projected_conversions[idx]),
                 traffic_light=channel["traffic_light"],
                 locked=channel["locked"],
                 data_quality_state=channel["data_quality_state"],
@@ -265,12 +609,14 @@ async def recommend_scenario(request: ScenarioRecommendationRequest):
     projected_total = sum(item.recommended_spend for item in recommendations)
     total_delta = projected_total - current_total
     total_delta_percent = (total_delta / current_total * 100) if current_total > 0 else 0.0
+    totals = _projection_totals(working_channels, projection)
 
     projected_summary = ScenarioProjectedSummary(
         current_total_spend=round(current_total, 2),
         projected_total_spend=round(projected_total, 2),
         total_spend_delta=round(total_delta, 2),
         total_spend_delta_percent=round(total_delta_percent, 2),
+        **totals,
         channels_increase=sum(1 for item in recommendations if item.action == "increase"),
         channels_decrease=sum(1 for item in recommendations if item.action == "decrease"),
         channels_maintain=sum(1 for item in recommendations if item.action == "maintain"),
@@ -280,13 +626,115 @@ async def recommend_scenario(request: ScenarioRecommendationRequest):
         ),
     )
 
+    weekly_projection: list[ScenarioWeekSummary] = []
+    if request.horizon_weeks is not None:
+        with timing_span("scenario_simulation"):
+            weekly_projection = _simulate_weekly_projection(working_channels, request.horizon_weeks)
+
     return ScenarioRecommendationResponse(
         scenario_name=_build_scenario_name(request.budget_delta_percent),
         recommendations=recommendations,
         projected_summary=projected_summary,
+        weekly_projection=weekly_projection,
     )
 
 
+def _resolve_sweep_deltas(request: ScenarioSweepRequest) -> list[float]:
+    deltas = list(request.budget_delta_percents)
+    if request.budget_delta_range is not None:
+        sweep_range = request.budget_delta_range
+        if sweep_range.start > sweep_range.stop:
+            raise HTTPException(
+                status_code=400,
+                detail=(
+                    f"budget_delta_range is reversed: start ({sweep_range.start:g}) "
+                    f"is greater than stop ({sweep_range.stop:g})"
+                ),
+            )
+        count = int(np.floor((sweep_range.stop - sweep_range.start) / sweep_range.step + 1e-9)) + 1
+        if count > MAX_SWEEP_POINTS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Sweep is limited to {MAX_SWEEP_POINTS} budget points",
+            )
+        deltas.extend(
+            round(sweep_range.start + idx * sweep_range.step, 6)
+            for idx in range(count)
+        )
+
+    deltas = sorted(set(deltas))
+    if not deltas:
+        raise HTTPException(status_code=400, detail="Provide budget_delta_percents or budget_delta_range")
+    if len(deltas) > MAX_SWEEP_POINTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Sweep is limited to {MAX_SWEEP_POINTS} budget points",
+        )
+    return deltas
+
+
+@router.post("/sweep", response_model=ScenarioSweepResponse)
+def sweep_scenarios(request: ScenarioSweepRequest):
+    """
+    Budget frontier: allocate each budget delta on one set of fitted curves and
+    report total spend against projected conversions.
+    """
+    _validate_account_id(request.account_id)
+    _validate_allocation_mode(request.allocation_mode, request.channel_constraints)
+    deltas = _resolve_sweep_deltas(request)
+
+    computations = compute_account_channel_analysis(
+        account_id=request.account_id,
+        target_cpa=request.target_cpa,
+        target_cpa_overrides=request.target_cpa_overrides,
+    )
+    if not computations:
+        raise HTTPException(status_code=404, detail="No channels found for this account")
+
+    settings = get_settings()
+    increment = settings.marginal_increment
+    base_channels = _build_working_channels(
+        computations,
+        locked_channels=request.locked_channels,
+        increment=increment,
+        low_confidence_policy=settings.low_confidence_scenario_policy,
+        channel_constraints=request.channel_constraints,
+    )
+
+    current_total = sum(channel["current_spend"] for channel in base_channels)
+
+    points: list[ScenarioFrontierPoint] = []
+    for delta in deltas:
+        channels = [dict(channel) for channel in base_channels]
+        target_total = max(0.0, current_total * (1 + (delta / 100)))
+        with timing_span("scenario_rebalance"):
+            _allocate(channels, target_total, increment, request.allocation_mode)
+
+        with timing_span("scenario_projection"):
+            projection = _project_channels(channels, increment)
+        totals = _projection_totals(channels, projection)
+
+        points.append(
+            ScenarioFrontierPoint(
+                budget_delta_percent=delta,
+                total_spend=round(sum(channel["recommended_spend"] for channel in channels), 2),
+                projected_conversions=totals.get("projected_conversions", 0.0),
+                projected_cpa=totals.get("projected_cpa"),
+                allocations=[
+                    ScenarioFrontierAllocation(
+                        channel_name=channel["channel_name"],
+                        recommended_spend=round(float(channel["recommended_spend"]), 2),
+                        projected_conversions=_optional_round(projection.projected_conversions[idx]),
+                        projected_marginal_cpa=_optional_round(projection.projected_marginal_cpa[idx]),
+                    )
+                    for idx, channel in enumerate(channels)
+                ],
+            )
+        )
+
+    return ScenarioSweepResponse(current_total_spend=round(current_total, 2), points=points)
+
+
 @router.post("", response_model=ScenarioRecord)
 async def create_scenario(request: ScenarioCreateRequest):
     _validate_account_id(request.account_id)
@@ -308,9 +756,24 @@ async def create_scenario(request: ScenarioCreateRequest):
 
 
 @router.get("/{account_id}", response_model=ScenarioListResponse)
-async def get_scenarios(account_id: str):
+async def get_scenarios(
+    account_id: str,
+    response: Response,
+    if_none_match: str | None = Header(default=None),
+):
+    """
+    List an account's saved scenarios, newest first.
+
+    The `ETag` changes whenever a scenario is saved; sending it back in
+    `If-None-Match` returns 304 without reading the scenario payloads.
+    """
     _validate_account_id(account_id)
 
+    etag = make_etag("scenarios", account_id.lower(), fetch_scenarios_fingerprint(account_id))
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+
     scenarios = list_scenarios(account_id)
     return ScenarioListResponse(
         scenarios=[
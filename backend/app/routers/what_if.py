@@ -0,0 +1,192 @@
+import json
+import secrets
+
+import numpy as np
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
+
+from app.config import get_settings
+from app.models.schemas import WhatIfChannelResult, WhatIfRequest, WhatIfResponse
+from app.routers.analysis import (
+    _build_channel_target_overrides,
+    _resolve_channel_target_cpa,
+    cached_channel_fits,
+    compute_account_channel_analysis,
+)
+from app.services.fit_cache import FIT_CACHE, CachedAccountFits
+from app.services.hill_function import (
+    calculate_marginal_cpa_batch,
+    calculate_projected_conversions,
+    classify_traffic_lights,
+)
+
+router = APIRouter(prefix="/api/what-if", tags=["what-if"])
+
+
+def _cached_fits(request: WhatIfRequest) -> CachedAccountFits:
+    """
+    Fits for the account from the in-process cache. Only a cold account pays
+    for the database read and curve fitting, which also warms the cache.
+    """
+    cached = FIT_CACHE.get_account(request.account_id)
+    if cached is None:
+        computations = compute_account_channel_analysis(
+            account_id=request.account_id,
+            target_cpa=request.target_cpa,
+            target_cpa_overrides=request.target_cpa_overrides,
+        )
+        # An ingest during the fits keeps them out of the cache; this request
+        # still answers from them.
+        cached = FIT_CACHE.get_account(request.account_id) or CachedAccountFits(
+            channels=tuple(cached_channel_fits(computations))
+        )
+
+    if not cached.channels:
+        raise HTTPException(status_code=404, detail="No channels found for this account")
+    return cached
+
+
+async def _load_cached_fits(request: WhatIfRequest) -> CachedAccountFits:
+    """_cached_fits, with a cold account's read and fits run off the event loop."""
+    cached = FIT_CACHE.get_account(request.account_id)
+    if cached is not None and cached.channels:
+        return cached
+    return await run_in_threadpool(_cached_fits, request)
+
+
+def evaluate_what_if(
+    request: WhatIfRequest,
+    cached: CachedAccountFits,
+    increment: float,
+) -> WhatIfResponse:
+    """Evaluate a spend vector against cached fits with batched array math only."""
+    channels = cached.channels
+    known_keys = {channel.channel_name.strip().lower() for channel in channels}
+    spend_overrides = {name.strip().lower(): float(spend) for name, spend in request.spends.items()}
+
+    unknown = sorted(name for name in request.spends if name.strip().lower() not in known_keys)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown channels: {', '.join(unknown)}")
+    if any(spend < 0 for spend in spend_overrides.values()):
+        raise HTTPException(status_code=400, detail="Spend must be non-negative")
+
+    target_overrides = _build_channel_target_overrides(request.target_cpa_overrides)
+    spends = np.array(
+        [
+            spend_overrides.get(channel.channel_name.strip().lower(), channel.current_spend)
+            for channel in channels
+        ],
+        dtype=float,
+    )
+    targets = np.array(
+        [
+            _resolve_channel_target_cpa(channel.channel_name, request.target_cpa, target_overrides)[0]
+            for channel in channels
+        ],
+        dtype=float,
+    )
+
+    conversions = np.full(len(channels), np.nan)
+    marginal_cpas = np.full(len(channels), np.nan)
+    modeled = [idx for idx, channel in enumerate(channels) if channel.fit_result is not None]
+    if modeled:
+        params = [channels[idx].fit_result for idx in modeled]
+        priors = np.array([channels[idx].prior_adstock_state for idx in modeled], dtype=float)
+        conversions[modeled] = calculate_projected_conversions(params, spends[modeled], priors)
+        marginal_cpas[modeled] = calculate_marginal_cpa_batch(
+            params,
+            spends[modeled],
+            prior_adstock_states=priors,
+            increment=increment,
+        )
+    traffic_lights = classify_traffic_lights(marginal_cpas, targets)
+
+    modeled_mask = ~np.isnan(conversions)
+    total_conversions = float(conversions[modeled_mask].sum())
+    modeled_spend = float(spends[modeled_mask].sum())
+
+    return WhatIfResponse(
+        channels=[
+            WhatIfChannelResult(
+                channel_name=channel.channel_name,
+                spend=round(spend, 2),
+                current_spend=round(channel.current_spend, 2),
+                target_cpa=target,
+                marginal_cpa=None if np.isnan(marginal_cpa) else round(marginal_cpa, 2),
+                traffic_light=traffic_light,
+                projected_conversions=None if np.isnan(conversion) else round(conversion, 2),
+            )
+            for channel, spend, target, marginal_cpa, traffic_light, conversion in zip(
+                channels,
+                spends.tolist(),
+                targets.tolist(),
+                marginal_cpas.tolist(),
+                traffic_lights.tolist(),
+                conversions.tolist(),
+            )
+        ],
+        total_spend=round(float(spends.sum()), 2),
+        projected_conversions=round(total_conversions, 2),
+        projected_cpa=(
+            round(modeled_spend / total_conversions, 2) if total_conversions > 0 else None
+        ),
+        fitted_at=cached.fitted_at,
+    )
+
+
+@router.post("", response_model=WhatIfResponse)
+async def what_if(request: WhatIfRequest):
+    """
+    Per-channel marginal CPA, traffic light and projected conversions for an
+    edited spend vector, served from cached fits.
+    """
+    return evaluate_what_if(
+        request,
+        await _load_cached_fits(request),
+        increment=get_settings().marginal_increment,
+    )
+
+
+def _websocket_authorized(websocket: WebSocket) -> bool:
+    # HTTP middleware does not run for WebSocket upgrades, so check here.
+    settings = get_settings()
+    if not settings.require_api_key:
+        return True
+    provided_api_key = websocket.headers.get("X-API-Key") or websocket.query_params.get("api_key")
+    return bool(
+        settings.app_api_key
+        and provided_api_key is not None
+        and secrets.compare_digest(provided_api_key, settings.app_api_key)
+    )
+
+
+@router.websocket("/ws")
+async def what_if_socket(websocket: WebSocket):
+    """
+    Streaming variant of POST /api/what-if: each JSON message is a
+    WhatIfRequest and is answered with a WhatIfResponse or an error object.
+    """
+    if not _websocket_authorized(websocket):
+        await websocket.close(code=1008)
+        return
+
+    await websocket.accept()
+    increment = get_settings().marginal_increment
+    try:
+        while True:
+            payload = await websocket.receive_json()
+            try:
+                request = WhatIfRequest.model_validate(payload)
+                response = evaluate_what_if(request, await _load_cached_fits(request), increment=increment)
+            except ValidationError as exc:
+                await websocket.send_json(
+                    {"status_code": 422, "detail": json.loads(exc.json(include_url=False))}
+                )
+                continue
+            except HTTPException as exc:
+                await websocket.send_json({"status_code": exc.status_code, "detail": exc.detail})
+                continue
+            await websocket.send_text(response.model_dump_json())
+    except WebSocketDisconnect:
+        return
@@ -0,0 +1,61 @@
+"""
+Last computed account analysis per request shape, for stale-while-revalidate.
+
+Every analysis run records its channel results with the data fingerprint it
+was computed from. A request in stale-while-revalidate mode is answered from
+here straight away, flagged stale when the account's fingerprint has moved
+on, while a refresh recomputes in the background. Unlike the fit cache,
+ingestion does not drop entries: serving the previous answer after new data
+lands is the point.
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+import threading
+from typing import Any, Hashable, Optional
+
+MAX_SNAPSHOTS = 256
+
+
+@dataclass(frozen=True)
+class AnalysisSnapshot:
+    data_fingerprint: str
+    computations: tuple[Any, ...]
+    computed_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+
+    def age_seconds(self, now: Optional[datetime] = None) -> float:
+        now = now or datetime.now(timezone.utc)
+        return max((now - self.computed_at).total_seconds(), 0.0)
+
+
+class AnalysisSnapshotStore:
+    def __init__(self, max_entries: int = MAX_SNAPSHOTS):
+        self._lock = threading.Lock()
+        self._max_entries = max_entries
+        self._snapshots: OrderedDict[Hashable, AnalysisSnapshot] = OrderedDict()
+
+    def put(self, key: Hashable, snapshot: AnalysisSnapshot) -> None:
+        with self._lock:
+            current = self._snapshots.get(key)
+            # A slow run that started earlier must not replace a newer answer.
+            if current is not None and current.computed_at > snapshot.computed_at:
+                return
+            self._snapshots[key] = snapshot
+            self._snapshots.move_to_end(key)
+            while len(self._snapshots) > self._max_entries:
+                self._snapshots.popitem(last=False)
+
+    def get(self, key: Hashable) -> Optional[AnalysisSnapshot]:
+        with self._lock:
+            snapshot = self._snapshots.get(key)
+            if snapshot is not None:
+                self._snapshots.move_to_end(key)
+            return snapshot
+
+    def clear(self) -> None:
+        with self._lock:
+            self._snapshots.clear()
+
+
+ANALYSIS_SNAPSHOTS = AnalysisSnapshotStore()
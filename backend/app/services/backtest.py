@@ -0,0 +1,209 @@
+"""
+Rolling-origin backtests of the Hill fit.
+
+Each channel is refit on expanding windows and scored on the conversions of
+the days right after each window, using the spend actually observed there.
+Adstock for a given alpha depends only on past spend, so one pass over the
+full series per alpha serves every window's training prefix and its test
+continuation (with the carryover the training days leave behind). Only the
+first window runs the cold alpha grid search. Later windows warm-start
+curve_fit from the previous window's parameters and check only the
+neighbouring alphas.
+"""
+
+from concurrent.futures import BrokenExecutor
+from dataclasses import dataclass, field
+from typing import Optional
+
+import numpy as np
+
+from app.config import get_settings
+from app.services.hill_function import (
+    apply_adstock,
+    fit_hill_curve,
+    fit_hill_model,
+    hill_fit_bounds,
+    hill_function,
+)
+from app.services.process_pool import SharedProcessPool, resolve_workers
+
+
+@dataclass
+class BacktestWindow:
+    train_days: int
+    test_days: int
+    alpha: float
+    in_sample_r_squared: float
+    actual_conversions: float
+    predicted_conversions: float
+    mae: float
+    wape: Optional[float]
+
+
+@dataclass
+class ChannelBacktest:
+    channel_name: str
+    status: str
+    windows: list[BacktestWindow] = field(default_factory=list)
+    curve_fits: int = 0
+
+    @property
+    def mae(self) -> Optional[float]:
+        if not self.windows:
+            return None
+        return float(np.mean([window.mae for window in self.windows]))
+
+    @property
+    def wape(self) -> Optional[float]:
+        actual = sum(window.actual_conversions for window in self.windows)
+        if actual <= 0:
+            return None
+        return sum(window.mae * window.test_days for window in self.windows) / actual
+
+
+def rolling_origins(
+    days: int,
+    initial_train_days: int,
+    horizon_days: int,
+    step_days: Optional[int] = None,
+    max_windows: Optional[int] = None,
+) -> list[int]:
+    """Training-window lengths (test start days); `max_windows` keeps the latest."""
+    origins = list(range(initial_train_days, days - horizon_days + 1, step_days or horizon_days))
+    if max_windows is not None:
+        origins = origins[-max_windows:]
+    return origins
+
+
+def _r_squared(actual: np.ndarray, predicted: np.ndarray) -> float:
+    ss_tot = np.sum((actual - np.mean(actual)) ** 2)
+    return float(1 - np.sum((actual - predicted) ** 2) / ss_tot) if ss_tot > 0 else 0.0
+
+
+def backtest_channel(
+    channel_name: str,
+    spend: np.ndarray,
+    conversions: np.ndarray,
+    initial_train_days: int,
+    horizon_days: int,
+    step_days: Optional[int] = None,
+    max_windows: Optional[int] = None,
+) -> ChannelBacktest:
+    settings = get_settings()
+    spend = np.asarray(spend, dtype=float)
+    conversions = np.asarray(conversions, dtype=float)
+    origins = rolling_origins(spend.size, initial_train_days, horizon_days, step_days, max_windows)
+    if not origins:
+        return ChannelBacktest(
+            channel_name=channel_name,
+            status=f"insufficient_data: {spend.size} days < {initial_train_days + horizon_days} required",
+        )
+
+    alpha_grid = np.arange(settings.alpha_min, settings.alpha_max + settings.alpha_step, settings.alpha_step)
+    adstocked_by_alpha: dict[int, np.ndarray] = {}
+
+    def adstocked(alpha_index: int) -> np.ndarray:
+        if alpha_index not in adstocked_by_alpha:
+            adstocked_by_alpha[alpha_index] = apply_adstock(spend, alpha_grid[alpha_index])
+        return adstocked_by_alpha[alpha_index]
+
+    result = ChannelBacktest(channel_name=channel_name, status="success")
+    previous: Optional[tuple[int, np.ndarray]] = None
+    last_status = "success"
+
+    for origin in origins:
+        train_conversions = conversions[:origin]
+        best: Optional[tuple[float, int, np.ndarray]] = None
+
+        if previous is not None:
+            alpha_index, initial_guess = previous
+            for candidate in range(max(alpha_index - 1, 0), min(alpha_index + 2, alpha_grid.size)):
+                train_spend = adstocked(candidate)[:origin]
+                result.curve_fits += 1
+                try:
+                    popt, _ = fit_hill_curve(
+                        train_spend,
+                        train_conversions,
+                        initial_guess,
+                        hill_fit_bounds(train_spend, train_conversions),
+                    )
+                except (RuntimeError, ValueError):
+                    continue
+                r_squared = _r_squared(train_conversions, hill_function(train_spend, *popt))
+                if best is None or r_squared > best[0]:
+                    best = (r_squared, candidate, popt)
+
+        if best is None:
+            cold = fit_hill_model(spend[:origin], train_conversions)
+            result.curve_fits += alpha_grid.size
+            if cold.status != "success":
+                last_status = cold.status
+                continue
+            alpha_index = int(np.argmin(np.abs(alpha_grid - cold.alpha)))
+            best = (cold.r_squared, alpha_index, np.array([cold.max_yield, cold.beta, cold.kappa]))
+
+        r_squared, alpha_index, popt = best
+        previous = (alpha_index, popt)
+
+        test = slice(origin, origin + horizon_days)
+        actual = conversions[test]
+        predicted = hill_function(adstocked(alpha_index)[test], *popt)
+        actual_total = float(actual.sum())
+        absolute_error = float(np.abs(actual - predicted).sum())
+        result.windows.append(
+            BacktestWindow(
+                train_days=origin,
+                test_days=horizon_days,
+                alpha=float(alpha_grid[alpha_index]),
+                in_sample_r_squared=r_squared,
+                actual_conversions=actual_total,
+                predicted_conversions=float(predicted.sum()),
+                mae=absolute_error / horizon_days,
+                wape=absolute_error / actual_total if actual_total > 0 else None,
+            )
+        )
+
+    if not result.windows:
+        result.status = last_status
+    return result
+
+
+BACKTEST_POOL = SharedProcessPool()
+
+
+def shutdown_backtest_pool() -> None:
+    BACKTEST_POOL.shutdown()
+
+
+def run_backtests(
+    series: dict[str, tuple[np.ndarray, np.ndarray]],
+    initial_train_days: int,
+    horizon_days: int,
+    step_days: Optional[int] = None,
+    max_windows: Optional[int] = None,
+    workers: Optional[int] = None,
+) -> list[ChannelBacktest]:
+    """
+    Backtest every channel in `series` (channel -> (spend, conversions)).
+
+    Channels run in parallel on the shared backtest pool sized by `workers`
+    (falling back to BACKTEST_WORKERS); 0 workers or a single channel runs
+    inline.
+    """
+    workers = resolve_workers(get_settings().backtest_workers if workers is None else workers)
+    arguments = [
+        (channel_name, spend, conversions, initial_train_days, horizon_days, step_days, max_windows)
+        for channel_name, (spend, conversions) in series.items()
+    ]
+    if workers == 0 or len(arguments) <= 1:
+        return [backtest_channel(*args) for args in arguments]
+
+    try:
+        pool = BACKTEST_POOL.get(workers)
+        futures = [pool.submit(backtest_channel, *args) for args in arguments]
+        return [future.result() for future in futures]
+    except BrokenExecutor:
+        # A worker died (e.g. OOM-killed); start a fresh pool next time and
+        # finish this request inline.
+        shutdown_backtest_pool()
+        return [backtest_channel(*args) for args in arguments]
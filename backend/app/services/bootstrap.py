@@ -0,0 +1,176 @@
+"""
+Moving-block bootstrap of Hill fits for percentile marginal CPA bands.
+
+Days are resampled in contiguous blocks of the main fit's adstocked spend, so
+carryover inside each block is kept. Each resample is refit at the main fit's
+alpha, warm-started from its (max_yield, beta, kappa). Refits run in chunks on
+a shared process pool, and the call returns whatever draws have finished when
+its time budget runs out.
+"""
+
+from concurrent.futures import FIRST_COMPLETED, BrokenExecutor, Future, wait
+from dataclasses import dataclass
+import time
+from typing import Optional
+
+import numpy as np
+
+from app.config import get_settings
+from app.services.hill_function import HillFitResult, apply_adstock, fit_hill_curve, hill_fit_bounds
+from app.services.process_pool import SharedProcessPool, resolve_workers
+
+# Resamples start close to the optimum, so they need far fewer evaluations
+# than the cold grid search.
+BOOTSTRAP_MAXFEV = 500
+# Chunks per worker, so finished draws arrive steadily before the deadline.
+CHUNKS_PER_WORKER = 4
+# Chunks still running at the deadline stop after their current refit; this
+# is how long to wait for those partial results.
+DEADLINE_GRACE_SECONDS = 0.1
+
+
+@dataclass
+class BootstrapDraws:
+    """(max_yield, beta, kappa) refits sharing the main fit's alpha."""
+
+    draws: np.ndarray  # shape (completed, 3)
+    requested: int
+    timed_out: bool
+
+    @property
+    def completed(self) -> int:
+        return int(self.draws.shape[0])
+
+
+BOOTSTRAP_POOL = SharedProcessPool()
+
+
+def shutdown_bootstrap_pool() -> None:
+    BOOTSTRAP_POOL.shutdown()
+
+
+def moving_block_indices(
+    days: int,
+    block_days: int,
+    samples: int,
+    rng: np.random.Generator,
+) -> np.ndarray:
+    """Day indices for `samples` moving-block resamples, shape (samples, days)."""
+    block_days = max(1, min(block_days, days))
+    blocks = -(-days // block_days)
+    starts = rng.integers(0, days - block_days + 1, size=(samples, blocks))
+    indices = starts[..., None] + np.arange(block_days)
+    return indices.reshape(samples, -1)[:, :days]
+
+
+def _refit_resamples(
+    adstocked_spend: np.ndarray,
+    conversions: np.ndarray,
+    indices: np.ndarray,
+    initial_guess: tuple[float, float, float],
+    bounds: tuple[list[float], list[float]],
+    deadline: float,
+) -> np.ndarray:
+    draws: list[np.ndarray] = []
+    for sample in indices:
+        if time.monotonic() >= deadline:
+            break
+        try:
+            popt, _ = fit_hill_curve(
+                adstocked_spend[sample],
+                conversions[sample],
+                initial_guess,
+                bounds,
+                maxfev=BOOTSTRAP_MAXFEV,
+            )
+        except (RuntimeError, ValueError):
+            continue
+        draws.append(popt)
+    return np.array(draws, dtype=float).reshape(-1, 3)
+
+
+def bootstrap_hill_fit(
+    spend: np.ndarray,
+    conversions: np.ndarray,
+    fit_result: HillFitResult,
+    samples: Optional[int] = None,
+    time_budget_seconds: Optional[float] = None,
+    block_days: Optional[int] = None,
+    workers: Optional[int] = None,
+    seed: Optional[int] = None,
+) -> BootstrapDraws:
+    """
+    Refit `fit_result` on moving-block resamples of the channel history.
+
+    Unset arguments fall back to the bootstrap settings. With zero workers
+    the refits run inline in the calling process under the same deadline.
+    """
+    settings = get_settings()
+    samples = settings.bootstrap_samples if samples is None else samples
+    budget = settings.bootstrap_time_budget_seconds if time_budget_seconds is None else time_budget_seconds
+    block_days = settings.bootstrap_block_days if block_days is None else block_days
+    workers = resolve_workers(settings.bootstrap_workers if workers is None else workers)
+
+    if fit_result.status != "success" or samples <= 0:
+        return BootstrapDraws(draws=np.empty((0, 3)), requested=max(samples, 0), timed_out=False)
+
+    # CLOCK_MONOTONIC is system-wide, so pool workers can check the same deadline.
+    deadline = time.monotonic() + budget
+    spend = np.asarray(spend, dtype=float)
+    conversions = np.asarray(conversions, dtype=float)
+    adstocked_spend = apply_adstock(spend, fit_result.alpha)
+    initial_guess = (fit_result.max_yield, fit_result.beta, fit_result.kappa)
+    bounds = hill_fit_bounds(adstocked_spend, conversions)
+    indices = moving_block_indices(spend.size, block_days, samples, np.random.default_rng(seed))
+
+    if workers == 0:
+        draws = _refit_resamples(adstocked_spend, conversions, indices, initial_guess, bounds, deadline)
+        return BootstrapDraws(draws=draws, requested=samples, timed_out=time.monotonic() >= deadline)
+
+    chunks = np.array_split(indices, min(samples, workers * CHUNKS_PER_WORKER))
+    try:
+        pool = BOOTSTRAP_POOL.get(workers)
+        pending: dict[Future, np.ndarray] = {
+            pool.submit(_refit_resamples, adstocked_spend, conversions, chunk, initial_guess, bounds, deadline): chunk
+            for chunk in chunks
+        }
+    except BrokenExecutor:
+        # A worker died (e.g. OOM-killed); start a fresh pool next time and
+        # finish this request inline.
+        shutdown_bootstrap_pool()
+        draws = _refit_resamples(adstocked_spend, conversions, indices, initial_guess, bounds, deadline)
+        return BootstrapDraws(draws=draws, requested=samples, timed_out=time.monotonic() >= deadline)
+    finished: list[np.ndarray] = []
+    lost: list[np.ndarray] = []
+    timed_out = False
+    while pending:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            timed_out = True
+            # Queued chunks are dropped; running ones return what they have.
+            for future in [future for future in pending if future.cancel()]:
+                del pending[future]
+            done, _ = wait(pending, timeout=DEADLINE_GRACE_SECONDS)
+        else:
+            done, _ = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+        for future in done:
+            chunk = pending.pop(future)
+            error = future.exception()
+            if error is None:
+                finished.append(future.result())
+            elif isinstance(error, BrokenExecutor):
+                lost.append(chunk)
+        if timed_out:
+            break
+
+    if lost:
+        # The pool broke mid-request: replace it for later requests and refit
+        # the lost chunks here within what is left of the deadline.
+        shutdown_bootstrap_pool()
+        finished.append(
+            _refit_resamples(adstocked_spend, conversions, np.concatenate(lost), initial_guess, bounds, deadline)
+        )
+        timed_out = timed_out or time.monotonic() >= deadline
+
+    draws = np.concatenate(finished) if finished else np.empty((0, 3))
+    return BootstrapDraws(draws=draws, requested=samples, timed_out=timed_out)
@@ -0,0 +1,115 @@
+"""
+Budget allocation across channels on their fitted Hill curves.
+"""
+
+from typing import Optional, Sequence
+
+import numpy as np
+
+from app.services.hill_function import HillFitResult, MarginalCpaInverse
+
+MULTIPLIER_LOG_TOL = 1e-9
+
+
+def allocate_equal_marginal_cpa(
+    params: Sequence[HillFitResult],
+    target_cpas: float | np.ndarray,
+    budget: float,
+    prior_adstock_states: float | np.ndarray = 0.0,
+    increment: float = 0.10,
+    lower_bounds: Optional[np.ndarray] = None,
+    upper_bounds: Optional[np.ndarray] = None,
+    rtol: float = 1e-6,
+    max_iterations: int = 60,
+) -> np.ndarray:
+    """
+    Split `budget` so every channel's marginal CPA sits at the same multiple
+    of its own target CPA, within optional per-channel spend bounds.
+
+    Each channel's spend at a multiplier is its unconstrained spend there,
+    clipped to its bounds. Where the response curve is concave (beta <= 1, or
+    above the inflection point when beta > 1) that is the box-constrained
+    optimum. Hill curves with beta > 1 are S-shaped and not concave below the
+    inflection point: there the inverse only uses the concave, saturating
+    branch, so a channel either gets no spend (beyond its lower bound) or
+    spend past its cheapest marginal conversion, and it switches on with a
+    jump as the multiplier rises. The result is then a local allocation on
+    the concave branches, not a global optimum over the S-shaped curves.
+
+    The multiplier is found by a bracketed search in log space. Each step is
+    one vectorized inverse solve over all channels against a scan computed
+    once, so the cost is bounded by `max_iterations` regardless of budget
+    size or channel count. The final bracket is interpolated so the
+    allocation sums to `budget` exactly (which can leave a channel that is
+    switching on partway up its S-curve), unless the bounds make that
+    infeasible, in which case every channel sits at the binding bound.
+    """
+    num_channels = len(params)
+    if num_channels == 0:
+        return np.empty(0)
+
+    lower = np.zeros(num_channels) if lower_bounds is None else np.asarray(lower_bounds, dtype=float)
+    upper = np.full(num_channels, np.inf) if upper_bounds is None else np.asarray(upper_bounds, dtype=float)
+    if budget <= lower.sum():
+        return lower.copy()
+    if budget >= upper.sum():
+        return upper.copy()
+
+    targets = np.broadcast_to(np.asarray(target_cpas, dtype=float), (num_channels,))
+    inverse = MarginalCpaInverse(params, prior_adstock_states=prior_adstock_states, increment=increment)
+
+    def spends_at(multiplier: float) -> np.ndarray:
+        return np.clip(inverse.solve(targets * multiplier), lower, upper)
+
+    low = high = 1.0
+    low_spends = high_spends = spends_at(1.0)
+    for _ in range(max_iterations):
+        if high_spends.sum() >= budget:
+            break
+        low, low_spends = high, high_spends
+        high *= 2.0
+        high_spends = spends_at(high)
+    else:
+        return high_spends
+
+    for _ in range(max_iterations):
+        if low_spends.sum() <= budget:
+            break
+        high, high_spends = low, low_spends
+        low /= 2.0
+        low_spends = spends_at(low)
+
+    # Illinois-style regula falsi on log(multiplier): bracketing like bisection
+    # but converges superlinearly on the smooth budget curve. `*_weight` are
+    # the (possibly halved) secant ordinates; termination uses true totals.
+    low_excess = low_weight = low_spends.sum() - budget
+    high_excess = high_weight = high_spends.sum() - budget
+    side = 0
+    for _ in range(max_iterations):
+        log_low, log_high = np.log(low), np.log(high)
+        # A channel switching on (beta > 1) makes the total jump, so also stop
+        # once the multiplier itself is pinned down.
+        if high_excess - low_excess <= rtol * budget or log_high - log_low <= MULTIPLIER_LOG_TOL:
+            break
+
+        log_mid = log_high - high_weight * (log_high - log_low) / (high_weight - low_weight)
+        if not log_low < log_mid < log_high:
+            log_mid = 0.5 * (log_low + log_high)
+        mid = float(np.exp(log_mid))
+        mid_spends = spends_at(mid)
+        mid_excess = mid_spends.sum() - budget
+        if mid_excess <= 0:
+            low, low_spends, low_excess, low_weight = mid, mid_spends, mid_excess, mid_excess
+            if side == -1:
+                high_weight /= 2
+            side = -1
+        else:
+            high, high_spends, high_excess, high_weight = mid, mid_spends, mid_excess, mid_excess
+            if side == 1:
+                low_weight /= 2
+            side = 1
+
+    low_total = low_spends.sum()
+    span = high_spends.sum() - low_total
+    weight = float(np.clip((budget - low_total) / span, 0.0, 1.0)) if span > 0 else 0.0
+    return low_spends + weight * (high_spends - low_spends)
@@ -1,23 +1,40 @@
-from sqlalchemy import create_engine, select, desc, inspect, text
+from sqlalchemy import create_engine, delete, event, exists, func, or_, select, desc, inspect, insert, text, true, union_all, update
 from sqlalchemy.orm import sessionmaker, Session
 from functools import lru_cache
+import csv
+import hashlib
+import io
 import numpy as np
-from typing import Optional
+import pandas as pd
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import Iterable, Optional
 import uuid
 
 from app.config import get_settings
 from app.models.schemas import HillParameters
-from app.models.db_models import Base, Account, DailyMetric, MMMModel, Scenario
+from app.models.db_models import Base, Account, ChannelRefitRequest, DailyMetric, MMMModel, Scenario
+from app.services.hill_function import AdstockState, HillFitResult
+from app.services.metrics import record_db_round_trip
 
 
 DEFAULT_ACCOUNT_ID = uuid.UUID("a8465a7b-bf39-4352-9658-4f1b8d05b381")
 DEFAULT_ACCOUNT_NAME = "Demo Company"
 
 
+def _as_uuid(account_id: str | uuid.UUID) -> uuid.UUID:
+    """Coerce API-level account ids so UUID columns bind on every dialect."""
+    if isinstance(account_id, uuid.UUID):
+        return account_id
+    return uuid.UUID(str(account_id))
+
+
 @lru_cache
 def get_engine():
     settings = get_settings()
-    return create_engine(settings.database_url)
+    engine = create_engine(settings.database_url)
+    event.listen(engine, "before_cursor_execute", record_db_round_trip)
+    return engine
 
 
 def get_session() -> Session:
@@ -30,6 +47,8 @@ def init_db():
     engine = get_engine()
     Base.metadata.create_all(bind=engine)
     migrate_daily_metrics_revenue_to_conversions()
+    migrate_mmm_models_columns()
+    migrate_accounts_columns()
 
 
 def migrate_daily_metrics_revenue_to_conversions() -> bool:
@@ -56,6 +75,78 @@ def migrate_daily_metrics_revenue_to_conversions() -> bool:
     return False
 
 
+MMM_MODEL_ADDED_COLUMNS = {
+    "adstock_state": "DOUBLE PRECISION",
+    "adstock_prior_state": "DOUBLE PRECISION",
+    "adstock_last_date": "DATE",
+    "covariance": "JSONB",
+    "refit_requested_at": "TIMESTAMP WITH TIME ZONE",
+    "refit_attempts": "INTEGER NOT NULL DEFAULT 0",
+    "refit_retry_after": "TIMESTAMP WITH TIME ZONE",
+}
+
+
+def migrate_mmm_models_columns() -> bool:
+    """
+    Idempotent migration: add the stored adstock state, covariance and refit
+    marker (and refit attempt) columns to mmm_models.
+
+    Models stored before the refit marker existed are marked for one refit.
+    Returns True when any column was added, otherwise False.
+    """
+    engine = get_engine()
+    inspector = inspect(engine)
+
+    if not inspector.has_table("mmm_models"):
+        return False
+
+    column_names = {column["name"] for column in inspector.get_columns("mmm_models")}
+    missing = [name for name in MMM_MODEL_ADDED_COLUMNS if name not in column_names]
+    if missing:
+        with engine.begin() as connection:
+            for name in missing:
+                connection.execute(
+                    text(f"ALTER TABLE mmm_models ADD COLUMN {name} {MMM_MODEL_ADDED_COLUMNS[name]}")
+                )
+            if "refit_requested_at" in missing:
+                connection.execute(
+                    update(MMMModel).values(refit_requested_at=datetime.now(timezone.utc))
+                )
+    return bool(missing)
+
+
+def migrate_accounts_columns() -> bool:
+    """
+    Idempotent migration: add the model generation counter to accounts.
+
+    Returns True when the column was added, otherwise False.
+    """
+    engine = get_engine()
+    inspector = inspect(engine)
+
+    if not inspector.has_table("accounts"):
+        return False
+
+    column_names = {column["name"] for column in inspector.get_columns("accounts")}
+    if "model_generation" in column_names:
+        return False
+    with engine.begin() as connection:
+        connection.execute(
+            text("ALTER TABLE accounts ADD COLUMN model_generation INTEGER NOT NULL DEFAULT 0")
+        )
+    return True
+
+
+def _bump_model_generation(connection, account_ids: Iterable[uuid.UUID]) -> None:
+    """Move the fingerprint of accounts whose stored models changed outside an analysis."""
+    connection.execute(
+        update(Account)
+        .where(Account.id.in_(list(account_ids)))
+        .values(model_generation=Account.model_generation + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+
 def fetch_default_account() -> Account:
     """
     Get the default account. If none exists, create the seed account.
@@ -83,29 +174,30 @@ def fetch_default_account() -> Account:
 def fetch_daily_metrics(
     account_id: str,
     channel_name: str,
-) -> tuple[np.ndarray, np.ndarray]:
+) -> tuple[np.ndarray, np.ndarray, Optional[date]]:
     """
     Fetch daily spend and conversions for a channel, ordered by date.
-    Returns (spend_array, conversions_array)
+    Returns (spend_array, conversions_array, last_date), where last_date is
+    the date of the final row of this same read (None without rows).
     """
     session = get_session()
     try:
         stmt = (
-            select(DailyMetric.spend, DailyMetric.conversions)
-            .where(DailyMetric.account_id == account_id)
+            select(DailyMetric.spend, DailyMetric.conversions, DailyMetric.date)
+            .where(DailyMetric.account_id == _as_uuid(account_id))
             .where(DailyMetric.channel_name == channel_name)
             .order_by(DailyMetric.date)
         )
         result = session.execute(stmt).all()
         
         if not result:
-            return np.array([]), np.array([])
+            return np.array([]), np.array([]), None
         
-        # result is list of tuples (spend, conversions)
+        # result is list of tuples (spend, conversions, date)
         spend = np.array([float(row[0] or 0) for row in result])
         conversions = np.array([float(row[1] or 0) for row in result])
 
-        return spend, conversions
+        return spend, conversions, result[-1][2]
     finally:
         session.close()
 
@@ -116,7 +208,7 @@ def fetch_channels_for_account(account_id: str) -> list[str]:
     try:
         stmt = (
             select(DailyMetric.channel_name)
-            .where(DailyMetric.account_id == account_id)
+            .where(DailyMetric.account_id == _as_uuid(account_id))
             .distinct()
         )
         result = session.execute(stmt).scalars().all()
@@ -131,7 +223,7 @@ def get_current_spend(account_id: str, channel_name: str) -> float:
     try:
         stmt = (
             select(DailyMetric.spend)
-            .where(DailyMetric.account_id == account_id)
+            .where(DailyMetric.account_id == _as_uuid(account_id))
             .where(DailyMetric.channel_name == channel_name)
             .order_by(desc(DailyMetric.date))
             .limit(1)
@@ -142,21 +234,80 @@ def get_current_spend(account_id: str, channel_name: str) -> float:
         session.close()
 
 
+def _stored_adstock_state(model: MMMModel) -> Optional[AdstockState]:
+    if model.adstock_last_date is None or model.adstock_state is None:
+        return None
+    return AdstockState(
+        alpha=float(model.alpha),
+        state=float(model.adstock_state),
+        prior_state=float(model.adstock_prior_state or 0.0),
+        last_date=model.adstock_last_date,
+    )
+
+
+def _store_adstock_state(model: MMMModel, adstock: Optional[AdstockState]) -> None:
+    model.adstock_state = adstock.state if adstock else None
+    model.adstock_prior_state = adstock.prior_state if adstock else None
+    model.adstock_last_date = adstock.last_date if adstock else None
+
+
+def _catch_up_adstock_state(session: Session, model: MMMModel, adstock: AdstockState) -> AdstockState:
+    """Fold any days stored after the state's last date into it."""
+    rows = session.execute(
+        select(DailyMetric.date, DailyMetric.spend)
+        .where(DailyMetric.account_id == model.account_id)
+        .where(DailyMetric.channel_name == model.channel_name)
+        .where(DailyMetric.date > adstock.last_date)
+        .order_by(DailyMetric.date)
+    ).all()
+    if not rows:
+        return adstock
+    return adstock.advance([float(row.spend or 0) for row in rows], rows[-1].date)
+
+
+def _covariance_json(covariance: Optional[np.ndarray]) -> Optional[list[list[float]]]:
+    return np.asarray(covariance, dtype=float).tolist() if covariance is not None else None
+
+
 def save_model_params(
     account_id: str,
     channel_name: str,
     params: HillParameters,
-) -> None:
-    """Save or update model parameters in mmm_models table."""
+    spend_history: Optional[np.ndarray] = None,
+    covariance: Optional[np.ndarray] = None,
+    data_read_at: Optional[datetime] = None,
+    history_last_date: Optional[date] = None,
+    bump_model_generation: bool = False,
+) -> Optional[AdstockState]:
+    """
+    Save or update model parameters in mmm_models table.
+
+    With `spend_history` (the date-ordered spend the fit used) and
+    `history_last_date` (the date of its last day, from the same read), also
+    bring the stored end-of-history adstock state up to date for the fitted
+    alpha and return it. A state already kept for that alpha only folds in
+    days after its last date; a new alpha is rebuilt from the history once.
+
+    `data_read_at` is when the fit's data was read. A refit marker or
+    first-fit request set before then is cleared; one set later (data
+    ingested mid-fit) is kept.
+
+    Background refits pass `bump_model_generation` so analyses computed from
+    the previous fit stop matching the data fingerprint; an analysis saving
+    the fit it just computed does not.
+    """
     session = get_session()
     try:
         # Check if model exists
         stmt = (
             select(MMMModel)
-            .where(MMMModel.account_id == account_id)
+            .where(MMMModel.account_id == _as_uuid(account_id))
             .where(MMMModel.channel_name == channel_name)
         )
         existing_model = session.execute(stmt).scalar_one_or_none()
+        stored_adstock = None
+        if existing_model is not None and np.isclose(float(existing_model.alpha), params.alpha, atol=5e-5):
+            stored_adstock = _stored_adstock_state(existing_model)
         
         if existing_model:
             # Update
@@ -165,20 +316,366 @@ def save_model_params(
             existing_model.kappa = params.kappa
             existing_model.max_yield = params.max_yield
             existing_model.r_squared = params.r_squared
+            existing_model.covariance = _covariance_json(covariance)
+            model = existing_model
         else:
             # Insert
-            new_model = MMMModel(
-                account_id=account_id,
+            model = MMMModel(
+                account_id=_as_uuid(account_id),
                 channel_name=channel_name,
                 alpha=params.alpha,
                 beta=params.beta,
                 kappa=params.kappa,
                 max_yield=params.max_yield,
                 r_squared=params.r_squared,
+                covariance=_covariance_json(covariance),
+            )
+            session.add(model)
+
+        adstock = None
+        if stored_adstock is not None:
+            adstock = _catch_up_adstock_state(session, model, stored_adstock)
+        elif spend_history is not None and len(spend_history) > 0 and history_last_date is not None:
+            # Days ingested since the history was read are folded in by the
+            # catch-up, so the state must not claim to cover them already.
+            adstock = _catch_up_adstock_state(
+                session,
+                model,
+                AdstockState.from_history(params.alpha, spend_history, history_last_date),
             )
-            session.add(new_model)
+        if adstock is not None:
+            _store_adstock_state(model, adstock)
+        if data_read_at is not None and model.refit_requested_at is not None:
+            session.flush()
+            session.execute(
+                update(MMMModel)
+                .where(MMMModel.id == model.id)
+                .where(MMMModel.refit_requested_at <= data_read_at)
+                .values(refit_requested_at=None)
+                .execution_options(synchronize_session=False)
+            )
+        if data_read_at is not None:
+            _clear_refit_requests(session, account_id, channel_name, data_read_at)
+        if bump_model_generation:
+            _bump_model_generation(session, [_as_uuid(account_id)])
         
         session.commit()
+        return adstock
+    finally:
+        session.close()
+
+
+def _clear_refit_requests(
+    session: Session,
+    account_id: str,
+    channel_name: str,
+    data_read_at: datetime,
+) -> None:
+    session.execute(
+        delete(ChannelRefitRequest)
+        .where(ChannelRefitRequest.account_id == _as_uuid(account_id))
+        .where(ChannelRefitRequest.channel_name == channel_name)
+        .where(ChannelRefitRequest.requested_at <= data_read_at)
+    )
+
+
+def mark_channels_changed(
+    session: Session,
+    account_id: uuid.UUID,
+    earliest_dates: dict[str, date],
+) -> None:
+    """
+    Record an ingest into `session` against the channels' stored models.
+
+    `earliest_dates` maps each ingested channel to its earliest ingested day.
+    Each stored model is marked for refit. Its adstock state folds in days
+    after its last date; a write at or before that date rewrites history, so
+    the state is cleared and rebuilt on the next fit. Channels without a
+    stored model (a first import) get a first-fit request instead. New data
+    resets the refit attempt count, so a channel whose refits kept failing is
+    tried again. The account's model generation is bumped.
+    """
+    requested_at = datetime.now(timezone.utc)
+    channel_names = list(earliest_dates)
+    _bump_model_generation(session, [account_id])
+    models = session.execute(
+        select(MMMModel).where(
+            MMMModel.account_id == account_id,
+            MMMModel.channel_name.in_(channel_names),
+        )
+    ).scalars().all()
+
+    for model in models:
+        model.refit_requested_at = requested_at
+        model.refit_attempts = 0
+        adstock = _stored_adstock_state(model)
+        if adstock is None:
+            continue
+        if earliest_dates[model.channel_name] <= adstock.last_date:
+            _store_adstock_state(model, None)
+        else:
+            session.flush()
+            _store_adstock_state(model, _catch_up_adstock_state(session, model, adstock))
+
+    modelled = {model.channel_name for model in models}
+    new_channels = [name for name in channel_names if name not in modelled]
+    if not new_channels:
+        return
+    requests = {
+        request.channel_name: request
+        for request in session.execute(
+            select(ChannelRefitRequest).where(
+                ChannelRefitRequest.account_id == account_id,
+                ChannelRefitRequest.channel_name.in_(new_channels),
+            )
+        ).scalars()
+    }
+    for channel_name in new_channels:
+        request = requests.get(channel_name)
+        if request is None:
+            session.add(
+                ChannelRefitRequest(
+                    account_id=account_id,
+                    channel_name=channel_name,
+                    requested_at=requested_at,
+                )
+            )
+        else:
+            request.requested_at = requested_at
+            request.attempts = 0
+
+@dataclass(frozen=True)
+class StoredChannelFit:
+    channel_name: str
+    fit_result: HillFitResult
+    adstock: Optional[AdstockState]
+
+
+def fetch_stored_fits(account_id: str) -> dict[str, StoredChannelFit]:
+    """
+    Stored fits that are current with the channel's data, by channel name.
+
+    Channels marked for refit (or with a pending first-fit request), or
+    whose adstock state was cleared, are left out so callers fit them from
+    the data instead.
+    """
+    session = get_session()
+    try:
+        models = session.execute(
+            select(MMMModel)
+            .where(MMMModel.account_id == _as_uuid(account_id))
+            .where(MMMModel.refit_requested_at.is_(None))
+            .where(MMMModel.adstock_last_date.is_not(None))
+            .where(
+                ~exists()
+                .where(ChannelRefitRequest.account_id == MMMModel.account_id)
+                .where(ChannelRefitRequest.channel_name == MMMModel.channel_name)
+            )
+        ).scalars()
+        return {
+            model.channel_name: StoredChannelFit(
+                channel_name=model.channel_name,
+                fit_result=HillFitResult(
+                    alpha=float(model.alpha),
+                    beta=float(model.beta),
+                    kappa=float(model.kappa),
+                    max_yield=float(model.max_yield),
+                    r_squared=float(model.r_squared),
+                    status="success",
+                    covariance=np.array(model.covariance, dtype=float) if model.covariance else None,
+                ),
+                adstock=_stored_adstock_state(model),
+            )
+            for model in models
+        }
+    finally:
+        session.close()
+
+
+def fetch_data_fingerprint(account_id: str) -> str:
+    """
+    Digest of the inputs an account analysis depends on: per-channel daily
+    metric aggregates (row count, date span, spend / conversion / impression
+    totals) and the account's model generation.
+
+    Stored model columns are deliberately left out: an analysis saves the fit
+    it computes, and hashing that write would make its own snapshot stale.
+    Model changes made outside an analysis (ingest marks, background refits)
+    bump the generation instead. Equal fingerprints mean an analysis would
+    see the same inputs; any import, sync, backfill or background refit
+    changes it.
+    """
+    account_uuid = _as_uuid(account_id)
+    session = get_session()
+    try:
+        metrics = session.execute(
+            select(
+                DailyMetric.channel_name,
+                func.count(),
+                func.min(DailyMetric.date),
+                func.max(DailyMetric.date),
+                func.sum(DailyMetric.spend),
+                func.sum(DailyMetric.conversions),
+                func.sum(DailyMetric.impressions),
+            )
+            .where(DailyMetric.account_id == account_uuid)
+            .group_by(DailyMetric.channel_name)
+            .order_by(DailyMetric.channel_name)
+        ).all()
+        model_generation = session.execute(
+            select(Account.model_generation).where(Account.id == account_uuid)
+        ).scalar_one_or_none()
+    finally:
+        session.close()
+
+    digest = hashlib.sha256()
+    for row in [*metrics, None, (model_generation,)]:
+        digest.update(repr(tuple(row) if row is not None else None).encode())
+    return digest.hexdigest()[:32]
+
+
+def fetch_refit_backlog(
+    account_id: Optional[str] = None,
+    limit: Optional[int] = None,
+    due_at: Optional[datetime] = None,
+) -> list[tuple[str, str, datetime]]:
+    """
+    (account_id, channel_name, requested_at) of marked models and of
+    channels waiting for a first fit, oldest first.
+
+    With `due_at`, only marks a worker may claim at that time: not held by
+    another worker or backing off, and under `refit_max_attempts`.
+    """
+    session = get_session()
+    try:
+        marked = union_all(
+            select(
+                MMMModel.account_id,
+                MMMModel.channel_name,
+                MMMModel.refit_requested_at.label("requested_at"),
+                MMMModel.refit_attempts.label("attempts"),
+                MMMModel.refit_retry_after.label("retry_after"),
+            ).where(MMMModel.refit_requested_at.is_not(None)),
+            select(
+                ChannelRefitRequest.account_id,
+                ChannelRefitRequest.channel_name,
+                ChannelRefitRequest.requested_at,
+                ChannelRefitRequest.attempts,
+                ChannelRefitRequest.retry_after,
+            ),
+        ).subquery()
+        stmt = select(
+            marked.c.account_id, marked.c.channel_name, marked.c.requested_at
+        ).order_by(marked.c.requested_at)
+        if account_id is not None:
+            stmt = stmt.where(marked.c.account_id == _as_uuid(account_id))
+        if due_at is not None:
+            stmt = stmt.where(
+                marked.c.attempts < get_settings().refit_max_attempts,
+                or_(marked.c.retry_after.is_(None), marked.c.retry_after <= due_at),
+            )
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        return [
+            (str(row.account_id), row.channel_name, row.requested_at)
+            for row in session.execute(stmt)
+        ]
+    finally:
+        session.close()
+
+
+# (table, attempts, retry_after, marked) for both kinds of refit mark.
+_REFIT_MARKS = (
+    (
+        MMMModel,
+        MMMModel.refit_attempts,
+        MMMModel.refit_retry_after,
+        MMMModel.refit_requested_at.is_not(None),
+    ),
+    (ChannelRefitRequest, ChannelRefitRequest.attempts, ChannelRefitRequest.retry_after, true()),
+)
+
+
+def claim_refit(account_id: str, channel_name: str) -> Optional[int]:
+    """
+    Claim a channel's refit mark for this worker and return the attempt number.
+
+    The claim is a conditional UPDATE that holds the mark for
+    `refit_lease_seconds`, so of several workers (or app processes) only one
+    refits a channel. Returns None when the mark is gone, held by another
+    worker, backing off or out of attempts.
+    """
+    settings = get_settings()
+    now = datetime.now(timezone.utc)
+    held_until = now + timedelta(seconds=settings.refit_lease_seconds)
+    account_uuid = _as_uuid(account_id)
+    session = get_session()
+    try:
+        for table, attempts, retry_after, marked in _REFIT_MARKS:
+            claimed = session.execute(
+                update(table)
+                .where(table.account_id == account_uuid)
+                .where(table.channel_name == channel_name)
+                .where(marked)
+                .where(attempts < settings.refit_max_attempts)
+                .where(or_(retry_after.is_(None), retry_after <= now))
+                .values({attempts: attempts + 1, retry_after: held_until})
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            if claimed:
+                session.commit()
+                return session.execute(
+                    select(attempts)
+                    .where(table.account_id == account_uuid)
+                    .where(table.channel_name == channel_name)
+                ).scalar_one()
+        return None
+    finally:
+        session.close()
+
+
+def release_refit(account_id: str, channel_name: str, retry_after: Optional[datetime] = None) -> None:
+    """
+    Release a claimed refit mark.
+
+    After a failed attempt pass the backoff `retry_after`; without it the
+    attempt count is reset, so a mark set again mid-fit is due at once.
+    """
+    session = get_session()
+    try:
+        for table, attempts, retry_after_column, _ in _REFIT_MARKS:
+            values = {retry_after_column: retry_after}
+            if retry_after is None:
+                values[attempts] = 0
+            session.execute(
+                update(table)
+                .where(table.account_id == _as_uuid(account_id))
+                .where(table.channel_name == channel_name)
+                .values(values)
+                .execution_options(synchronize_session=False)
+            )
+        session.commit()
+    finally:
+        session.close()
+
+
+def discard_model_params(account_id: str, channel_name: str, data_read_at: datetime) -> None:
+    """
+    Delete a marked model (or first-fit request) whose refit from data read
+    at `data_read_at` failed. Only the refit worker discards models, so the
+    account's model generation moves with it.
+    """
+    session = get_session()
+    try:
+        session.execute(
+            delete(MMMModel)
+            .where(MMMModel.account_id == _as_uuid(account_id))
+            .where(MMMModel.channel_name == channel_name)
+            .where(MMMModel.refit_requested_at <= data_read_at)
+        )
+        _clear_refit_requests(session, account_id, channel_name, data_read_at)
+        _bump_model_generation(session, [_as_uuid(account_id)])
+        session.commit()
     finally:
         session.close()
 
@@ -192,7 +689,7 @@ def get_model_params(
     try:
         stmt = (
             select(MMMModel)
-            .where(MMMModel.account_id == account_id)
+            .where(MMMModel.account_id == _as_uuid(account_id))
             .where(MMMModel.channel_name == channel_name)
         )
         model = session.execute(stmt).scalar_one_or_none()
@@ -238,7 +735,7 @@ def save_scenario(
     session = get_session()
     try:
         scenario = Scenario(
-            account_id=account_id,
+            account_id=_as_uuid(account_id),
             name=name,
             budget_allocation=budget_allocation,
         )
@@ -256,9 +753,165 @@ def list_scenarios(account_id: str) -> list[Scenario]:
     try:
         stmt = (
             select(Scenario)
-            .where(Scenario.account_id == account_id)
+            .where(Scenario.account_id == _as_uuid(account_id))
             .order_by(desc(Scenario.created_at))
         )
         return list(session.execute(stmt).scalars().all())
     finally:
         session.close()
+
+
+def fetch_scenarios_fingerprint(account_id: str) -> str:
+    """
+    Digest of an account's scenario ids and update times, read without
+    loading any budget_allocation payloads. Saving a scenario changes it.
+    """
+    session = get_session()
+    try:
+        rows = session.execute(
+            select(Scenario.id, Scenario.created_at, Scenario.updated_at)
+            .where(Scenario.account_id == _as_uuid(account_id))
+            .order_by(desc(Scenario.created_at), Scenario.id)
+        ).all()
+    finally:
+        session.close()
+
+    digest = hashlib.sha256()
+    for row in rows:
+        digest.update(repr(tuple(row)).encode())
+    return digest.hexdigest()[:32]
+
+
+def _request_first_fits(
+    connection,
+    frame: pd.DataFrame,
+    account_ids: set[uuid.UUID],
+    requested_at: datetime,
+) -> None:
+    """Request a first fit for every bulk-loaded channel without a stored model."""
+    pairs = frame[["account_id", "channel_name"]].drop_duplicates()
+    channels = {
+        (uuid.UUID(str(account_id)), str(channel_name))
+        for account_id, channel_name in pairs.itertuples(index=False)
+    }
+    covered = set(
+        connection.execute(
+            select(MMMModel.account_id, MMMModel.channel_name)
+            .where(MMMModel.account_id.in_(account_ids))
+        ).tuples()
+    )
+    connection.execute(
+        update(ChannelRefitRequest)
+        .where(ChannelRefitRequest.account_id.in_(account_ids))
+        .values(requested_at=requested_at)
+    )
+    covered |= set(
+        connection.execute(
+            select(ChannelRefitRequest.account_id, ChannelRefitRequest.channel_name)
+            .where(ChannelRefitRequest.account_id.in_(account_ids))
+        ).tuples()
+    )
+    missing = [
+        {"account_id": account_id, "channel_name": channel_name, "requested_at": requested_at}
+        for account_id, channel_name in sorted(channels - covered)
+    ]
+    if missing:
+        connection.execute(insert(ChannelRefitRequest), missing)
+
+
+def _copy_daily_metrics_postgres(connection, frame: pd.DataFrame) -> None:
+    """Stream rows through COPY into a staging table, then merge in one statement."""
+    buffer = io.StringIO()
+    frame.to_csv(
+        buffer,
+        columns=["account_id", "date", "channel_name", "spend", "conversions", "impressions"],
+        header=False,
+        index=False,
+        quoting=csv.QUOTE_MINIMAL,
+    )
+    buffer.seek(0)
+
+    connection.exec_driver_sql(
+        "CREATE TEMP TABLE IF NOT EXISTS daily_metrics_staging "
+        "(account_id UUID, date DATE, channel_name TEXT, spend NUMERIC(10, 2), "
+        "conversions NUMERIC(10, 2), impressions INTEGER) ON COMMIT DROP"
+    )
+    cursor = connection.connection.cursor()
+    try:
+        cursor.copy_expert(
+            "COPY daily_metrics_staging "
+            "(account_id, date, channel_name, spend, conversions, impressions) "
+            "FROM STDIN WITH (FORMAT csv)",
+            buffer,
+        )
+    finally:
+        cursor.close()
+
+    connection.exec_driver_sql(
+        "INSERT INTO daily_metrics "
+        "(id, account_id, date, channel_name, spend, conversions, impressions) "
+        "SELECT gen_random_uuid(), account_id, date, channel_name, spend, conversions, impressions "
+        "FROM daily_metrics_staging "
+        "ON CONFLICT (account_id, date, channel_name) DO NOTHING"
+    )
+
+
+def bulk_insert_daily_metrics(
+    frames: Iterable[pd.DataFrame],
+    account_name: str = "Synthetic Account",
+) -> int:
+    """
+    Insert new daily_metrics rows in bulk, creating any missing accounts.
+
+    Postgres uses COPY through a staging table and skips rows that already
+    exist; other dialects fall back to executemany inserts, which assume the
+    rows are new. Returns the number of rows submitted.
+    """
+    engine = get_engine()
+    total_rows = 0
+
+    for frame in frames:
+        if frame.empty:
+            continue
+
+        account_ids = {uuid.UUID(str(value)) for value in frame["account_id"].unique()}
+        with engine.begin() as connection:
+            existing = set(
+                connection.execute(
+                    select(Account.id).where(Account.id.in_(account_ids))
+                ).scalars()
+            )
+            missing = [
+                {"id": account_id, "name": account_name}
+                for account_id in sorted(account_ids - existing)
+            ]
+            if missing:
+                connection.execute(insert(Account), missing)
+            # Bulk rows may land anywhere in history; every stored model for
+            # these accounts is marked for refit and its adstock state rebuilt.
+            requested_at = datetime.now(timezone.utc)
+            connection.execute(
+                update(MMMModel)
+                .where(MMMModel.account_id.in_(account_ids))
+                .values(
+                    adstock_state=None,
+                    adstock_prior_state=None,
+                    adstock_last_date=None,
+                    refit_requested_at=requested_at,
+                )
+            )
+            _request_first_fits(connection, frame, account_ids, requested_at)
+            _bump_model_generation(connection, account_ids)
+
+            if connection.dialect.name == "postgresql":
+                _copy_daily_metrics_postgres(connection, frame)
+            else:
+                records = frame.assign(
+                    account_id=frame["account_id"].map(lambda value: uuid.UUID(str(value))),
+                    channel_name=frame["channel_name"].astype(str),
+                ).to_dict("records")
+                connection.execute(insert(DailyMetric), records)
+
+        total_rows += len(frame)
+
+    return total_rows
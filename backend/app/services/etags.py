@@ -0,0 +1,40 @@
+"""
+Entity tags for conditional requests.
+
+Tags are weak (`W/"..."`): they are derived from the inputs a response is
+built from (data fingerprints and request parameters), not from its bytes,
+and fields such as `age_seconds` change between otherwise equal responses.
+`If-None-Match` therefore uses the weak comparison: the opaque tags must
+match, with or without the `W/` prefix.
+"""
+
+import hashlib
+from typing import Any, Optional
+
+from fastapi import Response
+
+
+def make_etag(*parts: Any) -> str:
+    digest = hashlib.sha256(repr(parts).encode()).hexdigest()[:32]
+    return f'W/"{digest}"'
+
+
+def _opaque_tag(tag: str) -> str:
+    tag = tag.strip()
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    return tag
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an `If-None-Match` header names `etag` (or is `*`)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    wanted = _opaque_tag(etag)
+    return any(_opaque_tag(candidate) == wanted for candidate in if_none_match.split(","))
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
@@ -0,0 +1,86 @@
+"""
+In-process cache of the latest fitted curves per account.
+
+Analysis runs populate it; read-only consumers such as the what-if simulator
+evaluate against it without touching the database or SciPy. Ingestion
+invalidates an account so stale fits are never served after new data lands.
+Each invalidation bumps the account's generation; a put made from data read
+under an older generation is dropped instead of re-caching pre-ingest fits.
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+import threading
+from typing import Optional
+import uuid
+
+from app.services.hill_function import HillFitResult
+
+
+@dataclass(frozen=True)
+class CachedChannelFit:
+    channel_name: str
+    fit_result: Optional[HillFitResult]
+    prior_adstock_state: float
+    current_spend: float
+
+
+@dataclass(frozen=True)
+class CachedAccountFits:
+    channels: tuple[CachedChannelFit, ...]
+    fitted_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+def _account_key(account_id) -> str:
+    # Imports pass UUID objects, API requests pass strings in any case.
+    try:
+        return str(uuid.UUID(str(account_id)))
+    except ValueError:
+        return str(account_id)
+
+
+class FitCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._accounts: dict[str, CachedAccountFits] = {}
+        self._generations: dict[str, int] = {}
+
+    def generation(self, account_id: str) -> int:
+        """Read before fetching an account's data; pass to put_account."""
+        with self._lock:
+            return self._generations.get(_account_key(account_id), 0)
+
+    def put_account(
+        self,
+        account_id: str,
+        channels: list[CachedChannelFit],
+        generation: Optional[int] = None,
+    ) -> Optional[CachedAccountFits]:
+        """
+        Cache an account's fits. Returns None, caching nothing, when the
+        account was invalidated after `generation` was read.
+        """
+        key = _account_key(account_id)
+        entry = CachedAccountFits(channels=tuple(channels))
+        with self._lock:
+            if generation is not None and self._generations.get(key, 0) != generation:
+                return None
+            self._accounts[key] = entry
+        return entry
+
+    def get_account(self, account_id: str) -> Optional[CachedAccountFits]:
+        with self._lock:
+            return self._accounts.get(_account_key(account_id))
+
+    def invalidate(self, account_id: str) -> None:
+        key = _account_key(account_id)
+        with self._lock:
+            self._accounts.pop(key, None)
+            self._generations[key] = self._generations.get(key, 0) + 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._accounts.clear()
+
+
+FIT_CACHE = FitCache()
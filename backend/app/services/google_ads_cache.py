@@ -0,0 +1,184 @@
+from datetime import date, datetime, timedelta
+import hashlib
+import os
+from pathlib import Path
+import tempfile
+import time
+from typing import Callable, Optional
+
+import numpy as np
+
+from app.services.google_ads_provider_types import (
+    GoogleAdsMetricRow,
+    GoogleAdsProvider,
+    normalize_customer_id,
+)
+from app.services.metrics import PROVIDER_CACHE_REQUESTS
+
+
+def _month_windows(date_from: date, date_to: date) -> list[tuple[date, date]]:
+    """Split a date range into calendar-month windows that cover it."""
+    windows: list[tuple[date, date]] = []
+    window_start = date_from.replace(day=1)
+    while window_start <= date_to:
+        next_month = (window_start.replace(day=28) + timedelta(days=4)).replace(day=1)
+        windows.append((window_start, next_month - timedelta(days=1)))
+        window_start = next_month
+    return windows
+
+
+class CachingGoogleAdsProvider:
+    """
+    Record-and-replay wrapper around any Google Ads provider.
+
+    Responses are stored on disk per calendar-month window as compressed
+    columnar `.npz` files keyed by (customer_id, provider key, window), where
+    the provider key is its `cache_key` (the mock's scale settings) or its
+    query template, so differently configured providers never share entries.
+    Windows that were fetched before they settled (within `recent_days` of
+    today, where Google Ads may still restate conversions) expire after
+    `recent_ttl_seconds`; settled windows are replayed indefinitely.
+    """
+
+    def __init__(
+        self,
+        provider: GoogleAdsProvider,
+        cache_dir: str | Path,
+        recent_days: int = 3,
+        recent_ttl_seconds: int = 3600,
+        today: Optional[Callable[[], date]] = None,
+        clock: Optional[Callable[[], float]] = None,
+    ):
+        self._provider = provider
+        self._cache_dir = Path(cache_dir)
+        self._recent_days = recent_days
+        self._recent_ttl_seconds = recent_ttl_seconds
+        self._today = today or date.today
+        self._clock = clock or time.time
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def provider_mode(self) -> str:
+        return self._provider.provider_mode
+
+    @property
+    def _provider_key(self) -> str:
+        cache_key = getattr(self._provider, "cache_key", None)
+        if cache_key is not None:
+            return cache_key
+        return getattr(self._provider, "query_template", self._provider.provider_mode)
+
+    def _entry_path(self, customer_id: str, window: tuple[date, date]) -> Path:
+        key = "|".join(
+            [customer_id, self._provider_key, window[0].isoformat(), window[1].isoformat()]
+        )
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
+        return self._cache_dir / f"{digest}.npz"
+
+    def _is_fresh(self, window_end: date, fetched_at: float) -> bool:
+        settled_on = window_end + timedelta(days=self._recent_days)
+        fetched_on = datetime.fromtimestamp(fetched_at).date()
+        if fetched_on > settled_on:
+            return True
+        return (self._clock() - fetched_at) < self._recent_ttl_seconds
+
+    def _load(self, path: Path, window_end: date) -> Optional[list[GoogleAdsMetricRow]]:
+        if not path.exists():
+            return None
+
+        try:
+            with np.load(path, allow_pickle=False) as entry:
+                if not self._is_fresh(window_end, float(entry["fetched_at"])):
+                    return None
+                channel_names = entry["channel_names"].tolist()
+                campaign_names = [None, *entry["campaign_names"].tolist()]
+                return [
+                    GoogleAdsMetricRow(
+                        date=date.fromordinal(ordinal),
+                        channel_name=channel_names[code],
+                        spend=spend,
+                        conversions=conversions,
+                        impressions=impressions,
+                        campaign_name=campaign_names[campaign_code],
+                    )
+                    for ordinal, code, campaign_code, spend, conversions, impressions in zip(
+                        entry["date_ordinals"].tolist(),
+                        entry["channel_codes"].tolist(),
+                        entry["campaign_codes"].tolist(),
+                        entry["spend"].tolist(),
+                        entry["conversions"].tolist(),
+                        entry["impressions"].tolist(),
+                    )
+                ]
+        except (OSError, KeyError, ValueError):
+            # Corrupt or partially-written entries are treated as misses.
+            return None
+
+    def _store(self, path: Path, rows: list[GoogleAdsMetricRow]) -> None:
+        channel_names = sorted({row.channel_name for row in rows})
+        channel_codes = {name: code for code, name in enumerate(channel_names)}
+        campaign_names = sorted({row.campaign_name for row in rows if row.campaign_name})
+        # Code 0 is reserved for channel-level rows without a campaign.
+        campaign_codes = {name: code for code, name in enumerate(campaign_names, start=1)}
+
+        self._cache_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=self._cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                np.savez_compressed(
+                    handle,
+                    fetched_at=np.float64(self._clock()),
+                    channel_names=np.array(channel_names, dtype=str),
+                    date_ordinals=np.array(
+                        [row.date.toordinal() for row in rows], dtype=np.int32
+                    ),
+                    channel_codes=np.array(
+                        [channel_codes[row.channel_name] for row in rows], dtype=np.int32
+                    ),
+                    campaign_names=np.array(campaign_names, dtype=str),
+                    campaign_codes=np.array(
+                        [campaign_codes.get(row.campaign_name, 0) for row in rows],
+                        dtype=np.int32,
+                    ),
+                    spend=np.array([row.spend for row in rows], dtype=np.float64),
+                    conversions=np.array([row.conversions for row in rows], dtype=np.float64),
+                    impressions=np.array([row.impressions for row in rows], dtype=np.int64),
+                )
+            os.replace(tmp_name, path)
+        except BaseException:
+            if os.path.exists(tmp_name):
+                os.unlink(tmp_name)
+            raise
+
+    def fetch_daily_metrics(
+        self,
+        customer_id: str,
+        date_from: date,
+        date_to: date,
+    ) -> list[GoogleAdsMetricRow]:
+        normalized_customer_id = normalize_customer_id(customer_id)
+        today = self._today()
+
+        rows: list[GoogleAdsMetricRow] = []
+        for window in _month_windows(date_from, date_to):
+            path = self._entry_path(normalized_customer_id, window)
+            window_rows = self._load(path, window[1])
+            if window_rows is None:
+                self.misses += 1
+                PROVIDER_CACHE_REQUESTS.inc(result="miss")
+                fetch_to = min(window[1], max(today, window[0]))
+                window_rows = self._provider.fetch_daily_metrics(
+                    customer_id=customer_id,
+                    date_from=window[0],
+                    date_to=fetch_to,
+                )
+                self._store(path, window_rows)
+            else:
+                self.hits += 1
+                PROVIDER_CACHE_REQUESTS.inc(result="hit")
+
+            rows.extend(row for row in window_rows if date_from <= row.date <= date_to)
+
+        rows.sort(key=lambda row: (row.date, row.channel_name))
+        return rows
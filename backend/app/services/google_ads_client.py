@@ -1,5 +1,11 @@
-from datetime import date, timedelta
+from datetime import date
+import time
+from typing import Optional
+
+import numpy as np
+
 from app.config import get_settings
+from app.services.google_ads_cache import CachingGoogleAdsProvider
 from app.services.google_ads_provider_real import GoogleAdsRealProvider
 from app.services.google_ads_provider_types import (
     GoogleAdsMetricRow,
@@ -9,11 +15,47 @@ from app.services.google_ads_provider_types import (
 
 
 class GoogleAdsMockProvider:
-    """Deterministic local provider used for local-first demo mode."""
+    """
+    Deterministic local provider used for local-first demo mode.
+
+    Defaults to the two-channel demo feed. Scale mode widens it to N channels
+    with optional campaign-level rows, injected latency and injected failures
+    so the sync path can be load tested without credentials.
+    """
 
     provider_mode = "mock"
 
-    _channels = ("Google Search", "Google Display")
+    _channel_names = tuple(GoogleAdsRealProvider._channel_name_map.values())
+
+    def __init__(
+        self,
+        channels: int = 2,
+        campaigns_per_channel: int = 0,
+        latency_ms: float = 0.0,
+        error_rate: float = 0.0,
+        seed: Optional[int] = None,
+    ):
+        self._channels = tuple(
+            self._channel_names[idx]
+            if idx < len(self._channel_names)
+            else f"Google Channel {idx + 1}"
+            for idx in range(channels)
+        )
+        self._campaigns_per_channel = campaigns_per_channel
+        self._latency_ms = latency_ms
+        self._error_rate = error_rate
+        self._rng = np.random.default_rng(seed)
+
+    @property
+    def cache_key(self) -> str:
+        """The settings that shape the returned rows (latency and errors do not)."""
+        return "|".join(
+            [
+                self.provider_mode,
+                ",".join(self._channels),
+                f"campaigns_per_channel={self._campaigns_per_channel}",
+            ]
+        )
 
     def fetch_daily_metrics(
         self,
@@ -23,38 +65,97 @@ class GoogleAdsMockProvider:
     ) -> list[GoogleAdsMetricRow]:
         normalized_customer_id = normalize_customer_id(customer_id)
 
-        rows: list[GoogleAdsMetricRow] = []
+        if self._latency_ms > 0:
+            time.sleep(self._latency_ms / 1000)
+        if self._error_rate > 0 and self._rng.random() < self._error_rate:
+            raise RuntimeError("Google Ads API request failed: injected mock error")
+
         total_days = (date_to - date_from).days + 1
+        if total_days <= 0 or not self._channels:
+            return []
+
         customer_seed = int(normalized_customer_id[-2:])
+        ordinals = np.arange(date_from.toordinal(), date_from.toordinal() + total_days)
+        channel_index = np.arange(len(self._channels))
+
+        # (day, channel) grids, flattened day-major to match the legacy row order.
+        seasonal_offset = ((ordinals % 9) * 4)[:, None]
+        base_spend = (90 + (channel_index * 35))[None, :]
+        spend = np.round(base_spend + seasonal_offset + (customer_seed % 7), 2).astype(float)
+        conversions = np.round(np.maximum(spend / (24 + (channel_index * 5)), 0.01), 2)
+        impressions = (spend * (50 + (channel_index * 15))).astype(np.int64)
 
-        for day_offset in range(total_days):
-            metric_date = date_from + timedelta(days=day_offset)
-            seasonal_offset = (metric_date.toordinal() % 9) * 4
-
-            for channel_index, channel_name in enumerate(self._channels):
-                base_spend = 90 + (channel_index * 35)
-                spend = round(base_spend + seasonal_offset + (customer_seed % 7), 2)
-                conversions = round(max(spend / (24 + (channel_index * 5)), 0.01), 2)
-                impressions = int(spend * (50 + (channel_index * 15)))
-
-                rows.append(
-                    GoogleAdsMetricRow(
-                        date=metric_date,
-                        channel_name=channel_name,
-                        spend=spend,
-                        conversions=conversions,
-                        impressions=impressions,
-                    )
+        day_idx, chan_idx = np.divmod(np.arange(spend.size), len(self._channels))
+        dates = [date.fromordinal(int(ordinal)) for ordinal in ordinals]
+
+        if self._campaigns_per_channel <= 0:
+            return [
+                GoogleAdsMetricRow(
+                    date=dates[day],
+                    channel_name=self._channels[chan],
+                    spend=float(row_spend),
+                    conversions=float(row_conversions),
+                    impressions=int(row_impressions),
+                )
+                for day, chan, row_spend, row_conversions, row_impressions in zip(
+                    day_idx.tolist(),
+                    chan_idx.tolist(),
+                    spend.ravel(),
+                    conversions.ravel(),
+                    impressions.ravel(),
                 )
+            ]
+
+        campaigns = self._campaigns_per_channel
+        weights = np.arange(1, campaigns + 1, dtype=float)
+        weights /= weights.sum()
+        campaign_spend = np.round(spend.reshape(-1, 1) * weights, 2)
+        campaign_conversions = np.round(conversions.reshape(-1, 1) * weights, 2)
+        campaign_impressions = (impressions.reshape(-1, 1) * weights).astype(np.int64)
+        campaign_names = [
+            [f"{channel_name} Campaign {campaign + 1}" for campaign in range(campaigns)]
+            for channel_name in self._channels
+        ]
 
-        return rows
+        return [
+            GoogleAdsMetricRow(
+                date=dates[day],
+                channel_name=self._channels[chan],
+                spend=float(row_spend),
+                conversions=float(row_conversions),
+                impressions=int(row_impressions),
+                campaign_name=campaign_names[chan][campaign],
+            )
+            for day, chan, campaign, row_spend, row_conversions, row_impressions in zip(
+                np.repeat(day_idx, campaigns).tolist(),
+                np.repeat(chan_idx, campaigns).tolist(),
+                np.tile(np.arange(campaigns), spend.size).tolist(),
+                campaign_spend.ravel(),
+                campaign_conversions.ravel(),
+                campaign_impressions.ravel(),
+            )
+        ]
 
 
 def get_google_ads_client() -> GoogleAdsProvider:
     settings = get_settings()
     if settings.google_ads_provider == "mock":
-        return GoogleAdsMockProvider()
-    if settings.google_ads_provider == "real":
-        return GoogleAdsRealProvider(settings=settings)
+        provider: GoogleAdsProvider = GoogleAdsMockProvider(
+            channels=settings.google_ads_mock_channels,
+            campaigns_per_channel=settings.google_ads_mock_campaigns_per_channel,
+            latency_ms=settings.google_ads_mock_latency_ms,
+            error_rate=settings.google_ads_mock_error_rate,
+        )
+    elif settings.google_ads_provider == "real":
+        provider = GoogleAdsRealProvider(settings=settings)
+    else:
+        raise ValueError(f"Unsupported GOOGLE_ADS_PROVIDER: {settings.google_ads_provider}")
 
-    raise ValueError(f"Unsupported GOOGLE_ADS_PROVIDER: {settings.google_ads_provider}")
+    if settings.google_ads_cache_dir:
+        return CachingGoogleAdsProvider(
+            provider,
+            cache_dir=settings.google_ads_cache_dir,
+            recent_days=settings.google_ads_cache_recent_days,
+            recent_ttl_seconds=settings.google_ads_cache_recent_ttl_seconds,
+        )
+    return provider
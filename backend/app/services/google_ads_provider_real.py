@@ -28,6 +28,14 @@ class GoogleAdsRealProvider:
         "HOTEL": "Google Hotel",
     }
 
+    query_template = (
+        "SELECT segments.date, campaign.advertising_channel_type, "
+        "metrics.cost_micros, metrics.conversions, metrics.impressions "
+        "FROM campaign "
+        "WHERE segments.date BETWEEN '{date_from}' "
+        "AND '{date_to}'"
+    )
+
     def __init__(self, settings: Settings):
         self._settings = settings
 
@@ -87,12 +95,9 @@ class GoogleAdsRealProvider:
         client = self._build_client()
         service = client.get_service("GoogleAdsService")
 
-        query = (
-            "SELECT segments.date, campaign.advertising_channel_type, "
-            "metrics.cost_micros, metrics.conversions, metrics.impressions "
-            "FROM campaign "
-            f"WHERE segments.date BETWEEN '{date_from.isoformat()}' "
-            f"AND '{date_to.isoformat()}'"
+        query = self.query_template.format(
+            date_from=date_from.isoformat(),
+            date_to=date_to.isoformat(),
         )
 
         aggregated: dict[tuple[date, str], dict[str, float | int]] = {}
@@ -1,7 +1,7 @@
 from dataclasses import dataclass
 from datetime import date
 import re
-from typing import Protocol
+from typing import Iterable, Optional, Protocol
 
 
 @dataclass(frozen=True)
@@ -11,6 +11,7 @@ class GoogleAdsMetricRow:
     spend: float
     conversions: float
     impressions: int
+    campaign_name: Optional[str] = None
 
 
 class GoogleAdsProvider(Protocol):
@@ -30,3 +31,29 @@ def normalize_customer_id(customer_id: str) -> str:
     if len(normalized_customer_id) != 10:
         raise ValueError("customer_id must contain exactly 10 digits")
     return normalized_customer_id
+
+
+def rollup_campaign_rows(rows: Iterable[GoogleAdsMetricRow]) -> list[GoogleAdsMetricRow]:
+    """Aggregate campaign-level rows into the (date, channel) grain stored in daily_metrics."""
+    aggregated: dict[tuple[date, str], list[float]] = {}
+    for row in rows:
+        key = (row.date, row.channel_name)
+        if key not in aggregated:
+            aggregated[key] = [0.0, 0.0, 0]
+        aggregated[key][0] += row.spend
+        aggregated[key][1] += row.conversions
+        aggregated[key][2] += row.impressions
+
+    return [
+        GoogleAdsMetricRow(
+            date=metric_date,
+            channel_name=channel_name,
+            spend=round(float(spend), 2),
+            conversions=round(float(conversions), 2),
+            impressions=int(impressions),
+        )
+        for (metric_date, channel_name), (spend, conversions, impressions) in sorted(
+            aggregated.items(),
+            key=lambda item: (item[0][0], item[0][1]),
+        )
+    ]
@@ -1,10 +1,12 @@
-from dataclasses import dataclass
-from typing import Literal, Optional
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Literal, Optional, Sequence
 
 import numpy as np
 from scipy.optimize import curve_fit
 
 from app.config import get_settings
+from app.services.metrics import CURVE_FIT_ITERATIONS
 
 DataQualityState = Literal["ok", "low_confidence", "insufficient_history"]
 
@@ -17,6 +19,9 @@ class HillFitResult:
     max_yield: float
     r_squared: float
     status: str
+    # Covariance of (max_yield, beta, kappa) from curve_fit at the chosen
+    # alpha; None when the fit did not yield a finite estimate.
+    covariance: Optional[np.ndarray] = field(default=None, repr=False, compare=False)
 
 
 @dataclass
@@ -97,6 +102,43 @@ def apply_adstock(spend: np.ndarray, alpha: float) -> np.ndarray:
     return adstocked
 
 
+def hill_fit_bounds(
+    adstocked_spend: np.ndarray,
+    conversions: np.ndarray,
+) -> tuple[list[float], list[float]]:
+    """curve_fit bounds on (max_yield, beta, kappa) for one adstocked series."""
+    settings = get_settings()
+    return (
+        [0, settings.beta_min, 1e-6],
+        [settings.max_yield_multiplier * np.max(conversions), settings.beta_max, np.max(adstocked_spend) * 10],
+    )
+
+
+def fit_hill_curve(
+    adstocked_spend: np.ndarray,
+    conversions: np.ndarray,
+    initial_guess: Sequence[float],
+    bounds: tuple[Sequence[float], Sequence[float]],
+    maxfev: int = 5000,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    One curve_fit of (max_yield, beta, kappa) on already-adstocked spend.
+
+    Returns (popt, pcov); raises RuntimeError / ValueError like curve_fit.
+    """
+    popt, pcov, infodict, _, _ = curve_fit(
+        hill_function,
+        adstocked_spend,
+        conversions,
+        p0=initial_guess,
+        bounds=bounds,
+        maxfev=maxfev,
+        full_output=True,
+    )
+    CURVE_FIT_ITERATIONS.observe(infodict["nfev"])
+    return popt, pcov
+
+
 def fit_hill_model(
     spend: np.ndarray,
     conversions: np.ndarray,
@@ -117,7 +159,6 @@ def fit_hill_model(
         )
     
     max_conversions = np.max(conversions)
-    max_yield_upper = settings.max_yield_multiplier * max_conversions
     
     alpha_values = np.arange(
         settings.alpha_min,
@@ -133,19 +174,11 @@ def fit_hill_model(
         
         try:
             initial_guess = [max_conversions * 1.5, 1.0, np.median(adstocked_spend[adstocked_spend > 0])]
-            
-            bounds = (
-                [0, settings.beta_min, 1e-6],
-                [max_yield_upper, settings.beta_max, np.max(adstocked_spend) * 10]
-            )
-            
-            popt, _ = curve_fit(
-                hill_function,
+            popt, pcov = fit_hill_curve(
                 adstocked_spend,
                 conversions,
-                p0=initial_guess,
-                bounds=bounds,
-                maxfev=5000,
+                initial_guess,
+                hill_fit_bounds(adstocked_spend, conversions),
             )
             
             max_yield_fit, beta_fit, kappa_fit = popt
@@ -163,7 +196,8 @@ def fit_hill_model(
                     kappa=float(kappa_fit),
                     max_yield=float(max_yield_fit),
                     r_squared=float(r_squared),
-                    status="success"
+                    status="success",
+                    covariance=pcov if np.all(np.isfinite(pcov)) else None,
                 )
                 
         except RuntimeError:
@@ -207,6 +241,41 @@ def get_prior_adstock_state(
     return float(apply_adstock(prior_history, alpha)[-1])
 
 
+@dataclass(frozen=True)
+class AdstockState:
+    """
+    Adstock at the end of a channel's date-ordered history for one alpha.
+
+    The last day is the channel's current spend, so `prior_state` (adstock
+    through the day before) is the carryover used to evaluate it.
+    """
+
+    alpha: float
+    state: float  # adstock through last_date
+    prior_state: float  # adstock through the day before last_date
+    last_date: Optional[date] = None
+
+    @classmethod
+    def from_history(
+        cls,
+        alpha: float,
+        spend_history: np.ndarray,
+        last_date: Optional[date] = None,
+    ) -> "AdstockState":
+        adstocked = apply_adstock(np.asarray(spend_history, dtype=float), alpha)
+        if adstocked.size == 0:
+            return cls(alpha=alpha, state=0.0, prior_state=0.0, last_date=last_date)
+        prior_state = float(adstocked[-2]) if adstocked.size > 1 else 0.0
+        return cls(alpha=alpha, state=float(adstocked[-1]), prior_state=prior_state, last_date=last_date)
+
+    def advance(self, spends: Sequence[float], last_date: Optional[date]) -> "AdstockState":
+        """Fold days after `last_date` into the state, oldest first."""
+        state, prior_state = self.state, self.prior_state
+        for spend in spends:
+            prior_state, state = state, float(spend) + self.alpha * state
+        return AdstockState(alpha=self.alpha, state=state, prior_state=prior_state, last_date=last_date)
+
+
 def calculate_marginal_cpa(
     current_spend: float,
     params: HillFitResult,
@@ -257,49 +326,604 @@ def calculate_marginal_cpa(
     return marginal_cpa
 
 
+def calculate_marginal_cpa_array(
+    spend_levels: np.ndarray,
+    params: HillFitResult,
+    increment: float = 0.10,
+    prior_adstock_state: float = 0.0,
+) -> np.ndarray:
+    """
+    Vectorized `calculate_marginal_cpa` over a spend grid.
+
+    Uses the same arithmetic element-wise; entries where the scalar version
+    returns None (non-positive spend or no conversion lift) are NaN.
+    """
+    spend_levels = np.asarray(spend_levels, dtype=float)
+    if params.status != "success":
+        return np.full(spend_levels.shape, np.nan)
+
+    return _marginal_cpa_broadcast(
+        spend_levels,
+        params.max_yield,
+        params.beta,
+        params.kappa,
+        params.alpha * float(prior_adstock_state),
+        increment,
+    )
+
+
+def classify_traffic_lights(marginal_cpa: np.ndarray, target_cpa: float) -> np.ndarray:
+    """Vectorized `get_traffic_light`; NaN marginal CPA maps to grey."""
+    ratio = np.asarray(marginal_cpa, dtype=float) / target_cpa
+    return np.select(
+        [np.isnan(ratio), ratio < 0.9, ratio <= 1.1],
+        ["grey", "green", "yellow"],
+        default="red",
+    )
+
+
+ZONE_BOUNDARY_MULTIPLIERS = (0.9, 1.1)
+
+# Log-spaced scan used to bracket the marginal CPA inverse, in units of kappa.
+INVERSE_SCAN_DECADES = (-4.0, 4.0)
+INVERSE_SCAN_POINTS = 97
+
+
+@dataclass
+class ZoneBoundarySpends:
+    """Per-channel spends at which marginal CPA reaches each zone boundary."""
+
+    green_max: np.ndarray  # marginal CPA == 0.9 x target
+    target: np.ndarray  # marginal CPA == target
+    yellow_max: np.ndarray  # marginal CPA == 1.1 x target
+
+
+def _stack_fit_params(params: Sequence[HillFitResult]) -> tuple[np.ndarray, ...]:
+    fitted = np.array([p.status == "success" for p in params], dtype=bool)
+    alpha = np.array([p.alpha if ok else 0.0 for p, ok in zip(params, fitted)], dtype=float)
+    beta = np.array([p.beta if ok else 1.0 for p, ok in zip(params, fitted)], dtype=float)
+    kappa = np.array([p.kappa if ok else 1.0 for p, ok in zip(params, fitted)], dtype=float)
+    max_yield = np.array([p.max_yield if ok else 0.0 for p, ok in zip(params, fitted)], dtype=float)
+    return fitted, alpha, beta, kappa, max_yield
+
+
+def _marginal_cpa_broadcast(
+    spend: np.ndarray,
+    max_yield: np.ndarray,
+    beta: np.ndarray,
+    kappa: np.ndarray,
+    carryover: np.ndarray,
+    increment: float,
+) -> np.ndarray:
+    """Marginal CPA for broadcastable per-channel params; NaN where undefined."""
+    spend_next = spend * (1 + increment)
+    delta_conversions = (
+        hill_function(spend_next + carryover, max_yield, beta, kappa)
+        - hill_function(spend + carryover, max_yield, beta, kappa)
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        marginal_cpa = (spend_next - spend) / delta_conversions
+    return np.where((spend > 0) & (delta_conversions > 0), marginal_cpa, np.nan)
+
+
+def calculate_projected_conversions(
+    params: Sequence[HillFitResult],
+    spends: np.ndarray,
+    prior_adstock_states: float | np.ndarray = 0.0,
+) -> np.ndarray:
+    """
+    Modeled conversions for each channel at its spend plus adstock carryover,
+    in one array evaluation. Failed fits are NaN.
+    """
+    fitted, alpha, beta, kappa, max_yield = _stack_fit_params(params)
+    spends = np.asarray(spends, dtype=float)
+    carryover = alpha * np.asarray(prior_adstock_states, dtype=float)
+    conversions = hill_function(spends + carryover, max_yield, beta, kappa)
+    return np.where(fitted, conversions, np.nan)
+
+
+def calculate_marginal_cpa_batch(
+    params: Sequence[HillFitResult],
+    spends: np.ndarray,
+    prior_adstock_states: float | np.ndarray = 0.0,
+    increment: float = 0.10,
+) -> np.ndarray:
+    """`calculate_marginal_cpa` for many channels at once; NaN where undefined."""
+    fitted, alpha, beta, kappa, max_yield = _stack_fit_params(params)
+    carryover = alpha * np.asarray(prior_adstock_states, dtype=float)
+    marginal_cpa = _marginal_cpa_broadcast(
+        np.asarray(spends, dtype=float),
+        max_yield,
+        beta,
+        kappa,
+        carryover,
+        increment,
+    )
+    return np.where(fitted, marginal_cpa, np.nan)
+
+
+# Two-sided 95% normal quantile for delta-method uncertainty bands.
+UNCERTAINTY_Z = 1.96
+
+
+def _hill_gradient(
+    adstocked_spend: np.ndarray,
+    max_yield: float,
+    beta: float,
+    kappa: float,
+) -> np.ndarray:
+    """d hill_function / d (max_yield, beta, kappa), stacked on the last axis."""
+    spend = np.maximum(adstocked_spend, 1e-10)
+    share = hill_function(spend, 1.0, beta, kappa)
+    slope = max_yield * share * (1 - share)
+    return np.stack(
+        [share, slope * np.log(spend / kappa), -slope * beta / kappa],
+        axis=-1,
+    )
+
+
+def calculate_marginal_cpa_bands(
+    spend_levels: np.ndarray,
+    params: HillFitResult,
+    increment: float = 0.10,
+    prior_adstock_state: float = 0.0,
+    z: float = UNCERTAINTY_Z,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Delta-method lower/upper marginal CPA bands over a spend grid.
+
+    The conversion lift of the increment is propagated through the curve_fit
+    covariance (alpha is treated as known), and the band on the lift is
+    inverted, so bands stay positive and widen asymmetrically. Entries are NaN
+    where the fit has no covariance or marginal CPA is undefined; the upper
+    band is +inf where the lift's lower band reaches zero.
+    """
+    spend_levels = np.asarray(spend_levels, dtype=float)
+    nan = np.full(spend_levels.shape, np.nan)
+    if params.status != "success" or params.covariance is None:
+        return nan, nan
+
+    carryover = params.alpha * float(prior_adstock_state)
+    spend_next = spend_levels * (1 + increment)
+    delta_conversions = (
+        hill_function(spend_next + carryover, params.max_yield, params.beta, params.kappa)
+        - hill_function(spend_levels + carryover, params.max_yield, params.beta, params.kappa)
+    )
+    gradient = (
+        _hill_gradient(spend_next + carryover, params.max_yield, params.beta, params.kappa)
+        - _hill_gradient(spend_levels + carryover, params.max_yield, params.beta, params.kappa)
+    )
+    variance = np.einsum("...i,ij,...j->...", gradient, params.covariance, gradient)
+    margin = z * np.sqrt(np.maximum(variance, 0.0))
+
+    delta_spend = spend_next - spend_levels
+    defined = (spend_levels > 0) & (delta_conversions > 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        lower = delta_spend / (delta_conversions + margin)
+        upper = np.where(
+            delta_conversions - margin > 0,
+            delta_spend / (delta_conversions - margin),
+            np.inf,
+        )
+    return np.where(defined, lower, np.nan), np.where(defined, upper, np.nan)
+
+
+def calculate_marginal_cpa_interval(
+    current_spend: float,
+    params: HillFitResult,
+    increment: float = 0.10,
+    prior_adstock_state: float = 0.0,
+    draws: Optional[np.ndarray] = None,
+) -> tuple[Optional[float], Optional[float]]:
+    """
+    Marginal CPA band at one spend; None where a bound is unavailable.
+
+    Uses percentile bands over bootstrap `draws` when given, otherwise the
+    delta-method band from the fit covariance.
+    """
+    spend_levels = np.array([current_spend], dtype=float)
+    if draws is not None:
+        lower, upper = calculate_marginal_cpa_percentile_bands(
+            spend_levels,
+            params,
+            draws,
+            increment=increment,
+            prior_adstock_state=prior_adstock_state,
+        )
+    else:
+        lower, upper = calculate_marginal_cpa_bands(
+            spend_levels,
+            params,
+            increment=increment,
+            prior_adstock_state=prior_adstock_state,
+        )
+    return _finite_or_none(lower[0]), _finite_or_none(upper[0])
+
+
+def calculate_marginal_cpa_percentile_bands(
+    spend_levels: np.ndarray,
+    params: HillFitResult,
+    draws: np.ndarray,
+    increment: float = 0.10,
+    prior_adstock_state: float = 0.0,
+    level: float = 0.95,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Percentile marginal CPA bands over resampled (max_yield, beta, kappa) draws.
+
+    `draws` has shape (samples, 3) and shares the fit's alpha. Undefined draws
+    at a spend level are treated as unbounded marginal CPA, so a level where
+    too many draws show no lift gets an upper band of +inf.
+    """
+    spend_levels = np.asarray(spend_levels, dtype=float)
+    draws = np.asarray(draws, dtype=float).reshape(-1, 3)
+    nan = np.full(spend_levels.shape, np.nan)
+    if params.status != "success" or draws.shape[0] == 0:
+        return nan, nan
+
+    marginal_cpa = _marginal_cpa_broadcast(
+        spend_levels[None, :],
+        draws[:, 0:1],
+        draws[:, 1:2],
+        draws[:, 2:3],
+        params.alpha * float(prior_adstock_state),
+        increment,
+    )
+    tail = (1 - level) / 2 * 100
+    lower, upper = np.percentile(
+        np.where(np.isnan(marginal_cpa), np.inf, marginal_cpa),
+        [tail, 100 - tail],
+        axis=0,
+    )
+    defined = spend_levels > 0
+    return np.where(defined, lower, np.nan), np.where(defined, upper, np.nan)
+
+
+def _finite_or_none(value: float) -> Optional[float]:
+    return float(value) if np.isfinite(value) else None
+
+
+@dataclass
+class HorizonSimulation:
+    """Daily (channels x days) projections from `simulate_adstock_horizon`."""
+
+    spend: np.ndarray
+    adstock: np.ndarray
+    conversions: np.ndarray
+
+
+def simulate_adstock_horizon(
+    params: Sequence[HillFitResult],
+    daily_spend: np.ndarray,
+    initial_adstock_states: float | np.ndarray,
+    days: int,
+) -> HorizonSimulation:
+    """
+    Project daily spend, adstock and conversions for many channels at once.
+
+    `daily_spend` is either one constant daily spend per channel or a full
+    (channels, days) plan. `initial_adstock_states` is each channel's adstock
+    on the last observed day, so carryover decays into the horizon. The
+    recurrence runs day by day with every channel updated in one array op;
+    conversions come from a single Hill evaluation over the whole matrix.
+    Failed fits produce NaN conversions.
+    """
+    fitted, alpha, beta, kappa, max_yield = _stack_fit_params(params)
+    num_channels = fitted.size
+
+    spend = np.asarray(daily_spend, dtype=float)
+    if spend.ndim == 1:
+        spend = np.repeat(spend[:, None], days, axis=1)
+    state = np.broadcast_to(np.asarray(initial_adstock_states, dtype=float), (num_channels,)).copy()
+
+    adstock = np.empty((num_channels, days))
+    for day in range(days):
+        state = spend[:, day] + alpha * state
+        adstock[:, day] = state
+
+    conversions = hill_function(adstock, max_yield[:, None], beta[:, None], kappa[:, None])
+    return HorizonSimulation(
+        spend=spend,
+        adstock=adstock,
+        conversions=np.where(fitted[:, None], conversions, np.nan),
+    )
+
+
+class MarginalCpaInverse:
+    """
+    Invert `calculate_marginal_cpa` for many channels at once.
+
+    `solve` returns, per channel, the largest spend whose marginal CPA (10%
+    increment rule, with adstock carryover from `prior_adstock_states`) is at
+    most the target. Channels whose cheapest marginal conversion already
+    costs more than the target get 0.0; failed fits get NaN. Solutions are
+    capped at 10^4 x kappa.
+
+    The root is bracketed by a log-spaced scan (so the saturating branch of
+    S-shaped curves is found even when beta > 1) and then refined by
+    vectorized bisection in log-spend. The scan does not depend on the
+    target, so it is computed once and reused by every `solve` call.
+    """
+
+    def __init__(
+        self,
+        params: Sequence[HillFitResult],
+        prior_adstock_states: float | np.ndarray = 0.0,
+        increment: float = 0.10,
+    ):
+        self.fitted, alpha, self.beta, self.kappa, self.max_yield = _stack_fit_params(params)
+        self.num_channels = self.fitted.size
+        self.increment = increment
+        self.carryover = alpha * np.broadcast_to(
+            np.asarray(prior_adstock_states, dtype=float),
+            (self.num_channels,),
+        )
+
+        low_decade, high_decade = INVERSE_SCAN_DECADES
+        self.grid = self.kappa[:, None] * np.logspace(low_decade, high_decade, INVERSE_SCAN_POINTS)[None, :]
+        self.scan = _marginal_cpa_broadcast(
+            self.grid,
+            self.max_yield[:, None],
+            self.beta[:, None],
+            self.kappa[:, None],
+            self.carryover[:, None],
+            increment,
+        )
+
+    def solve(
+        self,
+        target_marginal_cpa: float | np.ndarray,
+        rtol: float = 1e-9,
+        max_iterations: int = 60,
+    ) -> np.ndarray:
+        if self.num_channels == 0:
+            return np.empty(0)
+
+        target = np.broadcast_to(np.asarray(target_marginal_cpa, dtype=float), (self.num_channels,))
+        feasible = self.scan <= target[:, None]
+
+        any_feasible = feasible.any(axis=1)
+        last_feasible = INVERSE_SCAN_POINTS - 1 - np.argmax(feasible[:, ::-1], axis=1)
+        capped = last_feasible == INVERSE_SCAN_POINTS - 1
+        rows = np.arange(self.num_channels)
+        low = self.grid[rows, last_feasible]
+        high = self.grid[rows, np.minimum(last_feasible + 1, INVERSE_SCAN_POINTS - 1)]
+
+        active = any_feasible & ~capped & self.fitted
+        for _ in range(max_iterations):
+            if not active.any():
+                break
+            mid = np.sqrt(low * high)
+            mid_cpa = _marginal_cpa_broadcast(
+                mid,
+                self.max_yield,
+                self.beta,
+                self.kappa,
+                self.carryover,
+                self.increment,
+            )
+            below = mid_cpa <= target
+            low = np.where(active & below, mid, low)
+            high = np.where(active & ~below, mid, high)
+            active &= (high - low) > rtol * high
+
+        solved = np.where(any_feasible, low, 0.0)
+        return np.where(self.fitted & ~np.isnan(target), solved, np.nan)
+
+
+def solve_spend_for_marginal_cpa(
+    params: Sequence[HillFitResult],
+    target_marginal_cpa: float | np.ndarray,
+    prior_adstock_states: float | np.ndarray = 0.0,
+    increment: float = 0.10,
+    rtol: float = 1e-9,
+    max_iterations: int = 60,
+) -> np.ndarray:
+    """One-shot `MarginalCpaInverse(...).solve(...)`."""
+    return MarginalCpaInverse(
+        params,
+        prior_adstock_states=prior_adstock_states,
+        increment=increment,
+    ).solve(target_marginal_cpa, rtol=rtol, max_iterations=max_iterations)
+
+
+def solve_zone_boundary_spends(
+    params: Sequence[HillFitResult],
+    target_cpa: float | np.ndarray,
+    prior_adstock_states: float | np.ndarray = 0.0,
+    increment: float = 0.10,
+) -> ZoneBoundarySpends:
+    """Spends where each channel crosses 0.9x, 1.0x and 1.1x its target CPA."""
+    target = np.asarray(target_cpa, dtype=float)
+    inverse = MarginalCpaInverse(params, prior_adstock_states=prior_adstock_states, increment=increment)
+    green_max, at_target, yellow_max = (
+        inverse.solve(target * multiplier)
+        for multiplier in (ZONE_BOUNDARY_MULTIPLIERS[0], 1.0, ZONE_BOUNDARY_MULTIPLIERS[1])
+    )
+    return ZoneBoundarySpends(green_max=green_max, target=at_target, yellow_max=yellow_max)
+
+
+ADAPTIVE_CANDIDATE_POINTS = 1001
+# Sampling density near a zone boundary relative to flat regions, and the
+# width of that boost as a fraction of the plotted spend range.
+ADAPTIVE_BOUNDARY_WEIGHT = 12.0
+ADAPTIVE_BOUNDARY_WIDTH = 0.04
+
+
+def _zone_boundary_crossings(
+    spend_levels: np.ndarray,
+    marginal_cpas: np.ndarray,
+    visible: np.ndarray,
+    target_cpa: float,
+) -> np.ndarray:
+    """Interpolated spends where marginal CPA crosses 0.9x / 1.1x target."""
+    crossings: list[np.ndarray] = []
+    both_visible = visible[:-1] & visible[1:]
+    for multiplier in ZONE_BOUNDARY_MULTIPLIERS:
+        excess = marginal_cpas - (target_cpa * multiplier)
+        cells = np.flatnonzero(both_visible & (np.sign(excess[:-1]) != np.sign(excess[1:])))
+        left, right = excess[cells], excess[cells + 1]
+        fraction = left / (left - right)
+        crossings.append(spend_levels[cells] + fraction * (spend_levels[cells + 1] - spend_levels[cells]))
+    return np.concatenate(crossings)
+
+
+def _thinned_indices(count: int, max_points: int) -> np.ndarray:
+    """Indices of at most `max_points` of `count` ordered items, always keeping both ends."""
+    if count <= max_points:
+        return np.arange(count)
+    return np.unique(np.round(np.linspace(0, count - 1, max_points)).astype(int))
+
+
+def _adaptive_spend_levels(
+    spend_levels: np.ndarray,
+    marginal_cpas: np.ndarray,
+    visible: np.ndarray,
+    target_cpa: float,
+    max_points: int,
+) -> np.ndarray:
+    """
+    Place `max_points` spends by inverse-CDF sampling of a density that is flat
+    across the visible curve and boosted around each zone boundary crossing.
+    The visible ends are always kept; crossings beyond the budget are thinned.
+    """
+    visible_idx = np.flatnonzero(visible)
+    if visible_idx.size == 0:
+        return np.empty(0)
+
+    crossings = _zone_boundary_crossings(spend_levels, marginal_cpas, visible, target_cpa)
+    anchors = np.concatenate(
+        [spend_levels[[visible_idx[0], visible_idx[-1]]], crossings]
+    )
+    num_samples = max(max_points - anchors.size, 0)
+
+    width = (spend_levels[-1] - spend_levels[0]) * ADAPTIVE_BOUNDARY_WIDTH
+    density = 1.0 + ADAPTIVE_BOUNDARY_WEIGHT * np.exp(
+        -0.5 * ((spend_levels[:, None] - crossings[None, :]) / width) ** 2
+    ).sum(axis=1)
+
+    cell_width = np.diff(spend_levels)
+    cell_weight = np.where(
+        visible[:-1] & visible[1:],
+        0.5 * (density[:-1] + density[1:]) * cell_width,
+        0.0,
+    )
+    cumulative = np.cumsum(cell_weight)
+    total = cumulative[-1] if cumulative.size else 0.0
+    if total <= 0 or num_samples == 0:
+        anchors = np.unique(anchors)
+        return anchors[_thinned_indices(anchors.size, max_points)]
+
+    # Interior quantiles only (the ends are anchors), so none lands on a
+    # leading zero-weight cell.
+    quantiles = np.linspace(0.0, total, num_samples + 2)[1:-1]
+    cells = np.minimum(np.searchsorted(cumulative, quantiles, side="left"), cell_weight.size - 1)
+    fraction = (quantiles - (cumulative[cells] - cell_weight[cells])) / cell_weight[cells]
+    samples = spend_levels[cells] + fraction * cell_width[cells]
+    return np.unique(np.concatenate([anchors, samples]))
+
+
 def generate_marginal_curve_points(
     current_spend: float,
     params: HillFitResult,
     target_cpa: float,
     spend_history: Optional[np.ndarray] = None,
     increment: float = 0.10,
+    max_points: Optional[int] = None,
+    band_draws: Optional[np.ndarray] = None,
+    prior_adstock_state: Optional[float] = None,
 ) -> tuple[list[dict[str, float | str]], Optional[dict[str, float]]]:
     """
     Generate backend chart payload so frontend and backend share identical math.
+
+    By default the curve is 121 evenly spaced spends. With `max_points`, at
+    most that many points are returned, concentrated where the marginal CPA
+    crosses the 0.9x / 1.1x target zone boundaries. Points carry marginal CPA
+    bands from `band_draws` (bootstrap parameter draws) when given, otherwise
+    from the fit covariance when it is known.
     """
     if params.status != "success" or current_spend <= 0:
         return [], None
 
-    prior_state = get_prior_adstock_state(current_spend, params.alpha, spend_history)
+    prior_state = (
+        float(prior_adstock_state)
+        if prior_adstock_state is not None
+        else get_prior_adstock_state(current_spend, params.alpha, spend_history)
+    )
 
     min_spend = max(current_spend * 0.05, 10.0)
     max_spend = max(current_spend * 4.0, min_spend * 1.1)
-    num_points = 120
+    num_points = 120 if max_points is None else ADAPTIVE_CANDIDATE_POINTS - 1
     step = (max_spend - min_spend) / num_points
 
-    points: list[dict[str, float | str]] = []
-    for idx in range(num_points + 1):
-        spend_level = min_spend + (idx * step)
-        marginal_cpa = calculate_marginal_cpa(
-            spend_level,
+    spend_levels = min_spend + (np.arange(num_points + 1) * step)
+    marginal_cpas = calculate_marginal_cpa_array(
+        spend_levels,
+        params,
+        increment=increment,
+        prior_adstock_state=prior_state,
+    )
+    visible = ~np.isnan(marginal_cpas) & (marginal_cpas <= target_cpa * 5)
+
+    if max_points is not None:
+        spend_levels = _adaptive_spend_levels(
+            spend_levels,
+            marginal_cpas,
+            visible,
+            target_cpa,
+            max_points,
+        )
+        marginal_cpas = calculate_marginal_cpa_array(
+            spend_levels,
             params,
             increment=increment,
             prior_adstock_state=prior_state,
         )
-        if marginal_cpa is None or marginal_cpa > target_cpa * 5:
-            continue
-
-        zone = get_traffic_light(marginal_cpa, target_cpa)
-        if zone == "grey":
-            continue
+        visible = ~np.isnan(marginal_cpas) & (marginal_cpas <= target_cpa * 5)
 
-        points.append(
-            {
-                "spend": float(round(spend_level)),
-                "marginal_cpa": round(float(marginal_cpa), 2),
-                "zone": zone,
-            }
+    zones = classify_traffic_lights(marginal_cpas, target_cpa)
+    if band_draws is not None:
+        band_lower, band_upper = calculate_marginal_cpa_percentile_bands(
+            spend_levels,
+            params,
+            band_draws,
+            increment=increment,
+            prior_adstock_state=prior_state,
+        )
+    else:
+        band_lower, band_upper = calculate_marginal_cpa_bands(
+            spend_levels,
+            params,
+            increment=increment,
+            prior_adstock_state=prior_state,
+        )
+    points: list[dict[str, float | str]] = [
+        {
+            "spend": float(round(spend_level)),
+            "marginal_cpa": round(marginal_cpa, 2),
+            "zone": zone,
+        }
+        for spend_level, marginal_cpa, zone in zip(
+            spend_levels[visible].tolist(),
+            marginal_cpas[visible].tolist(),
+            zones[visible].tolist(),
         )
+    ]
+    if params.covariance is not None or band_draws is not None:
+        for point, lower, upper in zip(
+            points,
+            band_lower[visible].tolist(),
+            band_upper[visible].tolist(),
+        ):
+            point["marginal_cpa_lower"] = round(lower, 2) if np.isfinite(lower) else None
+            point["marginal_cpa_upper"] = round(upper, 2) if np.isfinite(upper) else None
+    if max_points is not None:
+        # Dense sampling can collapse onto the same whole-dollar spend.
+        deduped: dict[float, dict[str, float | str]] = {}
+        for point in points:
+            deduped.setdefault(point["spend"], point)
+        points = list(deduped.values())
+        points = [points[idx] for idx in _thinned_indices(len(points), max_points).tolist()]
 
     current_marginal_cpa = calculate_marginal_cpa(
         current_spend,
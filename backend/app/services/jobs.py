@@ -0,0 +1,394 @@
+"""
+Background jobs persisted in the `jobs` table and run by an in-process
+thread pool.
+
+Routers register a handler per job kind and enqueue work instead of running
+it on the request. Workers claim the highest-priority queued job with a
+conditional UPDATE that records the claiming worker and a lease, renewed
+while the handler runs, so several workers (or app processes sharing the
+database) never run a job twice and no broker is needed. A job whose lease
+ran out (its process died) can be claimed again. A handler that raises is
+retried with exponential backoff until `max_attempts`; an HTTPException
+below 500 is the caller's error and fails the job at once. Queued jobs can
+be cancelled; a running job that is cancelled ends `cancelled` and its
+result is discarded.
+"""
+
+from datetime import datetime, timedelta, timezone
+import logging
+import os
+import socket
+import threading
+from typing import Any, Callable, Optional
+import uuid
+
+from fastapi import HTTPException
+from sqlalchemy import and_, or_, select, update
+
+from app.config import get_settings
+from app.models.db_models import Job
+from app.services.database import get_session
+from app.services.metrics import JOBS_FINISHED
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[dict[str, Any]], Any]
+
+JOB_HANDLERS: dict[str, JobHandler] = {}
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATUSES = (SUCCEEDED, FAILED, CANCELLED)
+
+# Identifies this process's workers in `jobs.claimed_by`.
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def register_job_handler(kind: str) -> Callable[[JobHandler], JobHandler]:
+    """Register `handler(payload) -> JSON-serialisable result` for `kind`."""
+
+    def decorator(handler: JobHandler) -> JobHandler:
+        JOB_HANDLERS[kind] = handler
+        return handler
+
+    return decorator
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _as_uuid(value: str | uuid.UUID) -> uuid.UUID:
+    return value if isinstance(value, uuid.UUID) else uuid.UUID(str(value))
+
+
+def enqueue_job(
+    kind: str,
+    payload: dict[str, Any],
+    account_id: Optional[str | uuid.UUID] = None,
+    priority: int = 0,
+    max_attempts: Optional[int] = None,
+) -> Job:
+    """Persist a queued job (higher `priority` runs first) and wake the pool."""
+    if kind not in JOB_HANDLERS:
+        raise ValueError(f"No job handler registered for '{kind}'")
+
+    now = _now()
+    job = Job(
+        kind=kind,
+        status=QUEUED,
+        priority=priority,
+        account_id=_as_uuid(account_id) if account_id is not None else None,
+        payload=payload,
+        attempts=0,
+        max_attempts=max_attempts or get_settings().job_max_attempts,
+        cancel_requested=False,
+        run_after=now,
+        created_at=now,
+    )
+    session = get_session()
+    try:
+        session.add(job)
+        session.commit()
+        session.refresh(job)
+        session.expunge(job)
+    finally:
+        session.close()
+    JOB_POOL.wake()
+    return job
+
+
+def get_job(job_id: str | uuid.UUID) -> Optional[Job]:
+    session = get_session()
+    try:
+        job = session.get(Job, _as_uuid(job_id))
+        if job is not None:
+            session.expunge(job)
+        return job
+    finally:
+        session.close()
+
+
+def cancel_job(job_id: str | uuid.UUID) -> Optional[Job]:
+    """
+    Cancel a queued job (including one waiting to retry).
+
+    A running job is flagged with `cancel_requested`: its current attempt
+    runs to the end, but the job is recorded as cancelled instead of
+    succeeding or being retried. Finished jobs are left unchanged.
+    """
+    session = get_session()
+    try:
+        job = session.get(Job, _as_uuid(job_id))
+        if job is None:
+            return None
+        if job.status == QUEUED:
+            job.status = CANCELLED
+            job.cancel_requested = True
+            job.finished_at = _now()
+        elif job.status == RUNNING:
+            job.cancel_requested = True
+        session.commit()
+        session.refresh(job)
+        session.expunge(job)
+        return job
+    finally:
+        session.close()
+
+
+def _lease_expiry(now: datetime) -> datetime:
+    return now + timedelta(seconds=get_settings().job_lease_seconds)
+
+
+def _claimable(now: datetime):
+    """Due queued jobs, and running jobs whose worker stopped renewing its lease."""
+    return or_(
+        and_(Job.status == QUEUED, Job.run_after <= now),
+        and_(
+            Job.status == RUNNING,
+            or_(Job.lease_expires_at.is_(None), Job.lease_expires_at < now),
+        ),
+    )
+
+
+def claim_next_job() -> Optional[Job]:
+    """Move the next claimable job to running under this worker's lease, or return None."""
+    session = get_session()
+    try:
+        while True:
+            now = _now()
+            candidate = session.execute(
+                select(Job.id)
+                .where(_claimable(now))
+                .order_by(Job.priority.desc(), Job.created_at)
+                .limit(1)
+            ).scalar_one_or_none()
+            if candidate is None:
+                return None
+            claimed = session.execute(
+                update(Job)
+                .where(Job.id == candidate)
+                .where(_claimable(now))
+                .values(
+                    status=RUNNING,
+                    started_at=now,
+                    attempts=Job.attempts + 1,
+                    claimed_by=WORKER_ID,
+                    lease_expires_at=_lease_expiry(now),
+                )
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            session.commit()
+            if claimed:
+                job = session.get(Job, candidate)
+                session.expunge(job)
+                return job
+            # Another worker claimed it first; look again.
+    finally:
+        session.close()
+
+
+def _update_owned(job_id: uuid.UUID, *conditions: Any, **values: Any) -> bool:
+    """Update a job this worker still holds; False when the lease was lost."""
+    session = get_session()
+    try:
+        updated = session.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.status == RUNNING, Job.claimed_by == WORKER_ID, *conditions)
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        session.commit()
+        return bool(updated)
+    finally:
+        session.close()
+
+
+def _finish(job_id: uuid.UUID, *conditions: Any, **values: Any) -> bool:
+    return _update_owned(job_id, *conditions, claimed_by=None, lease_expires_at=None, **values)
+
+
+class _LeaseRenewal:
+    """Renews a claimed job's lease in the background while its handler runs."""
+
+    def __init__(self, job_id: uuid.UUID):
+        self._job_id = job_id
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"job-lease-{job_id}", daemon=True)
+
+    def __enter__(self) -> "_LeaseRenewal":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        interval = get_settings().job_lease_seconds / 3
+        while not self._stop.wait(interval):
+            try:
+                if not _update_owned(self._job_id, lease_expires_at=_lease_expiry(_now())):
+                    return
+            except Exception:
+                logger.exception("Renewing the lease of job %s failed", self._job_id)
+
+
+def _lost_lease(job: Job) -> str:
+    logger.warning("Job %s (%s) lost its lease; its outcome was not recorded", job.id, job.kind)
+    current = get_job(job.id)
+    return current.status if current is not None else RUNNING
+
+
+def run_job(job: Job) -> str:
+    """Run a claimed job's handler, record the outcome and return the new status."""
+    handler = JOB_HANDLERS.get(job.kind)
+    try:
+        if handler is None:
+            raise HTTPException(status_code=400, detail=f"No job handler registered for '{job.kind}'")
+        with _LeaseRenewal(job.id):
+            result = handler(job.payload)
+    except Exception as exc:
+        permanent = isinstance(exc, HTTPException) and exc.status_code < 500
+        error = str(exc.detail) if isinstance(exc, HTTPException) else f"{type(exc).__name__}: {exc}"
+        current = get_job(job.id)
+        if current is not None and current.cancel_requested:
+            status = CANCELLED
+        elif permanent or job.attempts >= job.max_attempts:
+            status = FAILED
+        else:
+            status = QUEUED
+
+        if status == QUEUED:
+            backoff = get_settings().job_retry_backoff_seconds * 2 ** (job.attempts - 1)
+            recorded = _finish(
+                job.id, status=QUEUED, error=error, run_after=_now() + timedelta(seconds=backoff)
+            )
+            if recorded:
+                logger.warning("Job %s (%s) attempt %d failed; retrying: %s", job.id, job.kind, job.attempts, error)
+        else:
+            recorded = _finish(job.id, status=status, error=error, finished_at=_now())
+            if recorded:
+                logger.warning("Job %s (%s) %s: %s", job.id, job.kind, status, error)
+        if not recorded:
+            return _lost_lease(job)
+        JOBS_FINISHED.inc(kind=job.kind, status="retried" if status == QUEUED else status)
+        return status
+
+    # The cancel check and the write are one statement, so a cancel that
+    # lands while the handler runs can never end up `succeeded`.
+    if _finish(
+        job.id,
+        Job.cancel_requested.is_(False),
+        status=SUCCEEDED,
+        result=result,
+        error=None,
+        finished_at=_now(),
+    ):
+        status = SUCCEEDED
+    elif _finish(job.id, status=CANCELLED, error="Cancelled while running", finished_at=_now()):
+        status = CANCELLED
+    else:
+        return _lost_lease(job)
+    JOBS_FINISHED.inc(kind=job.kind, status=status)
+    return status
+
+
+def run_pending_jobs(limit: Optional[int] = None) -> int:
+    """Run due jobs on the calling thread until none are left; returns how many ran."""
+    ran = 0
+    while limit is None or ran < limit:
+        job = claim_next_job()
+        if job is None:
+            break
+        run_job(job)
+        ran += 1
+    return ran
+
+
+def requeue_interrupted_jobs() -> int:
+    """
+    Return running jobs whose lease expired to the queue (run at startup).
+
+    Jobs another live process is running keep renewing their lease and are
+    left alone.
+    """
+    now = _now()
+    session = get_session()
+    try:
+        requeued = session.execute(
+            update(Job)
+            .where(Job.status == RUNNING)
+            .where(or_(Job.lease_expires_at.is_(None), Job.lease_expires_at < now))
+            .values(status=QUEUED, run_after=now, claimed_by=None, lease_expires_at=None)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        session.commit()
+        return requeued
+    finally:
+        session.close()
+
+
+class JobWorkerPool:
+    """Worker threads that claim and run queued jobs; enqueueing wakes them."""
+
+    def __init__(self):
+        self._wake = threading.Condition()
+        self._pending_wakeups = 0
+        self._stop = threading.Event()
+        self._threads: list[threading.Thread] = []
+
+    @property
+    def size(self) -> int:
+        return sum(thread.is_alive() for thread in self._threads)
+
+    def start(self, workers: int) -> None:
+        if self.size:
+            return
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(target=self._run, name=f"job-worker-{index}", daemon=True)
+            for index in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, timeout: Optional[float] = 5.0) -> None:
+        self._stop.set()
+        with self._wake:
+            self._wake.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def wake(self) -> None:
+        with self._wake:
+            self._pending_wakeups += 1
+            self._wake.notify()
+
+    def _wait(self, timeout: float) -> None:
+        with self._wake:
+            if not self._pending_wakeups and not self._stop.is_set():
+                self._wake.wait(timeout)
+            self._pending_wakeups = max(self._pending_wakeups - 1, 0)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                job = claim_next_job()
+            except Exception:
+                logger.exception("Claiming the next job failed")
+                job = None
+            if job is None:
+                self._wait(get_settings().job_poll_seconds)
+                continue
+            try:
+                run_job(job)
+            except Exception:
+                logger.exception("Recording the outcome of job %s failed", job.id)
+
+
+JOB_POOL = JobWorkerPool()
@@ -0,0 +1,266 @@
+"""
+In-process Prometheus-style metrics rendered in the text exposition format.
+
+Metrics are plain Python objects guarded by a lock per metric, so recording
+an observation costs a dict lookup and a bisect; no external collector or
+client library is required.
+"""
+
+from bisect import bisect_left
+from contextvars import ContextVar, Token
+import math
+import threading
+from typing import Iterable, Optional
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+ITERATION_BUCKETS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+ROUND_TRIP_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+THROUGHPUT_BUCKETS = (10, 100, 500, 1_000, 5_000, 10_000, 50_000, 100_000, 500_000, 1_000_000)
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape_label_value(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    metric_type = ""
+
+    def __init__(self, name: str, documentation: str, label_names: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+
+    def _label_values(self, labels: dict[str, str]) -> tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.label_names)
+
+    def _render_samples(self) -> list[str]:
+        raise NotImplementedError
+
+    def render(self) -> list[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.metric_type}",
+            *self._render_samples(),
+        ]
+
+
+class Counter(_Metric):
+    metric_type = "counter"
+
+    def __init__(self, name: str, documentation: str, label_names: Iterable[str] = ()):
+        super().__init__(name, documentation, label_names)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            return self._values.get(self._label_values(labels), 0.0)
+
+    def _render_samples(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}"
+            for key, value in items
+        ]
+
+
+class Histogram(_Metric):
+    metric_type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Iterable[str] = (),
+        buckets: Iterable[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [per-bucket counts..., +Inf count], sum
+        self._series: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._label_values(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = ([0] * (len(self.buckets) + 1), [0.0])
+                self._series[key] = series
+            series[0][index] += 1
+            series[1][0] += value
+
+    def count(self, **labels: str) -> int:
+        with self._lock:
+            series = self._series.get(self._label_values(labels))
+            return sum(series[0]) if series else 0
+
+    def _render_samples(self) -> list[str]:
+        with self._lock:
+            items = sorted(
+                (key, (list(counts), total[0])) for key, (counts, total) in self._series.items()
+            )
+
+        lines: list[str] = []
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, math.inf), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(self.label_names, key, le)} {cumulative}"
+                )
+            labels = _format_labels(self.label_names, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, label_names: Iterable[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, label_names))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Iterable[str] = (),
+        buckets: Iterable[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, label_names, buckets))
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+def fit_outcome(status: Optional[str]) -> str:
+    """Bounded label for a fit status such as "insufficient_data: 12 days < 21 required"."""
+    if status == "success":
+        return "success"
+    if status is not None and status.startswith("insufficient_data"):
+        return "insufficient_data"
+    return "failed"
+
+
+HTTP_REQUEST_DURATION = REGISTRY.histogram(
+    "budgetradar_http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ("method", "route", "status"),
+)
+HILL_FIT_DURATION = REGISTRY.histogram(
+    "budgetradar_hill_fit_duration_seconds",
+    "Wall time of fit_hill_model by outcome (success, insufficient_data, failed).",
+    ("outcome",),
+)
+CURVE_FIT_ITERATIONS = REGISTRY.histogram(
+    "budgetradar_curve_fit_function_evaluations",
+    "Function evaluations used by each scipy curve_fit call in the alpha grid search.",
+    buckets=ITERATION_BUCKETS,
+)
+DB_ROUND_TRIPS = REGISTRY.histogram(
+    "budgetradar_db_round_trips_per_request",
+    "Database statements executed while serving a request.",
+    ("route",),
+    buckets=ROUND_TRIP_BUCKETS,
+)
+ROWS_INGESTED = REGISTRY.counter(
+    "budgetradar_rows_ingested_total",
+    "Daily metric rows upserted by ingestion source.",
+    ("source",),
+)
+INGEST_ROWS_PER_SECOND = REGISTRY.histogram(
+    "budgetradar_ingest_rows_per_second",
+    "Upsert throughput per ingestion request.",
+    ("source",),
+    buckets=THROUGHPUT_BUCKETS,
+)
+PROVIDER_CACHE_REQUESTS = REGISTRY.counter(
+    "budgetradar_google_ads_cache_requests_total",
+    "Google Ads replay cache lookups by result (hit or miss).",
+    ("result",),
+)
+MODEL_REFITS = REGISTRY.counter(
+    "budgetradar_model_refits_total",
+    "Background refits of channels whose data changed, by result.",
+    ("result",),
+)
+ANALYSIS_SINGLE_FLIGHT = REGISTRY.counter(
+    "budgetradar_analysis_single_flight_total",
+    "Account analyses by role: leaders compute, followers reuse an identical in-flight "
+    "analysis (one computation saved each).",
+    ("role",),
+)
+JOBS_FINISHED = REGISTRY.counter(
+    "budgetradar_jobs_finished_total",
+    "Background job attempts by kind and outcome (succeeded, failed, cancelled, retried).",
+    ("kind", "status"),
+)
+
+
+class _RoundTripCounter:
+    __slots__ = ("count",)
+
+    def __init__(self):
+        self.count = 0
+
+
+_db_round_trips: ContextVar[Optional[_RoundTripCounter]] = ContextVar(
+    "db_round_trips",
+    default=None,
+)
+
+
+def start_db_round_trip_count() -> tuple[_RoundTripCounter, Token]:
+    counter = _RoundTripCounter()
+    return counter, _db_round_trips.set(counter)
+
+
+def stop_db_round_trip_count(token: Token) -> None:
+    _db_round_trips.reset(token)
+
+
+def record_db_round_trip(*_args) -> None:
+    """SQLAlchemy `before_cursor_execute` listener."""
+    counter = _db_round_trips.get()
+    if counter is not None:
+        counter.count += 1
+
+
+def observe_ingest(source: str, rows: int, seconds: float) -> None:
+    ROWS_INGESTED.inc(rows, source=source)
+    if rows > 0 and seconds > 0:
+        INGEST_ROWS_PER_SECOND.observe(rows / seconds, source=source)
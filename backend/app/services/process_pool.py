@@ -0,0 +1,57 @@
+"""
+Process pools for CPU-bound refits (bootstrap resamples, backtest channels).
+
+Workers are started from a forkserver that has already imported the Hill
+fitting stack, so the multi-threaded server process is never forked and a
+new worker does not pay the SciPy import on a request's clock. Each use keeps
+one SharedProcessPool for the life of the process rather than starting
+workers per request.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import os
+import threading
+from typing import Optional
+
+PRELOAD_MODULES = ["app.services.hill_function"]
+
+
+def resolve_workers(workers: Optional[int]) -> int:
+    """None means one worker per CPU; 0 means run inline."""
+    if workers is None:
+        return os.cpu_count() or 1
+    return max(int(workers), 0)
+
+
+def create_process_pool(workers: int) -> ProcessPoolExecutor:
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload(PRELOAD_MODULES)
+    else:
+        context = multiprocessing.get_context("spawn")
+    return ProcessPoolExecutor(max_workers=workers, mp_context=context)
+
+
+class SharedProcessPool:
+    """A pool created on first use and reused; a new worker count replaces it."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._workers = 0
+
+    def get(self, workers: int) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None or self._workers != workers:
+                if self._pool is not None:
+                    self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = create_process_pool(workers)
+                self._workers = workers
+            return self._pool
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
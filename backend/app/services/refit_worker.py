@@ -0,0 +1,155 @@
+"""
+Background refits of channels whose data changed.
+
+Imports and syncs mark the stored model of every channel they touch
+(`mmm_models.refit_requested_at`), or request a first fit for channels that
+have none yet (`channel_refit_requests`). The worker refits just those
+channels and clears the marks, so analysis can serve every channel from its stored
+fit instead of running SciPy on the request.
+
+Every app process runs a worker; each claims a mark with a conditional
+UPDATE before fitting it, so a channel is refit by one of them. A refit that
+raises backs off exponentially and is given up after `refit_max_attempts`
+until new data for the channel arrives (analysis then fits it on request).
+"""
+
+from datetime import datetime, timedelta, timezone
+import logging
+import threading
+import time
+from typing import Optional
+
+from app.config import get_settings
+from app.models.schemas import HillParameters
+from app.services.database import (
+    claim_refit,
+    discard_model_params,
+    fetch_daily_metrics,
+    fetch_refit_backlog,
+    release_refit,
+    save_model_params,
+)
+from app.services.hill_function import fit_hill_model
+from app.services.metrics import HILL_FIT_DURATION, MODEL_REFITS, fit_outcome
+
+logger = logging.getLogger(__name__)
+
+
+def refit_channel(account_id: str, channel_name: str) -> str:
+    """
+    Refit one marked channel from its stored data and return the fit status.
+
+    A failed fit deletes the stored model, so analysis fits the channel from
+    its data (and reports why it is grey) instead of serving an outdated curve.
+    """
+    data_read_at = datetime.now(timezone.utc)
+    spend, conversions, last_date = fetch_daily_metrics(account_id, channel_name)
+
+    fit_started = time.perf_counter()
+    fit_result = fit_hill_model(spend, conversions)
+    HILL_FIT_DURATION.observe(
+        time.perf_counter() - fit_started,
+        outcome=fit_outcome(fit_result.status if fit_result else None),
+    )
+
+    if fit_result is None or fit_result.status != "success":
+        discard_model_params(account_id, channel_name, data_read_at)
+        return fit_result.status if fit_result else "fitting failed"
+
+    save_model_params(
+        account_id,
+        channel_name,
+        HillParameters(
+            alpha=fit_result.alpha,
+            beta=fit_result.beta,
+            kappa=fit_result.kappa,
+            max_yield=fit_result.max_yield,
+            r_squared=fit_result.r_squared,
+        ),
+        spend_history=spend,
+        covariance=fit_result.covariance,
+        data_read_at=data_read_at,
+        history_last_date=last_date,
+        bump_model_generation=True,
+    )
+    return fit_result.status
+
+
+def run_refit_backlog(account_id: Optional[str] = None, limit: Optional[int] = None) -> int:
+    """
+    Refit the due marked channels (oldest mark first); returns how many were refit.
+
+    Channels another worker holds, or that are backing off after a failed
+    attempt, are skipped.
+    """
+    settings = get_settings()
+    refits = 0
+    due = fetch_refit_backlog(account_id, limit, due_at=datetime.now(timezone.utc))
+    for marked_account_id, channel_name, _ in due:
+        attempt = claim_refit(marked_account_id, channel_name)
+        if attempt is None:
+            continue
+        try:
+            status = refit_channel(marked_account_id, channel_name)
+        except Exception:
+            backoff = settings.refit_retry_backoff_seconds * 2 ** (attempt - 1)
+            release_refit(
+                marked_account_id,
+                channel_name,
+                retry_after=datetime.now(timezone.utc) + timedelta(seconds=backoff),
+            )
+            logger.exception(
+                "Refit attempt %d/%d failed for %s / %s",
+                attempt,
+                settings.refit_max_attempts,
+                marked_account_id,
+                channel_name,
+            )
+            MODEL_REFITS.inc(result="error")
+            continue
+        release_refit(marked_account_id, channel_name)
+        MODEL_REFITS.inc(result="success" if status == "success" else "discarded")
+        refits += 1
+    return refits
+
+
+class RefitWorker:
+    """Daemon thread draining the refit backlog; ingestion wakes it early."""
+
+    def __init__(self):
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="refit-worker", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = 5.0) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.clear()
+            try:
+                run_refit_backlog()
+            except Exception:
+                logger.exception("Refit backlog pass failed")
+            self._wake.wait(get_settings().refit_poll_seconds)
+
+
+REFIT_WORKER = RefitWorker()
@@ -0,0 +1,188 @@
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Iterator
+import uuid
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_CHANNEL_NAMES = (
+    "Google Search",
+    "Google Display",
+    "Google Shopping",
+    "Google Video",
+    "Google Performance Max",
+    "Meta Ads",
+    "TikTok Ads",
+    "LinkedIn Ads",
+    "Microsoft Ads",
+    "Pinterest Ads",
+    "Snapchat Ads",
+    "Reddit Ads",
+)
+
+
+@dataclass(frozen=True)
+class SyntheticDataConfig:
+    """
+    Shape and curve parameters for a synthetic daily_metrics dataset.
+
+    Each (account, channel) series draws its own Hill parameters from the
+    configured ranges. Every account draws from its own stream, seeded by the
+    seed and the account's position, so a single seed reproduces the whole
+    dataset whatever `accounts_per_batch` is.
+    """
+
+    accounts: int = 1
+    channels_per_account: int = 2
+    days: int = 365
+    end_date: date = date(2025, 12, 31)
+    seed: int = 42
+    base_spend_min: float = 200.0
+    base_spend_max: float = 5000.0
+    spend_growth: float = 0.3
+    daily_variance: float = 0.2
+    weekend_factor: float = 0.7
+    alpha_min: float = 0.0
+    alpha_max: float = 0.6
+    beta_min: float = 0.6
+    beta_max: float = 2.0
+    kappa_multiplier_min: float = 0.5
+    kappa_multiplier_max: float = 3.0
+    cpa_min: float = 15.0
+    cpa_max: float = 120.0
+    noise: float = 0.05
+    missing_day_rate: float = 0.0
+    accounts_per_batch: int = 50
+
+
+def channel_names_for(count: int) -> list[str]:
+    names = list(DEFAULT_CHANNEL_NAMES[:count])
+    names.extend(f"Channel {idx + 1}" for idx in range(len(names), count))
+    return names
+
+
+def generate_account_ids(config: SyntheticDataConfig) -> list[uuid.UUID]:
+    """Deterministic account ids derived from the config seed."""
+    rng = np.random.default_rng([config.seed, 0])
+    return [
+        uuid.UUID(bytes=rng.bytes(16), version=4)
+        for _ in range(config.accounts)
+    ]
+
+
+def _account_draws(
+    config: SyntheticDataConfig,
+    account_index: int,
+    channels: int,
+) -> dict[str, np.ndarray]:
+    """Every random draw for one account's channels, from that account's stream."""
+    rng = np.random.default_rng([config.seed, 1, account_index])
+    days = config.days
+    return {
+        "base_spend": np.exp(
+            rng.uniform(np.log(config.base_spend_min), np.log(config.base_spend_max), channels)
+        ),
+        "alpha": rng.uniform(config.alpha_min, config.alpha_max, channels),
+        "beta": rng.uniform(config.beta_min, config.beta_max, channels),
+        "kappa_multiplier": rng.uniform(
+            config.kappa_multiplier_min, config.kappa_multiplier_max, channels
+        ),
+        "cpa": rng.uniform(config.cpa_min, config.cpa_max, channels),
+        "variance": rng.uniform(
+            1 - config.daily_variance, 1 + config.daily_variance, (channels, days)
+        ),
+        "noise": (
+            rng.lognormal(0.0, config.noise, (channels, days))
+            if config.noise > 0
+            else np.ones((channels, days))
+        ),
+        "impressions_per_spend": rng.uniform(80, 120, (channels, days)),
+        "present": rng.random((channels, days)),
+    }
+
+
+def _generate_block(
+    config: SyntheticDataConfig,
+    account_ids: list[uuid.UUID],
+    first_account_index: int,
+) -> pd.DataFrame:
+    channel_names = channel_names_for(config.channels_per_account)
+    series = len(account_ids) * len(channel_names)
+    days = config.days
+
+    # An empty block still needs correctly shaped (zero-row) arrays.
+    per_account = [
+        _account_draws(config, first_account_index + offset, len(channel_names))
+        for offset in range(len(account_ids))
+    ] or [_account_draws(config, first_account_index, 0)]
+
+    def draws(name: str) -> np.ndarray:
+        return np.concatenate([account[name] for account in per_account])
+
+    base_spend = draws("base_spend")
+    alpha = draws("alpha")
+    beta = draws("beta")
+    kappa = base_spend * draws("kappa_multiplier")
+    max_yield = kappa / draws("cpa") * 2.0
+
+    start_date = config.end_date - timedelta(days=days - 1)
+    dates = pd.date_range(start_date, periods=days, freq="D")
+    weekend = np.where(dates.dayofweek.to_numpy() >= 5, config.weekend_factor, 1.0)
+    trend = 1 + config.spend_growth * np.arange(days) / days
+    variance = draws("variance")
+    spend = np.round(base_spend[:, None] * trend[None, :] * weekend[None, :] * variance, 2)
+
+    adstocked = np.empty_like(spend)
+    state = np.zeros(series)
+    for t in range(days):
+        state = spend[:, t] + alpha * state
+        adstocked[:, t] = state
+
+    response = np.power(adstocked, beta[:, None])
+    expected = max_yield[:, None] * response / (np.power(kappa, beta)[:, None] + response)
+    conversions = np.round(np.maximum(expected * draws("noise"), 0.0), 2)
+    impressions = (spend * draws("impressions_per_spend")).astype(np.int64)
+
+    keep = draws("present") >= config.missing_day_rate
+
+    series_account = np.repeat(np.arange(len(account_ids)), len(channel_names))
+    series_channel = np.tile(np.arange(len(channel_names)), len(account_ids))
+    series_idx, day_idx = np.nonzero(keep)
+
+    return pd.DataFrame(
+        {
+            "account_id": pd.Categorical.from_codes(
+                series_account[series_idx], categories=[str(a) for a in account_ids]
+            ),
+            "date": dates.date[day_idx],
+            "channel_name": pd.Categorical.from_codes(
+                series_channel[series_idx], categories=channel_names
+            ),
+            "spend": spend[series_idx, day_idx],
+            "conversions": conversions[series_idx, day_idx],
+            "impressions": impressions[series_idx, day_idx],
+        }
+    )
+
+
+def iter_synthetic_metrics(config: SyntheticDataConfig) -> Iterator[pd.DataFrame]:
+    """
+    Yield daily_metrics frames in account batches so large datasets stream
+    through bulk writers without materializing every row at once.
+    """
+    account_ids = generate_account_ids(config)
+    batch_size = max(1, config.accounts_per_batch)
+    for start in range(0, len(account_ids), batch_size):
+        yield _generate_block(
+            config,
+            account_ids[start:start + batch_size],
+            start,
+        )
+
+
+def generate_synthetic_metrics(config: SyntheticDataConfig) -> pd.DataFrame:
+    frames = list(iter_synthetic_metrics(config))
+    if not frames:
+        return _generate_block(config, [], 0)
+    return pd.concat(frames, ignore_index=True)
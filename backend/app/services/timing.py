@@ -0,0 +1,86 @@
+from contextlib import nullcontext
+from contextvars import ContextVar, Token
+import threading
+import time
+from typing import ContextManager, Optional
+
+
+class RequestTimings:
+    """Per-request aggregate of named timing spans (total seconds + call count)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._started = time.perf_counter()
+        self.spans: dict[str, list[float]] = {}
+
+    def add(self, name: str, seconds: float) -> None:
+        with self._lock:
+            span = self.spans.get(name)
+            if span is None:
+                self.spans[name] = [seconds, 1]
+            else:
+                span[0] += seconds
+                span[1] += 1
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self._started
+
+    def as_dict(self) -> dict[str, dict[str, float]]:
+        with self._lock:
+            return {
+                name: {"duration_ms": round(seconds * 1000, 3), "count": int(count)}
+                for name, (seconds, count) in self.spans.items()
+            }
+
+    def server_timing_header(self) -> str:
+        entries = [
+            f'{name};dur={values["duration_ms"]};desc="x{values["count"]}"'
+            for name, values in self.as_dict().items()
+        ]
+        entries.append(f"total;dur={round(self.elapsed() * 1000, 3)}")
+        return ", ".join(entries)
+
+
+class _Span:
+    __slots__ = ("_timings", "_name", "_started")
+
+    def __init__(self, timings: RequestTimings, name: str):
+        self._timings = timings
+        self._name = name
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._timings.add(self._name, time.perf_counter() - self._started)
+        return False
+
+
+_current_timings: ContextVar[Optional[RequestTimings]] = ContextVar(
+    "request_timings",
+    default=None,
+)
+_NULL_SPAN = nullcontext()
+
+
+def timing_span(name: str) -> ContextManager:
+    """
+    Time a block under `name` for the active request.
+
+    Outside a traced request this returns a shared no-op context manager, so
+    instrumented code pays only a ContextVar lookup when tracing is disabled.
+    """
+    timings = _current_timings.get()
+    if timings is None:
+        return _NULL_SPAN
+    return _Span(timings, name)
+
+
+def start_request_timings() -> tuple[RequestTimings, Token]:
+    timings = RequestTimings()
+    return timings, _current_timings.set(timings)
+
+
+def stop_request_timings(token: Token) -> None:
+    _current_timings.reset(token)
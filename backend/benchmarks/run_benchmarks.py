@@ -0,0 +1,442 @@
+"""
+Benchmark the fit, analysis, scenario and import hot paths across data sizes.
+
+Results are written as JSON and optionally compared against a stored
+baseline; any case whose median regresses past the threshold fails the run.
+Database-backed cases use a throwaway SQLite file unless --database-url
+points at a local Postgres.
+
+Examples:
+  python benchmarks/run_benchmarks.py --quick
+  python benchmarks/run_benchmarks.py --output results.json --baseline benchmarks/baseline.json
+  python benchmarks/run_benchmarks.py --update-baseline
+"""
+
+import argparse
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+import json
+import os
+from pathlib import Path
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Optional
+
+# Add parent directory to path so we can import app modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_BASELINE_PATH = Path(__file__).with_name("baseline.json")
+DEFAULT_THRESHOLD = 1.5
+
+
+@dataclass
+class BenchmarkRun:
+    """A timed callable plus untimed work to redo before every call."""
+
+    run: Callable[[], Any]
+    before_each: Optional[Callable[[], Any]] = None
+
+
+@dataclass
+class BenchmarkCase:
+    name: str
+    setup: Callable[..., Callable[[], Any] | BenchmarkRun]
+    sizes: list[dict[str, int]]
+    quick_sizes: list[dict[str, int]]
+    needs_database: bool = False
+
+
+@dataclass
+class BenchmarkContext:
+    seed: int = 42
+    seeded_accounts: dict[tuple[int, int], str] = field(default_factory=dict)
+
+    def synthetic_frame(self, accounts: int, channels: int, days: int) -> pd.DataFrame:
+        from app.services.synthetic_data import SyntheticDataConfig, generate_synthetic_metrics
+
+        return generate_synthetic_metrics(
+            SyntheticDataConfig(
+                accounts=accounts,
+                channels_per_account=channels,
+                days=days,
+                seed=self.seed,
+            )
+        )
+
+    def seeded_account(self, channels: int, days: int) -> str:
+        """Return an account id whose metrics are loaded into the benchmark database."""
+        from app.services.database import bulk_insert_daily_metrics
+        from app.services.synthetic_data import SyntheticDataConfig, iter_synthetic_metrics
+
+        key = (channels, days)
+        if key not in self.seeded_accounts:
+            config = SyntheticDataConfig(
+                accounts=1,
+                channels_per_account=channels,
+                days=days,
+                seed=self.seed + len(self.seeded_accounts) + 1,
+            )
+            frames = list(iter_synthetic_metrics(config))
+            bulk_insert_daily_metrics(frames)
+            self.seeded_accounts[key] = str(frames[0]["account_id"].iloc[0])
+        return self.seeded_accounts[key]
+
+
+BENCHMARKS: list[BenchmarkCase] = []
+
+
+def benchmark(
+    name: str,
+    sizes: list[dict[str, int]],
+    quick_sizes: Optional[list[dict[str, int]]] = None,
+    needs_database: bool = False,
+):
+    def register(setup: Callable[..., Callable[[], Any] | BenchmarkRun]):
+        BENCHMARKS.append(
+            BenchmarkCase(
+                name=name,
+                setup=setup,
+                sizes=sizes,
+                quick_sizes=quick_sizes or sizes[:1],
+                needs_database=needs_database,
+            )
+        )
+        return setup
+
+    return register
+
+
+def _single_channel_series(ctx: BenchmarkContext, days: int) -> tuple[np.ndarray, np.ndarray]:
+    frame = ctx.synthetic_frame(accounts=1, channels=1, days=days)
+    return frame["spend"].to_numpy(dtype=float), frame["conversions"].to_numpy(dtype=float)
+
+
+@benchmark("fit_hill_model", sizes=[{"days": 60}, {"days": 365}, {"days": 730}])
+def bench_fit_hill_model(ctx: BenchmarkContext, days: int):
+    from app.services.hill_function import fit_hill_model
+
+    spend, conversions = _single_channel_series(ctx, days)
+    return lambda: fit_hill_model(spend, conversions)
+
+
+@benchmark("generate_marginal_curve_points", sizes=[{"days": 60}, {"days": 365}, {"days": 730}])
+def bench_generate_marginal_curve_points(ctx: BenchmarkContext, days: int):
+    from app.services.hill_function import fit_hill_model, generate_marginal_curve_points
+
+    spend, conversions = _single_channel_series(ctx, days)
+    fit_result = fit_hill_model(spend, conversions)
+    current_spend = float(spend[-1])
+    return lambda: generate_marginal_curve_points(
+        current_spend=current_spend,
+        params=fit_result,
+        target_cpa=50.0,
+        spend_history=spend,
+    )
+
+
+def _forget_models(account_id: str) -> None:
+    """Delete an account's stored fits so the next analysis fits every channel."""
+    from sqlalchemy import delete
+
+    from app.models.db_models import MMMModel
+    from app.services.database import get_session
+    import uuid
+
+    session = get_session()
+    try:
+        session.execute(delete(MMMModel).where(MMMModel.account_id == uuid.UUID(account_id)))
+        session.commit()
+    finally:
+        session.close()
+
+
+ANALYSIS_SIZES = [{"channels": 2, "days": 180}, {"channels": 8, "days": 180}, {"channels": 24, "days": 365}]
+
+
+def _account_analysis(ctx: BenchmarkContext, channels: int, days: int) -> tuple[str, Callable[[], Any]]:
+    from app.routers.analysis import compute_account_channel_analysis
+
+    account_id = ctx.seeded_account(channels, days)
+    return account_id, lambda: compute_account_channel_analysis(account_id=account_id, target_cpa=50.0)
+
+
+def _scenario_recommendation(ctx: BenchmarkContext, channels: int, days: int) -> tuple[str, Callable[[], Any]]:
+    from app.models.schemas import ScenarioRecommendationRequest
+    from app.routers.scenarios import recommend_scenario
+
+    request = ScenarioRecommendationRequest(
+        account_id=ctx.seeded_account(channels, days),
+        target_cpa=50.0,
+        budget_delta_percent=15.0,
+    )
+    return request.account_id, lambda: recommend_scenario(request)
+
+
+# The plain analysis and scenario cases fit every channel on the request, as
+# on an account's first analysis; the stored-fit cases time the path once the
+# refit worker has caught up.
+@benchmark("compute_account_channel_analysis", sizes=ANALYSIS_SIZES, needs_database=True)
+def bench_compute_account_channel_analysis(ctx: BenchmarkContext, channels: int, days: int):
+    account_id, run = _account_analysis(ctx, channels, days)
+    return BenchmarkRun(run, before_each=lambda: _forget_models(account_id))
+
+
+@benchmark("compute_account_channel_analysis_stored_fits", sizes=ANALYSIS_SIZES, needs_database=True)
+def bench_compute_account_channel_analysis_stored_fits(ctx: BenchmarkContext, channels: int, days: int):
+    _, run = _account_analysis(ctx, channels, days)
+    return run
+
+
+@benchmark("recommend_scenario", sizes=ANALYSIS_SIZES, needs_database=True)
+def bench_recommend_scenario(ctx: BenchmarkContext, channels: int, days: int):
+    account_id, run = _scenario_recommendation(ctx, channels, days)
+    return BenchmarkRun(run, before_each=lambda: _forget_models(account_id))
+
+
+@benchmark("recommend_scenario_stored_fits", sizes=ANALYSIS_SIZES, needs_database=True)
+def bench_recommend_scenario_stored_fits(ctx: BenchmarkContext, channels: int, days: int):
+    _, run = _scenario_recommendation(ctx, channels, days)
+    return run
+
+
+@benchmark("allocate_equal_marginal_cpa", sizes=[{"entities": 500}, {"entities": 2_000}, {"entities": 10_000}])
+def bench_allocate_equal_marginal_cpa(ctx: BenchmarkContext, entities: int):
+    from app.services.budget_allocation import allocate_equal_marginal_cpa
+    from app.services.hill_function import HillFitResult
+
+    rng = np.random.default_rng(ctx.seed)
+    params = [
+        HillFitResult(
+            alpha=float(rng.uniform(0.0, 0.6)),
+            beta=float(rng.uniform(0.8, 2.5)),
+            kappa=float(rng.uniform(200.0, 5_000.0)),
+            max_yield=float(rng.uniform(50.0, 500.0)),
+            r_squared=0.9,
+            status="success",
+        )
+        for _ in range(entities)
+    ]
+    current = np.array([fit.kappa for fit in params]) * rng.uniform(0.5, 1.5, entities)
+    lower = current * 0.8
+    upper = current * 1.25
+    budget = float(current.sum() * 1.1)
+    return lambda: allocate_equal_marginal_cpa(
+        params,
+        target_cpas=50.0,
+        budget=budget,
+        lower_bounds=lower,
+        upper_bounds=upper,
+    )
+
+
+@benchmark("validate_csv_rows", sizes=[{"rows": 1_000}, {"rows": 10_000}, {"rows": 50_000}])
+def bench_validate_csv_rows(ctx: BenchmarkContext, rows: int):
+    from app.routers.import_data import validate_csv_rows
+
+    channels = 10
+    days = -(-rows // channels)
+    frame = ctx.synthetic_frame(accounts=1, channels=channels, days=days).head(rows)
+    csv_frame = pd.DataFrame(
+        {
+            "date": [value.isoformat() for value in frame["date"]],
+            "channel_name": frame["channel_name"].astype(str),
+            "spend": frame["spend"].astype(str),
+            "conversions": frame["conversions"].astype(str),
+            "impressions": frame["impressions"],
+        }
+    ).reset_index(drop=True)
+    return lambda: validate_csv_rows(csv_frame)
+
+
+@benchmark("upsert_daily_metrics_rows", sizes=[{"rows": 500}, {"rows": 2_000}], needs_database=True)
+def bench_upsert_daily_metrics_rows(ctx: BenchmarkContext, rows: int):
+    from app.routers.import_data import DailyMetricUpsertRow, ensure_account_exists, upsert_daily_metrics_rows
+    from app.services.database import get_session
+    import uuid
+
+    channels = 5
+    days = -(-rows // channels)
+    frame = ctx.synthetic_frame(accounts=1, channels=channels, days=days).head(rows)
+    upsert_rows = [
+        DailyMetricUpsertRow(
+            date=row.date,
+            channel_name=str(row.channel_name),
+            spend=float(row.spend),
+            conversions=float(row.conversions),
+            impressions=int(row.impressions),
+        )
+        for row in frame.itertuples(index=False)
+    ]
+    account_id = uuid.uuid4()
+
+    def run():
+        # Every repeat after the first exercises the update branch of the upsert.
+        session = get_session()
+        try:
+            ensure_account_exists(session, account_id, create_if_missing=True)
+            upsert_daily_metrics_rows(session=session, account_id=account_id, rows=upsert_rows)
+            session.commit()
+        finally:
+            session.close()
+
+    return run
+
+
+def _configure_database(database_url: Optional[str]) -> str:
+    from app.config import get_settings
+    from app.services.database import get_engine, init_db
+
+    if database_url is None:
+        database_url = f"sqlite:///{tempfile.mkdtemp(prefix='budgetradar-bench-')}/bench.sqlite"
+    os.environ["DATABASE_URL"] = database_url
+    get_settings.cache_clear()
+    get_engine.cache_clear()
+    init_db()
+    return database_url
+
+
+def _case_id(name: str, params: dict[str, int]) -> str:
+    suffix = ",".join(f"{key}={value}" for key, value in params.items())
+    return f"{name}[{suffix}]"
+
+
+def run_benchmarks(
+    cases: list[BenchmarkCase],
+    quick: bool = False,
+    repeats: int = 5,
+    context: Optional[BenchmarkContext] = None,
+) -> list[dict[str, Any]]:
+    ctx = context or BenchmarkContext()
+    results: list[dict[str, Any]] = []
+
+    for case in cases:
+        for params in (case.quick_sizes if quick else case.sizes):
+            prepared = case.setup(ctx, **params)
+            if not isinstance(prepared, BenchmarkRun):
+                prepared = BenchmarkRun(prepared)
+            prepared.run()  # warm-up: imports, caches, first-insert paths
+
+            timings = []
+            for _ in range(repeats):
+                if prepared.before_each is not None:
+                    prepared.before_each()
+                started = time.perf_counter()
+                prepared.run()
+                timings.append(time.perf_counter() - started)
+
+            results.append(
+                {
+                    "id": _case_id(case.name, params),
+                    "name": case.name,
+                    "params": params,
+                    "repeats": repeats,
+                    "median_seconds": statistics.median(timings),
+                    "min_seconds": min(timings),
+                    "max_seconds": max(timings),
+                }
+            )
+            print(
+                f"{results[-1]['id']:<70} median {results[-1]['median_seconds'] * 1000:10.2f} ms",
+                file=sys.stderr,
+            )
+
+    return results
+
+
+def compare_to_baseline(
+    results: list[dict[str, Any]],
+    baseline: dict[str, Any],
+    threshold: float = DEFAULT_THRESHOLD,
+) -> list[dict[str, Any]]:
+    """Return cases whose median exceeds `threshold` x the baseline median."""
+    baseline_by_id = {row["id"]: row for row in baseline.get("results", [])}
+    regressions: list[dict[str, Any]] = []
+
+    for row in results:
+        reference = baseline_by_id.get(row["id"])
+        if reference is None or reference["median_seconds"] <= 0:
+            continue
+
+        ratio = row["median_seconds"] / reference["median_seconds"]
+        if ratio > threshold:
+            regressions.append(
+                {
+                    "id": row["id"],
+                    "baseline_median_seconds": reference["median_seconds"],
+                    "median_seconds": row["median_seconds"],
+                    "ratio": round(ratio, 3),
+                }
+            )
+
+    return regressions
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quick", action="store_true", help="Run only the smallest size per case")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--filter", default=None, help="Only run cases whose name contains this text")
+    parser.add_argument("--database-url", default=None, help="Defaults to a temporary SQLite file")
+    parser.add_argument("--output", default=None, help="Write JSON results here (default: stdout)")
+    parser.add_argument("--baseline", default=None, help="Baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--update-baseline", action="store_true", help=f"Overwrite {DEFAULT_BASELINE_PATH.name}")
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    cases = [case for case in BENCHMARKS if args.filter is None or args.filter in case.name]
+
+    database_url = None
+    if any(case.needs_database for case in cases):
+        database_url = _configure_database(args.database_url)
+
+    results = run_benchmarks(cases, quick=args.quick, repeats=args.repeats)
+    report = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "database": database_url.split(":", 1)[0] if database_url else None,
+            "quick": args.quick,
+        },
+        "results": results,
+    }
+
+    payload = json.dumps(report, indent=2)
+    if args.update_baseline:
+        DEFAULT_BASELINE_PATH.write_text(payload + "\n")
+    if args.output:
+        Path(args.output).write_text(payload + "\n")
+    elif not args.update_baseline:
+        print(payload)
+
+    if args.baseline:
+        regressions = compare_to_baseline(
+            results,
+            json.loads(Path(args.baseline).read_text()),
+            threshold=args.threshold,
+        )
+        for regression in regressions:
+            print(
+                f"REGRESSION {regression['id']}: {regression['median_seconds'] * 1000:.2f} ms "
+                f"vs baseline {regression['baseline_median_seconds'] * 1000:.2f} ms "
+                f"({regression['ratio']}x > {args.threshold}x)",
+                file=sys.stderr,
+            )
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
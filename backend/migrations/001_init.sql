@@ -3,6 +3,7 @@ CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
 CREATE TABLE IF NOT EXISTS accounts (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
     name TEXT NOT NULL,
+    model_generation INTEGER NOT NULL DEFAULT 0,
     created_at TIMESTAMPTZ DEFAULT NOW(),
     updated_at TIMESTAMPTZ DEFAULT NOW()
 );
@@ -31,6 +32,13 @@ CREATE TABLE IF NOT EXISTS mmm_models (
     kappa NUMERIC(10, 2) NOT NULL,
     max_yield NUMERIC(10, 2) NOT NULL,
     r_squared NUMERIC(10, 4) NOT NULL,
+    adstock_state DOUBLE PRECISION,
+    adstock_prior_state DOUBLE PRECISION,
+    adstock_last_date DATE,
+    covariance JSONB,
+    refit_requested_at TIMESTAMPTZ,
+    refit_attempts INTEGER NOT NULL DEFAULT 0,
+    refit_retry_after TIMESTAMPTZ,
     created_at TIMESTAMPTZ DEFAULT NOW(),
     updated_at TIMESTAMPTZ DEFAULT NOW(),
     UNIQUE(account_id, channel_name)
@@ -38,6 +46,18 @@ CREATE TABLE IF NOT EXISTS mmm_models (
 
 CREATE INDEX IF NOT EXISTS idx_mmm_models_account_id ON mmm_models(account_id);
 
+CREATE TABLE IF NOT EXISTS channel_refit_requests (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    account_id UUID NOT NULL REFERENCES accounts(id) ON DELETE CASCADE,
+    channel_name TEXT NOT NULL,
+    requested_at TIMESTAMPTZ NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    retry_after TIMESTAMPTZ,
+    CONSTRAINT uix_channel_refit_request_account_channel UNIQUE (account_id, channel_name)
+);
+
+CREATE INDEX IF NOT EXISTS idx_channel_refit_requests_account_id ON channel_refit_requests(account_id);
+
 CREATE TABLE IF NOT EXISTS scenarios (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
     account_id UUID NOT NULL REFERENCES accounts(id) ON DELETE CASCADE,
@@ -48,3 +68,26 @@ CREATE TABLE IF NOT EXISTS scenarios (
 );
 
 CREATE INDEX IF NOT EXISTS idx_scenarios_account_id ON scenarios(account_id);
+
+CREATE TABLE IF NOT EXISTS jobs (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    kind TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    priority INTEGER NOT NULL DEFAULT 0,
+    account_id UUID,
+    payload JSONB NOT NULL,
+    result JSONB,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 1,
+    cancel_requested BOOLEAN NOT NULL DEFAULT FALSE,
+    claimed_by TEXT,
+    lease_expires_at TIMESTAMPTZ,
+    run_after TIMESTAMPTZ NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL,
+    started_at TIMESTAMPTZ,
+    finished_at TIMESTAMPTZ
+);
+
+CREATE INDEX IF NOT EXISTS idx_jobs_account_id ON jobs(account_id);
+CREATE INDEX IF NOT EXISTS idx_jobs_queue ON jobs(status, priority, run_after);
@@ -0,0 +1,95 @@
+"""
+Rolling-origin backtest of the Hill fit for one account's channels.
+
+Each channel is refit on expanding windows and scored on the next
+--horizon-days of conversions (MAE and WAPE). Channels run in parallel.
+Reads from the configured database, or from a CSV in the import format
+(date, channel_name, spend, conversions) with --csv.
+
+Examples:
+  python scripts/run_backtest.py --account-id a8465a7b-bf39-4352-9658-4f1b8d05b381
+  python scripts/run_backtest.py --csv /tmp/metrics.csv --horizon-days 14 --output backtest.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+# Add parent directory to path so we can import app modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+import pandas as pd
+
+from app.services.backtest import run_backtests
+
+
+def load_csv_series(path: str, channels: list[str]) -> dict[str, tuple[np.ndarray, np.ndarray]]:
+    frame = pd.read_csv(path, parse_dates=["date"]).sort_values("date")
+    if channels:
+        frame = frame[frame["channel_name"].isin(channels)]
+    return {
+        str(channel): (
+            group["spend"].to_numpy(dtype=float),
+            group["conversions"].to_numpy(dtype=float),
+        )
+        for channel, group in frame.groupby("channel_name", sort=True)
+    }
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--account-id", help="Backtest this account's channels from the database")
+    source.add_argument("--csv", help="Backtest rows from this CSV instead of the database")
+    parser.add_argument("--channel", action="append", default=[], help="Limit to this channel (repeatable)")
+    parser.add_argument("--initial-train-days", type=int, default=56)
+    parser.add_argument("--horizon-days", type=int, default=7)
+    parser.add_argument("--step-days", type=int, default=None, help="Defaults to --horizon-days")
+    parser.add_argument("--max-windows", type=int, default=None, help="Keep only the latest N windows")
+    parser.add_argument("--workers", type=int, default=None, help="Process pool size (0 = inline)")
+    parser.add_argument("--output", default=None, help="Write per-window JSON results here")
+    return parser
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = build_parser().parse_args(argv)
+    if args.csv:
+        series = load_csv_series(args.csv, args.channel)
+    else:
+        from app.routers.backtest import load_channel_series
+
+        series = load_channel_series(args.account_id, args.channel)
+
+    started = time.perf_counter()
+    backtests = run_backtests(
+        series,
+        initial_train_days=args.initial_train_days,
+        horizon_days=args.horizon_days,
+        step_days=args.step_days,
+        max_windows=args.max_windows,
+        workers=args.workers,
+    )
+    elapsed = time.perf_counter() - started
+
+    for backtest in backtests:
+        wape = f"{backtest.wape:.3f}" if backtest.wape is not None else "n/a"
+        mae = f"{backtest.mae:.2f}" if backtest.mae is not None else "n/a"
+        print(
+            f"{backtest.channel_name:<30} windows {len(backtest.windows):4d}  WAPE {wape:>7}  "
+            f"MAE {mae:>9}  fits {backtest.curve_fits:5d}  {backtest.status}"
+        )
+    print(f"✓ Backtested {len(backtests)} channels in {elapsed:.2f}s")
+
+    if args.output:
+        from app.routers.backtest import backtest_result
+
+        payload = [backtest_result(backtest).model_dump() for backtest in backtests]
+        with open(args.output, "w") as handle:
+            json.dump(payload, handle, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,15 @@ if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
 from app.config import get_settings
+from app.services.analysis_snapshots import ANALYSIS_SNAPSHOTS
+from app.services.fit_cache import FIT_CACHE
+
+
+@pytest.fixture(autouse=True)
+def disable_background_workers(monkeypatch):
+    # Apps started by tests must not poll the configured database.
+    monkeypatch.setenv("REFIT_WORKER_ENABLED", "false")
+    monkeypatch.setenv("JOB_WORKERS", "0")
 
 
 @pytest.fixture(autouse=True)
@@ -16,3 +25,12 @@ def clear_settings_cache():
     get_settings.cache_clear()
     yield
     get_settings.cache_clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_fit_cache():
+    FIT_CACHE.clear()
+    ANALYSIS_SNAPSHOTS.clear()
+    yield
+    FIT_CACHE.clear()
+    ANALYSIS_SNAPSHOTS.clear()
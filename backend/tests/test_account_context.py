@@ -20,6 +20,17 @@ class FakeQuery:
         return None
 
 
+class FakeResult:
+    def scalars(self):
+        return self
+
+    def all(self):
+        return []
+
+    def __iter__(self):
+        return iter(())
+
+
 class FakeSession:
     def __init__(self):
         self.account_exists = False
@@ -28,6 +39,9 @@ class FakeSession:
     def query(self, model):
         return FakeQuery(model, self)
 
+    def execute(self, statement):
+        return FakeResult()
+
     def add(self, obj):
         self.added_rows.append(obj)
 
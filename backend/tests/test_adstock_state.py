@@ -0,0 +1,173 @@
+import uuid
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine
+
+from app.models.db_models import Account, Base, DailyMetric, MMMModel
+from app.models.schemas import HillParameters
+from app.routers.import_data import DailyMetricUpsertRow, upsert_daily_metrics_rows
+from app.services import database
+from app.services.hill_function import AdstockState, apply_adstock, get_prior_adstock_state
+
+ACCOUNT_ID = uuid.UUID("a8465a7b-bf39-4352-9658-4f1b8d05b381")
+START = date(2025, 1, 1)
+PARAMS = HillParameters(
+    channel_name="Search",
+    alpha=0.5,
+    beta=1.2,
+    kappa=1000.0,
+    max_yield=300.0,
+    r_squared=0.9,
+)
+
+
+@pytest.fixture
+def sqlite_db(monkeypatch, tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'adstock.sqlite'}")
+    Base.metadata.create_all(bind=engine)
+    monkeypatch.setattr(database, "get_engine", lambda: engine)
+    session = database.get_session()
+    session.add(Account(id=ACCOUNT_ID, name="Test"))
+    session.commit()
+    session.close()
+    return engine
+
+
+def _insert_days(spends: list[float], start: date = START) -> None:
+    session = database.get_session()
+    for offset, spend in enumerate(spends):
+        session.add(
+            DailyMetric(
+                account_id=ACCOUNT_ID,
+                date=start + timedelta(days=offset),
+                channel_name="Search",
+                spend=spend,
+                conversions=1.0,
+            )
+        )
+    session.commit()
+    session.close()
+
+
+def _upsert(spends: list[float], start: date) -> None:
+    session = database.get_session()
+    rows = [
+        DailyMetricUpsertRow(date=start + timedelta(days=offset), channel_name="Search", spend=spend, conversions=1.0)
+        for offset, spend in enumerate(spends)
+    ]
+    upsert_daily_metrics_rows(session, ACCOUNT_ID, rows)
+    session.commit()
+    session.close()
+
+
+def _stored_model() -> MMMModel:
+    session = database.get_session()
+    model = session.query(MMMModel).filter(MMMModel.account_id == ACCOUNT_ID).one()
+    session.close()
+    return model
+
+
+def test_adstock_state_advance_matches_full_recursion():
+    spend = np.array([100.0, 250.0, 80.0, 0.0, 400.0, 310.0])
+
+    state = AdstockState.from_history(0.4, spend[:3]).advance(spend[3:], last_date=START)
+    adstocked = apply_adstock(spend, 0.4)
+
+    assert state.state == pytest.approx(adstocked[-1])
+    assert state.prior_state == pytest.approx(adstocked[-2])
+    assert state.prior_state == pytest.approx(get_prior_adstock_state(spend[-1], 0.4, spend))
+
+
+def test_save_model_params_stores_and_catches_up_state(sqlite_db):
+    spends = [100.0, 200.0, 300.0, 150.0]
+    _insert_days(spends)
+
+    first = database.save_model_params(
+        str(ACCOUNT_ID),
+        "Search",
+        PARAMS,
+        spend_history=np.array(spends),
+        history_last_date=START + timedelta(days=3),
+    )
+    assert first.last_date == START + timedelta(days=3)
+
+    _insert_days([500.0, 50.0], start=START + timedelta(days=4))
+    caught_up = database.save_model_params(str(ACCOUNT_ID), "Search", PARAMS)
+    expected = apply_adstock(np.array(spends + [500.0, 50.0]), PARAMS.alpha)
+
+    assert caught_up.last_date == START + timedelta(days=5)
+    assert caught_up.state == pytest.approx(expected[-1])
+    assert caught_up.prior_state == pytest.approx(expected[-2])
+    assert _stored_model().adstock_state == pytest.approx(expected[-1])
+
+
+def test_ingest_advances_state_and_backfill_clears_it(sqlite_db):
+    spends = [100.0, 200.0, 300.0]
+    _insert_days(spends)
+    database.save_model_params(
+        str(ACCOUNT_ID),
+        "Search",
+        PARAMS,
+        spend_history=np.array(spends),
+        history_last_date=START + timedelta(days=2),
+    )
+
+    _upsert([120.0, 80.0], start=START + timedelta(days=3))
+    model = _stored_model()
+    expected = apply_adstock(np.array(spends + [120.0, 80.0]), PARAMS.alpha)
+
+    assert model.adstock_last_date == START + timedelta(days=4)
+    assert model.adstock_state == pytest.approx(expected[-1])
+    assert model.adstock_prior_state == pytest.approx(expected[-2])
+
+    _upsert([999.0], start=START + timedelta(days=1))
+
+    assert _stored_model().adstock_last_date is None
+
+
+def test_new_alpha_rebuilds_state_from_history(sqlite_db):
+    spends = [100.0, 200.0, 300.0]
+    _insert_days(spends)
+    database.save_model_params(
+        str(ACCOUNT_ID),
+        "Search",
+        PARAMS,
+        spend_history=np.array(spends),
+        history_last_date=START + timedelta(days=2),
+    )
+
+    refit = PARAMS.model_copy(update={"alpha": 0.2})
+    adstock = database.save_model_params(
+        str(ACCOUNT_ID),
+        "Search",
+        refit,
+        spend_history=np.array(spends),
+        history_last_date=START + timedelta(days=2),
+    )
+
+    assert adstock.alpha == 0.2
+    assert adstock.state == pytest.approx(apply_adstock(np.array(spends), 0.2)[-1])
+
+
+def test_day_ingested_during_a_fit_is_folded_into_the_rebuilt_state(sqlite_db):
+    spends = [100.0, 200.0, 300.0]
+    _insert_days(spends)
+    history, _, last_date = database.fetch_daily_metrics(str(ACCOUNT_ID), "Search")
+    # A day lands between reading the history and saving the fit.
+    _insert_days([400.0], start=START + timedelta(days=3))
+
+    adstock = database.save_model_params(
+        str(ACCOUNT_ID),
+        "Search",
+        PARAMS,
+        spend_history=history,
+        history_last_date=last_date,
+    )
+    expected = apply_adstock(np.array(spends + [400.0]), PARAMS.alpha)
+
+    assert last_date == START + timedelta(days=2)
+    assert adstock.last_date == START + timedelta(days=3)
+    assert adstock.state == pytest.approx(expected[-1])
+    assert adstock.prior_state == pytest.approx(expected[-2])
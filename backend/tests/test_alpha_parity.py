@@ -3,7 +3,16 @@ from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
 from app.routers import analysis
-from app.services.hill_function import HillFitResult, calculate_marginal_cpa
+import pytest
+
+from app.services.hill_function import (
+    HillFitResult,
+    calculate_marginal_cpa,
+    calculate_marginal_cpa_array,
+    generate_marginal_curve_points,
+    get_prior_adstock_state,
+    get_traffic_light,
+)
 
 
 def _build_client() -> TestClient:
@@ -45,6 +54,7 @@ def test_analyze_channels_response_includes_curve_payload(monkeypatch):
         lambda account_id, channel_name: (
             np.array([100.0, 110.0, 120.0, 130.0, 140.0]),
             np.array([20.0, 22.0, 24.0, 26.0, 27.0]),
+            None,
         ),
     )
     monkeypatch.setattr(
@@ -61,6 +71,8 @@ def test_analyze_channels_response_includes_curve_payload(monkeypatch):
     )
     monkeypatch.setattr(analysis, "get_current_spend", lambda account_id, channel_name: 140.0)
     monkeypatch.setattr(analysis, "save_model_params", lambda *args, **kwargs: None)
+    monkeypatch.setattr(analysis, "fetch_stored_fits", lambda account_id: {})
+    monkeypatch.setattr(analysis, "fetch_data_fingerprint", lambda account_id: "fingerprint")
 
     client = _build_client()
     response = client.post(
@@ -78,3 +90,76 @@ def test_analyze_channels_response_includes_curve_payload(monkeypatch):
     assert all(point["zone"] in {"green", "yellow", "red"} for point in channel["curve_points"])
     assert channel["current_point"] is not None
     assert set(channel["current_point"].keys()) == {"spend", "marginal_cpa"}
+
+
+def _scalar_curve_points(current_spend, params, target_cpa, spend_history):
+    """Reference per-point loop the vectorized curve generator must reproduce."""
+    prior_state = get_prior_adstock_state(current_spend, params.alpha, spend_history)
+    min_spend = max(current_spend * 0.05, 10.0)
+    max_spend = max(current_spend * 4.0, min_spend * 1.1)
+    step = (max_spend - min_spend) / 120
+
+    points = []
+    for idx in range(121):
+        spend_level = min_spend + (idx * step)
+        marginal_cpa = calculate_marginal_cpa(spend_level, params, prior_adstock_state=prior_state)
+        if marginal_cpa is None or marginal_cpa > target_cpa * 5:
+            continue
+        zone = get_traffic_light(marginal_cpa, target_cpa)
+        points.append(
+            {
+                "spend": float(round(spend_level)),
+                "marginal_cpa": round(float(marginal_cpa), 2),
+                "zone": zone,
+            }
+        )
+    return points
+
+
+@pytest.mark.parametrize(
+    "alpha,beta,kappa,max_yield,current_spend,target_cpa",
+    [
+        (0.0, 1.0, 200.0, 1000.0, 140.0, 50.0),
+        (0.4, 1.0, 200.0, 1000.0, 140.0, 50.0),
+        (0.7, 2.3, 900.0, 400.0, 1200.0, 12.0),
+        (0.2, 0.6, 5000.0, 80.0, 35.0, 3.0),
+        (0.9, 1.8, 150.0, 50.0, 800.0, 5.0),
+    ],
+)
+def test_vectorized_curve_points_match_scalar_loop(alpha, beta, kappa, max_yield, current_spend, target_cpa):
+    params = HillFitResult(
+        alpha=alpha,
+        beta=beta,
+        kappa=kappa,
+        max_yield=max_yield,
+        r_squared=0.9,
+        status="success",
+    )
+    spend_history = np.linspace(current_spend * 0.6, current_spend, 30)
+
+    points, current_point = generate_marginal_curve_points(
+        current_spend=current_spend,
+        params=params,
+        target_cpa=target_cpa,
+        spend_history=spend_history,
+    )
+
+    assert points == _scalar_curve_points(current_spend, params, target_cpa, spend_history)
+    assert current_point == {
+        "spend": float(round(current_spend)),
+        "marginal_cpa": round(
+            float(calculate_marginal_cpa(current_spend, params, spend_history=spend_history)),
+            2,
+        ),
+    }
+
+
+def test_marginal_cpa_array_marks_undefined_levels_as_nan():
+    params = HillFitResult(alpha=0.3, beta=1.0, kappa=200.0, max_yield=1000.0, r_squared=0.9, status="success")
+    levels = np.array([0.0, 50.0, 500.0])
+
+    values = calculate_marginal_cpa_array(levels, params, prior_adstock_state=100.0)
+
+    assert np.isnan(values[0])
+    for level, value in zip(levels[1:], values[1:]):
+        assert value == calculate_marginal_cpa(level, params, prior_adstock_state=100.0)
@@ -24,6 +24,7 @@ def test_analyze_channels_continues_to_return_results_after_rename(monkeypatch):
         lambda account_id, channel_name: (
             np.array([100.0, 120.0, 140.0]),
             np.array([10.0, 11.0, 12.0]),
+            None,
         ),
     )
     monkeypatch.setattr(
@@ -40,6 +41,8 @@ def test_analyze_channels_continues_to_return_results_after_rename(monkeypatch):
     )
     monkeypatch.setattr(analysis, "get_current_spend", lambda account_id, channel_name: 140.0)
     monkeypatch.setattr(analysis, "save_model_params", lambda *args, **kwargs: None)
+    monkeypatch.setattr(analysis, "fetch_stored_fits", lambda account_id: {})
+    monkeypatch.setattr(analysis, "fetch_data_fingerprint", lambda account_id: "fingerprint")
     monkeypatch.setattr(analysis, "calculate_marginal_cpa", lambda current_spend, params, **kwargs: 42.0)
     monkeypatch.setattr(analysis, "get_traffic_light", lambda marginal_cpa, target_cpa: "yellow")
 
@@ -75,6 +78,7 @@ def test_analyze_channels_applies_channel_target_cpa_override(monkeypatch):
         lambda account_id, channel_name: (
             np.array([100.0, 120.0, 140.0]),
             np.array([10.0, 11.0, 12.0]),
+            None,
         ),
     )
     monkeypatch.setattr(
@@ -91,6 +95,8 @@ def test_analyze_channels_applies_channel_target_cpa_override(monkeypatch):
     )
     monkeypatch.setattr(analysis, "get_current_spend", lambda account_id, channel_name: 140.0)
     monkeypatch.setattr(analysis, "save_model_params", lambda *args, **kwargs: None)
+    monkeypatch.setattr(analysis, "fetch_stored_fits", lambda account_id: {})
+    monkeypatch.setattr(analysis, "fetch_data_fingerprint", lambda account_id: "fingerprint")
     monkeypatch.setattr(analysis, "calculate_marginal_cpa", lambda current_spend, params, **kwargs: 42.0)
     monkeypatch.setattr(analysis, "get_traffic_light", lambda marginal_cpa, target_cpa: "green")
 
@@ -128,6 +134,7 @@ def test_analyze_channels_exposes_low_confidence_state(monkeypatch):
         lambda account_id, channel_name: (
             np.array([100.0, 120.0, 140.0]),
             np.array([10.0, 11.0, 12.0]),
+            None,
         ),
     )
     monkeypatch.setattr(
@@ -144,6 +151,8 @@ def test_analyze_channels_exposes_low_confidence_state(monkeypatch):
     )
     monkeypatch.setattr(analysis, "get_current_spend", lambda account_id, channel_name: 140.0)
     monkeypatch.setattr(analysis, "save_model_params", lambda *args, **kwargs: None)
+    monkeypatch.setattr(analysis, "fetch_stored_fits", lambda account_id: {})
+    monkeypatch.setattr(analysis, "fetch_data_fingerprint", lambda account_id: "fingerprint")
     monkeypatch.setattr(analysis, "calculate_marginal_cpa", lambda current_spend, params, **kwargs: 42.0)
     monkeypatch.setattr(analysis, "get_traffic_light", lambda marginal_cpa, target_cpa: "yellow")
 
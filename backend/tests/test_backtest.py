@@ -0,0 +1,101 @@
+import asyncio
+
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app import config
+from app.routers import backtest as backtest_router
+from app.services.backtest import BACKTEST_POOL, backtest_channel, rolling_origins, run_backtests, shutdown_backtest_pool
+from app.services.hill_function import apply_adstock, hill_function
+
+
+def _series(days: int = 140, seed: int = 7) -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    spend = rng.uniform(200, 3000, days)
+    conversions = hill_function(apply_adstock(spend, 0.3), 300.0, 1.3, 1500.0) * rng.normal(1, 0.05, days)
+    return spend, conversions
+
+
+def test_rolling_origins_expand_and_keep_latest_windows():
+    assert rolling_origins(100, 60, 7) == [60, 67, 74, 81, 88]
+    assert rolling_origins(100, 60, 7, step_days=20) == [60, 80]
+    assert rolling_origins(100, 60, 7, max_windows=2) == [81, 88]
+    assert rolling_origins(60, 60, 7) == []
+
+
+def test_backtest_warm_starts_after_the_first_window():
+    spend, conversions = _series()
+
+    result = backtest_channel("Search", spend, conversions, initial_train_days=56, horizon_days=7)
+
+    assert result.status == "success"
+    assert len(result.windows) == 12
+    grid_size = 9
+    # One cold grid search, then at most three warm fits per window.
+    assert result.curve_fits <= grid_size + 3 * (len(result.windows) - 1)
+    assert result.wape < 0.1
+    assert result.windows[-1].alpha == pytest.approx(0.3, abs=0.11)
+
+
+def test_backtest_reports_insufficient_history():
+    spend, conversions = _series(days=40)
+
+    result = backtest_channel("Search", spend, conversions, initial_train_days=56, horizon_days=7)
+
+    assert result.status.startswith("insufficient_data")
+    assert result.windows == [] and result.wape is None
+
+
+def test_parallel_backtests_match_inline_results():
+    series = {"Search": _series(seed=1), "Display": _series(seed=2)}
+
+    inline = run_backtests(series, initial_train_days=56, horizon_days=14, workers=0)
+    try:
+        parallel = run_backtests(series, initial_train_days=56, horizon_days=14, workers=2)
+        pool = BACKTEST_POOL.get(2)
+        again = run_backtests(series, initial_train_days=56, horizon_days=14, workers=2)
+        # Later requests reuse the pool instead of starting workers again.
+        assert BACKTEST_POOL.get(2) is pool
+    finally:
+        shutdown_backtest_pool()
+
+    assert [item.channel_name for item in parallel] == ["Search", "Display"]
+    assert [item.wape for item in parallel] == pytest.approx([item.wape for item in inline])
+    assert [item.wape for item in again] == pytest.approx([item.wape for item in inline])
+
+
+def test_backtest_endpoint_scores_requested_channels(monkeypatch):
+    monkeypatch.setenv("BACKTEST_WORKERS", "0")
+    config.get_settings.cache_clear()
+    data = {"Search": _series(seed=1), "Display": _series(seed=2)}
+    loaded_on_event_loop = []
+
+    def fetch_channels_for_account(account_id):
+        try:
+            asyncio.get_running_loop()
+            loaded_on_event_loop.append(True)
+        except RuntimeError:
+            loaded_on_event_loop.append(False)
+        return list(data)
+
+    monkeypatch.setattr(backtest_router, "fetch_channels_for_account", fetch_channels_for_account)
+    monkeypatch.setattr(backtest_router, "fetch_daily_metrics", lambda account_id, channel: (*data[channel], None))
+
+    app = FastAPI()
+    app.include_router(backtest_router.router)
+    client = TestClient(app)
+    response = client.post(
+        "/api/backtest",
+        json={"account_id": "demo", "channels": ["search"], "horizon_days": 14, "max_windows": 3},
+    )
+    unknown = client.post("/api/backtest", json={"account_id": "demo", "channels": ["TikTok"]})
+
+    assert response.status_code == 200
+    channels = response.json()["channels"]
+    assert [channel["channel_name"] for channel in channels] == ["Search"]
+    assert len(channels[0]["windows"]) == 3
+    assert channels[0]["wape"] is not None
+    assert unknown.status_code == 400
+    assert loaded_on_event_loop == [False, False]
@@ -0,0 +1,51 @@
+from benchmarks.run_benchmarks import (
+    BENCHMARKS,
+    BenchmarkCase,
+    BenchmarkRun,
+    compare_to_baseline,
+    run_benchmarks,
+)
+
+
+def test_compare_to_baseline_flags_only_cases_past_threshold():
+    baseline = {
+        "results": [
+            {"id": "fit_hill_model[days=60]", "median_seconds": 0.010},
+            {"id": "validate_csv_rows[rows=1000]", "median_seconds": 0.050},
+        ]
+    }
+    results = [
+        {"id": "fit_hill_model[days=60]", "median_seconds": 0.020},
+        {"id": "validate_csv_rows[rows=1000]", "median_seconds": 0.060},
+        {"id": "new_case[rows=1]", "median_seconds": 1.0},
+    ]
+
+    regressions = compare_to_baseline(results, baseline, threshold=1.5)
+
+    assert [row["id"] for row in regressions] == ["fit_hill_model[days=60]"]
+    assert regressions[0]["ratio"] == 2.0
+
+
+def test_run_benchmarks_emits_machine_readable_results():
+    cases = [case for case in BENCHMARKS if case.name == "generate_marginal_curve_points"]
+
+    results = run_benchmarks(cases, quick=True, repeats=1)
+
+    assert len(results) == 1
+    assert results[0]["id"] == "generate_marginal_curve_points[days=60]"
+    assert results[0]["median_seconds"] > 0
+    assert results[0]["params"] == {"days": 60}
+
+
+def test_before_each_runs_untimed_before_every_repeat():
+    calls = []
+    case = BenchmarkCase(
+        name="reset_then_run",
+        setup=lambda ctx: BenchmarkRun(lambda: calls.append("run"), before_each=lambda: calls.append("reset")),
+        sizes=[{}],
+        quick_sizes=[{}],
+    )
+
+    run_benchmarks([case], repeats=2)
+
+    assert calls == ["run", "reset", "run", "reset", "run"]
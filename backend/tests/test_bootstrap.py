@@ -0,0 +1,132 @@
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+import time
+
+import numpy as np
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app import config
+from app.routers import analysis
+from app.services import bootstrap
+from app.services.bootstrap import bootstrap_hill_fit, moving_block_indices, shutdown_bootstrap_pool
+from app.services.hill_function import (
+    calculate_marginal_cpa,
+    calculate_marginal_cpa_interval,
+    fit_hill_model,
+    hill_function,
+)
+
+
+def _series(days: int = 150, seed: int = 3) -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    spend = rng.uniform(200, 3000, days)
+    conversions = hill_function(spend, 300.0, 1.3, 1200.0) * rng.normal(1, 0.08, days)
+    return spend, conversions
+
+
+def test_moving_block_indices_are_contiguous_blocks():
+    indices = moving_block_indices(days=30, block_days=7, samples=5, rng=np.random.default_rng(0))
+
+    assert indices.shape == (5, 30)
+    assert indices.min() >= 0 and indices.max() < 30
+    # Within each 7-day block consecutive days stay consecutive.
+    blocks = indices[:, :28].reshape(5, 4, 7)
+    assert np.all(np.diff(blocks, axis=-1) == 1)
+
+
+def test_inline_bootstrap_bands_bracket_marginal_cpa():
+    spend, conversions = _series()
+    fit = fit_hill_model(spend, conversions)
+
+    result = bootstrap_hill_fit(spend, conversions, fit, samples=60, time_budget_seconds=30, workers=0, seed=1)
+    lower, upper = calculate_marginal_cpa_interval(1500.0, fit, draws=result.draws)
+
+    assert result.completed > 50 and not result.timed_out
+    assert lower < calculate_marginal_cpa(1500.0, fit, prior_adstock_state=0.0) < upper
+
+
+def test_bootstrap_returns_partial_draws_when_time_budget_expires():
+    spend, conversions = _series()
+    fit = fit_hill_model(spend, conversions)
+
+    started = time.perf_counter()
+    result = bootstrap_hill_fit(spend, conversions, fit, samples=100_000, time_budget_seconds=0.2, workers=0)
+
+    assert time.perf_counter() - started < 1.0
+    assert result.timed_out
+    assert 0 < result.completed < 100_000
+
+
+def test_process_pool_bootstrap_matches_requested_samples():
+    spend, conversions = _series()
+    fit = fit_hill_model(spend, conversions)
+
+    try:
+        result = bootstrap_hill_fit(spend, conversions, fit, samples=24, time_budget_seconds=60, workers=2, seed=4)
+    finally:
+        shutdown_bootstrap_pool()
+
+    assert result.completed == 24
+    assert not result.timed_out
+    assert np.allclose(np.median(result.draws, axis=0), [fit.max_yield, fit.beta, fit.kappa], rtol=0.3)
+
+
+class BrokenPool:
+    """Stands in for a pool whose worker died: every chunk fails."""
+
+    def __init__(self):
+        self.shut_down = False
+
+    def get(self, workers):
+        return self
+
+    def submit(self, fn, *args):
+        future = Future()
+        future.set_exception(BrokenProcessPool("A process in the process pool was terminated abruptly"))
+        return future
+
+    def shutdown(self):
+        self.shut_down = True
+
+
+def test_broken_pool_is_reset_and_lost_chunks_refit_inline(monkeypatch):
+    spend, conversions = _series()
+    fit = fit_hill_model(spend, conversions)
+    pool = BrokenPool()
+    monkeypatch.setattr(bootstrap, "BOOTSTRAP_POOL", pool)
+
+    result = bootstrap_hill_fit(spend, conversions, fit, samples=12, time_budget_seconds=30, workers=2, seed=4)
+
+    assert pool.shut_down
+    assert result.completed == 12
+    assert not result.timed_out
+
+
+def test_analyze_channels_bootstrap_mode_reports_percentile_bands(monkeypatch):
+    monkeypatch.setenv("BOOTSTRAP_WORKERS", "0")
+    monkeypatch.setenv("BOOTSTRAP_SAMPLES", "40")
+    config.get_settings.cache_clear()
+    spend, conversions = _series()
+    monkeypatch.setattr(analysis, "fetch_channels_for_account", lambda account_id: ["Search"])
+    monkeypatch.setattr(analysis, "fetch_daily_metrics", lambda account_id, channel_name: (spend, conversions, None))
+    monkeypatch.setattr(analysis, "get_current_spend", lambda account_id, channel_name: 1500.0)
+    monkeypatch.setattr(analysis, "save_model_params", lambda *args, **kwargs: None)
+    monkeypatch.setattr(analysis, "fetch_stored_fits", lambda account_id: {})
+    monkeypatch.setattr(analysis, "fetch_data_fingerprint", lambda account_id: "fingerprint")
+
+    app = FastAPI()
+    app.include_router(analysis.router)
+    client = TestClient(app)
+    default = client.post("/api/analyze-channels", json={"account_id": "demo", "target_cpa": 20.0})
+    bootstrapped = client.post(
+        "/api/analyze-channels",
+        json={"account_id": "demo", "target_cpa": 20.0, "uncertainty_method": "bootstrap"},
+    )
+
+    assert default.json()["channels"][0]["uncertainty_method"] == "covariance"
+    channel = bootstrapped.json()["channels"][0]
+    assert channel["uncertainty_method"] == "bootstrap"
+    assert channel["bootstrap_samples"] == 40
+    assert channel["marginal_cpa_lower"] < channel["marginal_cpa"] < channel["marginal_cpa_upper"]
+    assert all("marginal_cpa_lower" in point for point in channel["curve_points"])
@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from app.services.budget_allocation import allocate_equal_marginal_cpa
+from app.services.hill_function import HillFitResult, calculate_marginal_cpa
+
+
+def _fit(alpha: float, beta: float, kappa: float, max_yield: float) -> HillFitResult:
+    return HillFitResult(alpha=alpha, beta=beta, kappa=kappa, max_yield=max_yield, r_squared=0.9, status="success")
+
+
+CHANNELS = [
+    _fit(0.0, 1.0, 2000.0, 200.0),
+    _fit(0.4, 0.8, 800.0, 90.0),
+    _fit(0.2, 1.6, 1500.0, 300.0),
+]
+TARGETS = np.array([20.0, 30.0, 25.0])
+PRIOR_STATES = np.array([0.0, 500.0, 800.0])
+
+
+@pytest.mark.parametrize("budget", [300.0, 3_000.0, 30_000.0])
+def test_allocation_spends_budget_and_equalizes_marginal_cpa_ratio(budget):
+    spends = allocate_equal_marginal_cpa(CHANNELS, TARGETS, budget, prior_adstock_states=PRIOR_STATES)
+
+    assert spends.sum() == pytest.approx(budget, rel=1e-6)
+    funded = spends > 0
+    ratios = [
+        calculate_marginal_cpa(spend, params, prior_adstock_state=prior) / target
+        for params, target, prior, spend in zip(CHANNELS, TARGETS, PRIOR_STATES, spends)
+        if spend > 0
+    ]
+    assert funded.any()
+    assert max(ratios) == pytest.approx(min(ratios), rel=1e-3)
+
+
+def test_allocation_beats_proportional_split_on_projected_conversions():
+    from app.services.hill_function import hill_function
+
+    budget = 4_000.0
+    optimal = allocate_equal_marginal_cpa(CHANNELS, 1.0, budget, prior_adstock_states=PRIOR_STATES)
+    naive = np.full(3, budget / 3)
+
+    def conversions(spends):
+        return sum(
+            float(hill_function(np.array([spend + params.alpha * prior]), params.max_yield, params.beta, params.kappa)[0])
+            for params, prior, spend in zip(CHANNELS, PRIOR_STATES, spends)
+        )
+
+    assert conversions(optimal) > conversions(naive)
+
+
+def test_allocation_of_empty_budget_is_zero():
+    assert allocate_equal_marginal_cpa(CHANNELS, TARGETS, 0.0).tolist() == [0.0, 0.0, 0.0]
+
+
+@pytest.mark.parametrize("budget", [1_000.0, 4_000.0, 50_000.0])
+def test_allocation_respects_box_constraints(budget):
+    lower = np.array([500.0, 0.0, 100.0])
+    upper = np.array([900.0, 400.0, np.inf])
+
+    spends = allocate_equal_marginal_cpa(
+        CHANNELS,
+        TARGETS,
+        budget,
+        prior_adstock_states=PRIOR_STATES,
+        lower_bounds=lower,
+        upper_bounds=upper,
+    )
+
+    assert np.all(spends >= lower - 1e-9)
+    assert np.all(spends <= upper + 1e-9)
+    assert spends.sum() == pytest.approx(max(budget, lower.sum()), rel=1e-6)
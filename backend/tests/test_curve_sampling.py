@@ -0,0 +1,96 @@
+import numpy as np
+
+from app.services import hill_function
+from app.services.hill_function import HillFitResult, generate_marginal_curve_points
+
+PARAMS = HillFitResult(alpha=0.3, beta=1.0, kappa=2000.0, max_yield=200.0, r_squared=0.9, status="success")
+SPEND_HISTORY = np.full(30, 1000.0)
+TARGET_CPA = 25.0
+
+
+def _zone_transitions(points):
+    return [
+        (left, right)
+        for left, right in zip(points, points[1:])
+        if left["zone"] != right["zone"]
+    ]
+
+
+def test_adaptive_sampling_respects_point_budget_and_covers_all_zones():
+    points, current_point = generate_marginal_curve_points(
+        current_spend=1000.0,
+        params=PARAMS,
+        target_cpa=TARGET_CPA,
+        spend_history=SPEND_HISTORY,
+        max_points=40,
+    )
+
+    assert 0 < len(points) <= 40
+    assert {point["zone"] for point in points} == {"green", "yellow", "red"}
+    assert [point["spend"] for point in points] == sorted({point["spend"] for point in points})
+    assert current_point is not None
+
+
+def test_adaptive_sampling_resolves_zone_boundaries_more_sharply_than_uniform_grid():
+    uniform, _ = generate_marginal_curve_points(
+        current_spend=1000.0,
+        params=PARAMS,
+        target_cpa=TARGET_CPA,
+        spend_history=SPEND_HISTORY,
+    )
+    adaptive, _ = generate_marginal_curve_points(
+        current_spend=1000.0,
+        params=PARAMS,
+        target_cpa=TARGET_CPA,
+        spend_history=SPEND_HISTORY,
+        max_points=40,
+    )
+
+    uniform_gaps = [right["spend"] - left["spend"] for left, right in _zone_transitions(uniform)]
+    adaptive_gaps = [right["spend"] - left["spend"] for left, right in _zone_transitions(adaptive)]
+
+    assert len(adaptive) < len(uniform)
+    assert len(adaptive_gaps) == len(uniform_gaps) == 2
+    assert all(adaptive_gap < uniform_gap for adaptive_gap, uniform_gap in zip(adaptive_gaps, uniform_gaps))
+
+
+def test_adaptive_sampling_without_boundaries_spreads_points_evenly():
+    points, _ = generate_marginal_curve_points(
+        current_spend=1000.0,
+        params=PARAMS,
+        target_cpa=1000.0,
+        spend_history=SPEND_HISTORY,
+        max_points=20,
+    )
+
+    assert len(points) == 20
+    assert {point["zone"] for point in points} == {"green"}
+    gaps = np.diff([point["spend"] for point in points])
+    assert gaps.max() - gaps.min() <= 2
+
+
+def test_point_budget_always_keeps_both_ends_of_the_curve(monkeypatch):
+    full, _ = generate_marginal_curve_points(
+        current_spend=1000.0,
+        params=PARAMS,
+        target_cpa=1000.0,
+        spend_history=SPEND_HISTORY,
+    )
+    # More boundary crossings than the point budget can hold.
+    monkeypatch.setattr(
+        hill_function,
+        "_zone_boundary_crossings",
+        lambda spend_levels, *args: np.linspace(spend_levels[5], spend_levels[-5], 20),
+    )
+
+    points, _ = generate_marginal_curve_points(
+        current_spend=1000.0,
+        params=PARAMS,
+        target_cpa=1000.0,
+        spend_history=SPEND_HISTORY,
+        max_points=8,
+    )
+
+    assert len(points) == 8
+    assert points[0]["spend"] == full[0]["spend"]
+    assert points[-1]["spend"] == full[-1]["spend"]
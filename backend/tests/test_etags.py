@@ -0,0 +1,137 @@
+import numpy as np
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+
+from app.models.db_models import Base
+from app.models.schemas import MarginalCpaResult
+from app.routers import analysis, scenarios
+from app.services import database
+from app.services.etags import etag_matches, make_etag
+
+ACCOUNT_ID = "a8465a7b-bf39-4352-9658-4f1b8d05b381"
+
+
+class FakeAccount:
+    def __init__(self):
+        self.version = 1
+        self.runs = 0
+
+    def fingerprint(self, account_id):
+        return f"v{self.version}"
+
+    def compute(self, account_id, target_cpa, *args):
+        self.runs += 1
+        return [
+            analysis.ChannelComputation(
+                result=MarginalCpaResult(
+                    channel_name="Search",
+                    current_spend=100.0 * self.version,
+                    marginal_cpa=10.0,
+                    target_cpa=target_cpa,
+                    traffic_light="green",
+                    recommendation="Scale",
+                    model_params=None,
+                ),
+                fit_result=None,
+                spend_history=np.array([]),
+                prior_adstock_state=None,
+            )
+        ]
+
+
+def _analysis_client(monkeypatch) -> tuple[TestClient, FakeAccount]:
+    account = FakeAccount()
+    monkeypatch.setattr(analysis, "fetch_data_fingerprint", account.fingerprint)
+    monkeypatch.setattr(analysis, "_compute_account_channel_analysis", account.compute)
+    app = FastAPI()
+    app.include_router(analysis.router)
+    return TestClient(app), account
+
+
+def _analyze(client: TestClient, etag: str | None = None, **body):
+    headers = {"If-None-Match": etag} if etag else {}
+    return client.post(
+        "/api/analyze-channels",
+        json={"account_id": ACCOUNT_ID, "target_cpa": 20.0, **body},
+        headers=headers,
+    )
+
+
+def test_if_none_match_uses_weak_comparison_and_lists():
+    etag = make_etag("scenarios", ACCOUNT_ID, "v1")
+
+    assert etag.startswith('W/"')
+    assert etag == make_etag("scenarios", ACCOUNT_ID, "v1")
+    assert etag_matches(etag, etag)
+    assert etag_matches(etag[2:], etag)
+    assert etag_matches(f'"other", {etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches(None, etag)
+    assert not etag_matches(make_etag("scenarios", ACCOUNT_ID, "v2"), etag)
+
+
+def test_unchanged_analysis_returns_304_without_recomputing(monkeypatch):
+    client, account = _analysis_client(monkeypatch)
+
+    first = _analyze(client)
+    etag = first.headers["etag"]
+    repeat = _analyze(client, etag)
+
+    assert first.status_code == 200
+    assert repeat.status_code == 304
+    assert repeat.content == b""
+    assert repeat.headers["etag"] == etag
+    assert account.runs == 1
+
+
+def test_changed_data_or_parameters_get_a_new_etag(monkeypatch):
+    client, account = _analysis_client(monkeypatch)
+    etag = _analyze(client).headers["etag"]
+
+    other_target = _analyze(client, etag, target_cpa=25.0)
+    account.version = 2
+    changed_data = _analyze(client, etag)
+
+    assert other_target.status_code == 200
+    assert other_target.headers["etag"] != etag
+    assert changed_data.status_code == 200
+    assert changed_data.headers["etag"] not in (etag, other_target.headers["etag"])
+    assert changed_data.json()["channels"][0]["current_spend"] == 200.0
+
+
+def test_stale_snapshot_keeps_its_etag_until_refreshed(monkeypatch):
+    client, account = _analysis_client(monkeypatch)
+    monkeypatch.setattr(analysis, "_refresh_in_background", lambda request, request_key: None)
+    fresh = _analyze(client, freshness="stale_while_revalidate")
+
+    account.version = 2
+    stale = _analyze(client, freshness="stale_while_revalidate")
+    stale_again = _analyze(client, stale.headers["etag"], freshness="stale_while_revalidate")
+
+    assert stale.json()["stale"] is True
+    assert stale.headers["etag"] != fresh.headers["etag"]
+    assert stale_again.status_code == 304
+    assert account.runs == 1
+
+
+def test_scenario_listing_is_revalidated_against_saved_scenarios(monkeypatch, tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'scenarios.sqlite'}")
+    Base.metadata.create_all(bind=engine)
+    monkeypatch.setattr(database, "get_engine", lambda: engine)
+    database.save_scenario(ACCOUNT_ID, "Baseline", {"recommendations": []})
+    app = FastAPI()
+    app.include_router(scenarios.router)
+    client = TestClient(app)
+
+    first = client.get(f"/api/scenarios/{ACCOUNT_ID}")
+    etag = first.headers["etag"]
+    unchanged = client.get(f"/api/scenarios/{ACCOUNT_ID}", headers={"If-None-Match": etag})
+    database.save_scenario(ACCOUNT_ID, "Scale search", {"recommendations": []})
+    changed = client.get(f"/api/scenarios/{ACCOUNT_ID}", headers={"If-None-Match": etag})
+
+    assert len(first.json()["scenarios"]) == 1
+    assert unchanged.status_code == 304
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert len(changed.json()["scenarios"]) == 2
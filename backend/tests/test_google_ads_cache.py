@@ -0,0 +1,117 @@
+from datetime import date, datetime
+
+from app.services import google_ads_client
+from app.services.google_ads_cache import CachingGoogleAdsProvider
+from app.services.google_ads_client import GoogleAdsMockProvider
+
+
+class CountingProvider:
+    provider_mode = "mock"
+    query_template = "SELECT test"
+
+    def __init__(self):
+        self.calls: list[tuple[date, date]] = []
+        self._inner = GoogleAdsMockProvider()
+
+    def fetch_daily_metrics(self, customer_id: str, date_from: date, date_to: date):
+        self.calls.append((date_from, date_to))
+        return self._inner.fetch_daily_metrics(customer_id, date_from, date_to)
+
+
+class FakeClock:
+    def __init__(self, now: datetime):
+        self.now = now.timestamp()
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _build_cache(tmp_path, provider, today: date, clock: FakeClock) -> CachingGoogleAdsProvider:
+    return CachingGoogleAdsProvider(
+        provider,
+        cache_dir=tmp_path,
+        recent_days=3,
+        recent_ttl_seconds=3600,
+        today=lambda: today,
+        clock=clock,
+    )
+
+
+def test_cache_replays_settled_windows_from_disk(tmp_path):
+    provider = CountingProvider()
+    clock = FakeClock(datetime(2025, 6, 1, 12, 0))
+    cache = _build_cache(tmp_path, provider, date(2025, 6, 1), clock)
+
+    first = cache.fetch_daily_metrics("123-456-7890", date(2025, 1, 10), date(2025, 2, 5))
+    assert provider.calls == [
+        (date(2025, 1, 1), date(2025, 1, 31)),
+        (date(2025, 2, 1), date(2025, 2, 28)),
+    ]
+    assert cache.misses == 2
+
+    clock.now += 86400 * 365
+    replay = CachingGoogleAdsProvider(
+        provider,
+        cache_dir=tmp_path,
+        today=lambda: date(2026, 6, 1),
+        clock=clock,
+    )
+    second = replay.fetch_daily_metrics("1234567890", date(2025, 1, 10), date(2025, 2, 5))
+
+    assert len(provider.calls) == 2
+    assert replay.hits == 2
+    assert second == first
+    assert min(row.date for row in second) == date(2025, 1, 10)
+    assert max(row.date for row in second) == date(2025, 2, 5)
+
+
+def test_cache_expires_recent_windows_after_ttl(tmp_path):
+    provider = CountingProvider()
+    clock = FakeClock(datetime(2025, 3, 15, 9, 0))
+    cache = _build_cache(tmp_path, provider, date(2025, 3, 15), clock)
+
+    cache.fetch_daily_metrics("1234567890", date(2025, 3, 1), date(2025, 3, 15))
+    cache.fetch_daily_metrics("1234567890", date(2025, 3, 1), date(2025, 3, 15))
+    assert provider.calls == [(date(2025, 3, 1), date(2025, 3, 15))]
+
+    clock.now += 3601
+    cache.fetch_daily_metrics("1234567890", date(2025, 3, 1), date(2025, 3, 15))
+    assert len(provider.calls) == 2
+
+
+def test_cache_keys_entries_by_customer_id(tmp_path):
+    provider = CountingProvider()
+    clock = FakeClock(datetime(2025, 6, 1, 12, 0))
+    cache = _build_cache(tmp_path, provider, date(2025, 6, 1), clock)
+
+    cache.fetch_daily_metrics("1234567890", date(2025, 1, 1), date(2025, 1, 5))
+    cache.fetch_daily_metrics("1234567801", date(2025, 1, 1), date(2025, 1, 5))
+
+    assert len(provider.calls) == 2
+
+
+def test_cache_keys_mock_entries_by_provider_configuration(tmp_path):
+    clock = FakeClock(datetime(2025, 6, 1, 12, 0))
+    two_channels = _build_cache(tmp_path, GoogleAdsMockProvider(), date(2025, 6, 1), clock)
+    scaled = _build_cache(
+        tmp_path,
+        GoogleAdsMockProvider(channels=6, campaigns_per_channel=2),
+        date(2025, 6, 1),
+        clock,
+    )
+
+    narrow = two_channels.fetch_daily_metrics("1234567890", date(2025, 1, 1), date(2025, 1, 5))
+    wide = scaled.fetch_daily_metrics("1234567890", date(2025, 1, 1), date(2025, 1, 5))
+
+    assert scaled.misses == 1
+    assert len({row.channel_name for row in narrow}) == 2
+    assert len({row.channel_name for row in wide}) == 6
+
+
+def test_get_google_ads_client_wraps_provider_when_cache_dir_configured(monkeypatch, tmp_path):
+    monkeypatch.setenv("GOOGLE_ADS_CACHE_DIR", str(tmp_path))
+
+    provider = google_ads_client.get_google_ads_client()
+
+    assert isinstance(provider, CachingGoogleAdsProvider)
+    assert provider.provider_mode == "mock"
@@ -0,0 +1,79 @@
+from datetime import date, timedelta
+
+import pytest
+
+from app.services import google_ads_client
+from app.services.google_ads_client import GoogleAdsMockProvider
+from app.services.google_ads_provider_types import GoogleAdsMetricRow, rollup_campaign_rows
+
+
+def _legacy_mock_rows(customer_id: str, date_from: date, date_to: date) -> list[GoogleAdsMetricRow]:
+    channels = ("Google Search", "Google Display")
+    customer_seed = int(customer_id[-2:])
+    rows = []
+    for day_offset in range((date_to - date_from).days + 1):
+        metric_date = date_from + timedelta(days=day_offset)
+        seasonal_offset = (metric_date.toordinal() % 9) * 4
+        for channel_index, channel_name in enumerate(channels):
+            spend = round(90 + (channel_index * 35) + seasonal_offset + (customer_seed % 7), 2)
+            rows.append(
+                GoogleAdsMetricRow(
+                    date=metric_date,
+                    channel_name=channel_name,
+                    spend=spend,
+                    conversions=round(max(spend / (24 + (channel_index * 5)), 0.01), 2),
+                    impressions=int(spend * (50 + (channel_index * 15))),
+                )
+            )
+    return rows
+
+
+@pytest.mark.parametrize("customer_id", ["1234567890", "9876543213", "5555555506"])
+def test_default_mock_matches_legacy_two_channel_feed(customer_id):
+    provider = GoogleAdsMockProvider()
+    rows = provider.fetch_daily_metrics(customer_id, date(2025, 1, 1), date(2025, 3, 31))
+
+    assert rows == _legacy_mock_rows(customer_id, date(2025, 1, 1), date(2025, 3, 31))
+
+
+def test_scale_mode_emits_n_channels_with_campaign_rows():
+    provider = GoogleAdsMockProvider(channels=12, campaigns_per_channel=3)
+    rows = provider.fetch_daily_metrics("1234567890", date(2025, 1, 1), date(2025, 1, 10))
+
+    assert len(rows) == 10 * 12 * 3
+    channels = {row.channel_name for row in rows}
+    assert len(channels) == 12
+    assert "Google Performance Max" in channels
+    assert "Google Channel 12" in channels
+    assert {row.campaign_name for row in rows if row.channel_name == "Google Search"} == {
+        "Google Search Campaign 1",
+        "Google Search Campaign 2",
+        "Google Search Campaign 3",
+    }
+
+    rolled_up = rollup_campaign_rows(rows)
+    assert len(rolled_up) == 10 * 12
+    assert all(row.campaign_name is None for row in rolled_up)
+
+
+def test_scale_mode_injects_errors_and_latency(monkeypatch):
+    sleeps: list[float] = []
+    monkeypatch.setattr(google_ads_client.time, "sleep", sleeps.append)
+
+    failing = GoogleAdsMockProvider(latency_ms=25, error_rate=1.0, seed=1)
+    with pytest.raises(RuntimeError, match="injected mock error"):
+        failing.fetch_daily_metrics("1234567890", date(2025, 1, 1), date(2025, 1, 1))
+    assert sleeps == [0.025]
+
+    healthy = GoogleAdsMockProvider(error_rate=0.0)
+    assert healthy.fetch_daily_metrics("1234567890", date(2025, 1, 1), date(2025, 1, 1))
+
+
+def test_get_google_ads_client_applies_mock_scale_settings(monkeypatch):
+    monkeypatch.setenv("GOOGLE_ADS_MOCK_CHANNELS", "5")
+    monkeypatch.setenv("GOOGLE_ADS_MOCK_CAMPAIGNS_PER_CHANNEL", "2")
+
+    provider = google_ads_client.get_google_ads_client()
+    rows = provider.fetch_daily_metrics("1234567890", date(2025, 1, 1), date(2025, 1, 1))
+
+    assert len(rows) == 5 * 2
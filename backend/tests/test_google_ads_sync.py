@@ -5,6 +5,7 @@ from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
 from app.config import get_settings
+from app.models.db_models import ChannelRefitRequest
 from app.routers import google_ads, import_data
 from app.services.google_ads_provider_types import GoogleAdsMetricRow
 
@@ -45,6 +46,17 @@ class FakeQuery:
         return None
 
 
+class FakeResult:
+    def scalars(self):
+        return self
+
+    def all(self):
+        return []
+
+    def __iter__(self):
+        return iter(())
+
+
 class FakeSession:
     def __init__(self):
         self.account_exists = True
@@ -56,9 +68,15 @@ class FakeSession:
     def query(self, model):
         return FakeQuery(model, self)
 
+    def execute(self, statement):
+        return FakeResult()
+
     def add(self, row):
         self.added_rows.append(row)
 
+    def rows_of(self, model):
+        return [row for row in self.added_rows if isinstance(row, model)]
+
     def commit(self):
         self.commit_count += 1
 
@@ -136,8 +154,14 @@ def test_google_ads_sync_upserts_rows(monkeypatch):
     assert existing_row.conversions == 7.0
     assert existing_row.impressions == 7000
 
-    assert len(session.added_rows) == 1
-    assert session.added_rows[0].channel_name == "Google Display"
+    added_metrics = session.rows_of(import_data.DailyMetric)
+    assert len(added_metrics) == 1
+    assert added_metrics[0].channel_name == "Google Display"
+    # Neither channel has a stored model yet, so both are queued for a first fit.
+    assert {row.channel_name for row in session.rows_of(ChannelRefitRequest)} == {
+        "Google Display",
+        "Google Search",
+    }
     assert session.commit_count == 1
     assert session.closed is True
 
@@ -237,3 +261,51 @@ def test_google_ads_sync_real_provider_requires_credentials(monkeypatch):
 
     assert response.status_code == 400
     assert "GOOGLE_ADS_PROVIDER=real requires credentials" in response.json()["detail"]
+
+
+def test_google_ads_sync_rolls_up_campaign_rows_to_channel_grain(monkeypatch):
+    session = FakeSession()
+    provider_rows = [
+        GoogleAdsMetricRow(
+            date=date(2025, 1, 1),
+            channel_name="Google Search",
+            spend=60.0,
+            conversions=3.0,
+            impressions=3000,
+            campaign_name="Brand",
+        ),
+        GoogleAdsMetricRow(
+            date=date(2025, 1, 1),
+            channel_name="Google Search",
+            spend=40.5,
+            conversions=1.5,
+            impressions=2000,
+            campaign_name="Generic",
+        ),
+    ]
+
+    monkeypatch.setattr(google_ads, "get_session", lambda: session)
+    monkeypatch.setattr(
+        google_ads,
+        "get_google_ads_client",
+        lambda: StubGoogleAdsClient(provider_rows),
+    )
+    client = _build_client()
+
+    response = client.post(
+        "/api/import/google-ads/sync",
+        json={
+            "account_id": str(uuid.uuid4()),
+            "customer_id": "123-456-7890",
+            "date_from": "2025-01-01",
+            "date_to": "2025-01-01",
+        },
+    )
+
+    assert response.status_code == 200
+    assert response.json()["rows_imported"] == 1
+    added_metrics = session.rows_of(import_data.DailyMetric)
+    assert len(added_metrics) == 1
+    assert added_metrics[0].spend == 100.5
+    assert added_metrics[0].conversions == 4.5
+    assert added_metrics[0].impressions == 5000
@@ -4,6 +4,7 @@ import uuid
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
+from app.models.db_models import ChannelRefitRequest
 from app.routers import import_data
 
 
@@ -21,6 +22,17 @@ class FakeQuery:
         return None
 
 
+class FakeResult:
+    def scalars(self):
+        return self
+
+    def all(self):
+        return []
+
+    def __iter__(self):
+        return iter(())
+
+
 class FakeSession:
     def __init__(self):
         self.account_exists = True
@@ -29,9 +41,15 @@ class FakeSession:
     def query(self, model):
         return FakeQuery(model, self)
 
+    def execute(self, statement):
+        return FakeResult()
+
     def add(self, obj):
         self.added_rows.append(obj)
 
+    def rows_of(self, model):
+        return [row for row in self.added_rows if isinstance(row, model)]
+
     def commit(self):
         return None
 
@@ -66,7 +84,8 @@ def test_import_accepts_conversions_header(monkeypatch):
     assert body["success"] is True
     assert body["rows_imported"] == 1
     assert set(body["channels"]) == {"Google Ads"}
-    assert len(fake_session.added_rows) == 1
+    assert len(fake_session.rows_of(import_data.DailyMetric)) == 1
+    assert [row.channel_name for row in fake_session.rows_of(ChannelRefitRequest)] == ["Google Ads"]
 
 
 def test_import_accepts_column_map_for_non_canonical_headers(monkeypatch):
@@ -100,7 +119,8 @@ def test_import_accepts_column_map_for_non_canonical_headers(monkeypatch):
     assert body["success"] is True
     assert body["rows_imported"] == 1
     assert set(body["channels"]) == {"Google Ads"}
-    assert len(fake_session.added_rows) == 1
+    assert len(fake_session.rows_of(import_data.DailyMetric)) == 1
+    assert [row.channel_name for row in fake_session.rows_of(ChannelRefitRequest)] == ["Google Ads"]
 
 
 def test_import_rejects_column_map_with_unsupported_canonical_field(monkeypatch):
@@ -264,9 +284,8 @@ def test_import_auto_creates_unknown_valid_account(monkeypatch):
 
     assert response.status_code == 200
     assert response.json()["success"] is True
-    assert len(fake_session.added_rows) == 2
-    assert any(isinstance(row, import_data.Account) for row in fake_session.added_rows)
-    assert any(isinstance(row, import_data.DailyMetric) for row in fake_session.added_rows)
+    assert len(fake_session.rows_of(import_data.Account)) == 1
+    assert len(fake_session.rows_of(import_data.DailyMetric)) == 1
 
 
 def test_import_rejects_invalid_required_numeric_values(monkeypatch):
@@ -0,0 +1,183 @@
+from datetime import datetime, timedelta, timezone
+import time
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+
+from app.models.db_models import Base, Job
+from app.routers import import_data, jobs as jobs_router
+from app.services import database, jobs
+
+
+@pytest.fixture
+def sqlite_db(monkeypatch, tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'jobs.sqlite'}")
+    Base.metadata.create_all(bind=engine)
+    monkeypatch.setattr(database, "get_engine", lambda: engine)
+    monkeypatch.setenv("JOB_RETRY_BACKOFF_SECONDS", "0")
+    return engine
+
+
+@pytest.fixture
+def handlers(monkeypatch):
+    calls = []
+
+    def record(payload):
+        calls.append(payload["name"])
+        return {"name": payload["name"]}
+
+    def flaky(payload):
+        calls.append("flaky")
+        raise RuntimeError("provider timeout")
+
+    def rejected(payload):
+        calls.append("rejected")
+        raise HTTPException(status_code=404, detail="No channels found for this account")
+
+    monkeypatch.setitem(jobs.JOB_HANDLERS, "record", record)
+    monkeypatch.setitem(jobs.JOB_HANDLERS, "flaky", flaky)
+    monkeypatch.setitem(jobs.JOB_HANDLERS, "rejected", rejected)
+    return calls
+
+
+def test_jobs_run_in_priority_then_submission_order(sqlite_db, handlers):
+    jobs.enqueue_job("record", {"name": "sync"}, priority=0)
+    jobs.enqueue_job("record", {"name": "analysis"}, priority=10)
+    jobs.enqueue_job("record", {"name": "import"}, priority=0)
+
+    assert jobs.run_pending_jobs() == 3
+    assert handlers == ["analysis", "sync", "import"]
+
+
+def test_failing_job_is_retried_until_max_attempts(sqlite_db, handlers):
+    job = jobs.enqueue_job("flaky", {}, max_attempts=3)
+
+    jobs.run_pending_jobs()
+
+    finished = jobs.get_job(job.id)
+    assert handlers == ["flaky"] * 3
+    assert finished.status == "failed"
+    assert finished.attempts == 3
+    assert "provider timeout" in finished.error
+
+
+def test_client_errors_fail_without_retry(sqlite_db, handlers):
+    job = jobs.enqueue_job("rejected", {}, max_attempts=3)
+
+    jobs.run_pending_jobs()
+
+    assert handlers == ["rejected"]
+    assert jobs.get_job(job.id).status == "failed"
+
+
+def test_cancelled_jobs_never_run_and_running_jobs_are_not_retried(sqlite_db, handlers):
+    queued = jobs.enqueue_job("record", {"name": "never"})
+    assert jobs.cancel_job(queued.id).status == "cancelled"
+
+    running = jobs.enqueue_job("flaky", {}, max_attempts=3)
+    claimed = jobs.claim_next_job()
+    assert claimed.id == running.id
+    assert jobs.cancel_job(running.id).cancel_requested
+
+    assert jobs.run_job(claimed) == "cancelled"
+    assert jobs.run_pending_jobs() == 0
+    assert handlers == ["flaky"]
+
+
+def test_cancel_while_running_discards_the_result(sqlite_db, handlers):
+    job = jobs.enqueue_job("record", {"name": "report"})
+    claimed = jobs.claim_next_job()
+    jobs.cancel_job(job.id)
+
+    assert jobs.run_job(claimed) == "cancelled"
+    finished = jobs.get_job(job.id)
+    assert finished.status == "cancelled"
+    assert finished.result is None
+    assert handlers == ["report"]
+
+
+def _expire_lease(job_id) -> None:
+    session = database.get_session()
+    session.get(Job, job_id).lease_expires_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+    session.commit()
+    session.close()
+
+
+def test_requeue_on_startup_leaves_jobs_with_a_live_lease(sqlite_db, handlers):
+    live = jobs.enqueue_job("record", {"name": "live"})
+    interrupted = jobs.enqueue_job("record", {"name": "interrupted"})
+    jobs.claim_next_job()
+    jobs.claim_next_job()
+    _expire_lease(interrupted.id)
+
+    assert jobs.requeue_interrupted_jobs() == 1
+    assert jobs.get_job(live.id).status == "running"
+    assert jobs.get_job(interrupted.id).status == "queued"
+
+
+def test_expired_lease_is_reclaimed_and_the_old_worker_result_dropped(sqlite_db, handlers, monkeypatch):
+    job = jobs.enqueue_job("record", {"name": "sync"})
+    first = jobs.claim_next_job()
+    assert jobs.claim_next_job() is None
+
+    _expire_lease(job.id)
+    monkeypatch.setattr(jobs, "WORKER_ID", "other-process")
+    second = jobs.claim_next_job()
+    assert second.id == job.id
+    assert second.attempts == 2
+
+    monkeypatch.setattr(jobs, "WORKER_ID", first.claimed_by)
+    assert jobs.run_job(first) == "running"
+    monkeypatch.setattr(jobs, "WORKER_ID", "other-process")
+    assert jobs.run_job(second) == "succeeded"
+
+
+def test_worker_pool_runs_enqueued_jobs(sqlite_db, handlers):
+    pool = jobs.JobWorkerPool()
+    pool.start(2)
+    try:
+        job_ids = [jobs.enqueue_job("record", {"name": f"job-{index}"}).id for index in range(4)]
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline:
+            if all(jobs.get_job(job_id).status == "succeeded" for job_id in job_ids):
+                break
+            time.sleep(0.05)
+    finally:
+        pool.stop()
+
+    assert sorted(handlers) == ["job-0", "job-1", "job-2", "job-3"]
+
+
+def test_background_csv_import_reports_status_and_result(sqlite_db):
+    app = FastAPI()
+    app.include_router(import_data.router)
+    app.include_router(jobs_router.router)
+    client = TestClient(app)
+    csv_content = (
+        "date,channel_name,spend,conversions\n"
+        "2025-01-01,Google Ads,100.00,5.00\n"
+        "2025-01-02,Google Ads,120.00,6.00\n"
+    )
+
+    accepted = client.post(
+        "/api/import/csv",
+        params={"background": "true"},
+        data={"account_id": "a8465a7b-bf39-4352-9658-4f1b8d05b381"},
+        files={"file": ("metrics.csv", csv_content, "text/csv")},
+    )
+    job_id = accepted.json()["job_id"]
+    pending = client.get(f"/api/jobs/{job_id}/result")
+
+    jobs.run_pending_jobs()
+    status = client.get(f"/api/jobs/{job_id}")
+    result = client.get(f"/api/jobs/{job_id}/result")
+
+    assert accepted.status_code == 202
+    assert accepted.headers["location"] == f"/api/jobs/{job_id}"
+    assert pending.status_code == 409
+    assert status.json()["status"] == "succeeded"
+    assert status.json()["attempts"] == 1
+    assert result.json()["rows_imported"] == 2
+    assert client.get("/api/jobs/not-a-uuid").status_code == 400
@@ -0,0 +1,64 @@
+import numpy as np
+from fastapi.testclient import TestClient
+
+from app import config, main
+from app.services.hill_function import fit_hill_model, hill_function
+from app.services.metrics import CURVE_FIT_ITERATIONS, MetricsRegistry
+
+
+def test_histogram_renders_cumulative_buckets_sum_and_count():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("demo_seconds", "Demo latency.", ("route",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, route="/a")
+    histogram.observe(0.1, route="/a")
+    histogram.observe(3.0, route="/a")
+
+    lines = registry.render().splitlines()
+
+    assert "# TYPE demo_seconds histogram" in lines
+    assert 'demo_seconds_bucket{route="/a",le="0.1"} 2' in lines
+    assert 'demo_seconds_bucket{route="/a",le="1"} 2' in lines
+    assert 'demo_seconds_bucket{route="/a",le="+Inf"} 3' in lines
+    assert 'demo_seconds_sum{route="/a"} 3.15' in lines
+    assert 'demo_seconds_count{route="/a"} 3' in lines
+
+
+def test_counter_escapes_label_values():
+    registry = MetricsRegistry()
+    counter = registry.counter("demo_total", "Demo counter.", ("channel",))
+    counter.inc(2, channel='Google "Search"')
+
+    assert 'demo_total{channel="Google \\"Search\\""} 2' in registry.render()
+
+
+def test_fit_hill_model_records_curve_fit_evaluations():
+    rng = np.random.default_rng(5)
+    spend = rng.uniform(500, 1500, 60)
+    conversions = hill_function(spend, 400.0, 1.2, 900.0) * rng.normal(1, 0.03, 60)
+    before = CURVE_FIT_ITERATIONS.count()
+
+    result = fit_hill_model(spend, conversions)
+
+    assert result.status == "success"
+    assert CURVE_FIT_ITERATIONS.count() > before
+
+
+def test_metrics_endpoint_exposes_route_latency_without_api_key(monkeypatch):
+    monkeypatch.setenv("REQUIRE_API_KEY", "true")
+    monkeypatch.setenv("APP_API_KEY", "test-secret")
+    monkeypatch.setattr(main, "init_db", lambda: None)
+    config.get_settings.cache_clear()
+
+    with TestClient(main.app) as client:
+        assert client.get("/api/health").status_code == 200
+        response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert (
+        'budgetradar_http_request_duration_seconds_count{method="GET",route="/api/health",status="200"}'
+        in body
+    )
+    assert 'budgetradar_db_round_trips_per_request_count{route="/api/health"}' in body
+    assert "# TYPE budgetradar_ingest_rows_per_second histogram" in body
@@ -0,0 +1,270 @@
+import uuid
+from datetime import date, datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+
+from app.config import get_settings
+from app.models.db_models import Account, Base, DailyMetric, MMMModel
+from app.routers import analysis
+from app.routers.import_data import DailyMetricUpsertRow, upsert_daily_metrics_rows
+from app.services import database, refit_worker
+from app.services.hill_function import apply_adstock, hill_function
+from app.services.metrics import HILL_FIT_DURATION
+from app.services.refit_worker import run_refit_backlog
+
+ACCOUNT_ID = uuid.UUID("a8465a7b-bf39-4352-9658-4f1b8d05b381")
+START = date(2025, 1, 1)
+
+
+@pytest.fixture
+def sqlite_db(monkeypatch, tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'refits.sqlite'}")
+    Base.metadata.create_all(bind=engine)
+    monkeypatch.setattr(database, "get_engine", lambda: engine)
+    rng = np.random.default_rng(5)
+    spend = rng.uniform(200, 3000, 60)
+    conversions = hill_function(apply_adstock(spend, 0.3), 300.0, 1.3, 1500.0) * rng.normal(1, 0.05, 60)
+
+    session = database.get_session()
+    session.add(Account(id=ACCOUNT_ID, name="Test"))
+    for channel_name in ("Search", "Display"):
+        for offset in range(60):
+            session.add(
+                DailyMetric(
+                    account_id=ACCOUNT_ID,
+                    date=START + timedelta(days=offset),
+                    channel_name=channel_name,
+                    spend=round(float(spend[offset]), 2),
+                    conversions=round(float(conversions[offset]), 2),
+                )
+            )
+    session.commit()
+    session.close()
+    return engine
+
+
+def _ingest(channel_name: str, day: date, spend: float = 1500.0) -> None:
+    session = database.get_session()
+    upsert_daily_metrics_rows(
+        session,
+        ACCOUNT_ID,
+        [DailyMetricUpsertRow(date=day, channel_name=channel_name, spend=spend, conversions=80.0)],
+    )
+    session.commit()
+    session.close()
+
+
+def _analyze() -> list[analysis.ChannelComputation]:
+    return analysis.compute_account_channel_analysis(str(ACCOUNT_ID), target_cpa=20.0)
+
+
+def test_ingest_marks_only_changed_channels_and_worker_refits_them(sqlite_db):
+    _analyze()
+    assert set(database.fetch_stored_fits(str(ACCOUNT_ID))) == {"Search", "Display"}
+
+    _ingest("Search", START + timedelta(days=60))
+
+    backlog = database.fetch_refit_backlog(str(ACCOUNT_ID))
+    assert [channel_name for _, channel_name, _ in backlog] == ["Search"]
+    assert set(database.fetch_stored_fits(str(ACCOUNT_ID))) == {"Display"}
+
+    assert run_refit_backlog() == 1
+
+    assert database.fetch_refit_backlog() == []
+    stored = database.fetch_stored_fits(str(ACCOUNT_ID))
+    assert stored["Search"].adstock.last_date == START + timedelta(days=60)
+    assert stored["Search"].fit_result.covariance.shape == (3, 3)
+
+
+def test_first_import_queues_new_channels_for_the_worker(sqlite_db):
+    rng = np.random.default_rng(11)
+    spend = rng.uniform(200, 3000, 60)
+    conversions = hill_function(apply_adstock(spend, 0.3), 300.0, 1.3, 1500.0) * rng.normal(1, 0.05, 60)
+    session = database.get_session()
+    upsert_daily_metrics_rows(
+        session,
+        ACCOUNT_ID,
+        [
+            DailyMetricUpsertRow(
+                date=START + timedelta(days=offset),
+                channel_name="Video",
+                spend=round(float(spend[offset]), 2),
+                conversions=round(float(conversions[offset]), 2),
+            )
+            for offset in range(60)
+        ],
+    )
+    session.commit()
+    session.close()
+    _ingest("Video", START + timedelta(days=60))
+
+    assert [channel_name for _, channel_name, _ in database.fetch_refit_backlog()] == ["Video"]
+    assert run_refit_backlog() == 1
+
+    assert database.fetch_refit_backlog() == []
+    stored = database.fetch_stored_fits(str(ACCOUNT_ID))
+    assert set(stored) == {"Video"}
+    assert stored["Video"].adstock.last_date == START + timedelta(days=60)
+
+
+def test_bulk_load_queues_channels_without_models(sqlite_db):
+    other_account = uuid.uuid4()
+    frame = pd.DataFrame(
+        {
+            "account_id": [str(other_account)] * 2,
+            "date": [START, START],
+            "channel_name": ["Search", "Video"],
+            "spend": [100.0, 50.0],
+            "conversions": [5.0, 2.0],
+            "impressions": [1000, 500],
+        }
+    )
+
+    database.bulk_insert_daily_metrics([frame])
+
+    backlog = database.fetch_refit_backlog(str(other_account))
+    assert sorted(channel_name for _, channel_name, _ in backlog) == ["Search", "Video"]
+
+
+def test_analysis_serves_fresh_stored_fits_without_refitting(sqlite_db, monkeypatch):
+    fitted = _analyze()
+    _ingest("Display", START + timedelta(days=60))
+    run_refit_backlog()
+
+    def fail_fit(*args, **kwargs):
+        raise AssertionError("analysis refit a channel with a fresh stored fit")
+
+    monkeypatch.setattr(analysis, "fit_hill_model", fail_fit)
+    served = {item.result.channel_name: item.result for item in _analyze()}
+
+    search = next(item.result for item in fitted if item.result.channel_name == "Search")
+    assert served["Search"].marginal_cpa == pytest.approx(search.marginal_cpa, rel=1e-3)
+    assert served["Search"].marginal_cpa_lower is not None
+    assert served["Display"].current_spend == 1500.0
+
+
+def test_refit_keeps_a_mark_set_while_it_was_fitting(sqlite_db):
+    _analyze()
+    read_at = datetime.now(timezone.utc)
+    _ingest("Search", START + timedelta(days=60))
+    params = analysis.HillParameters(alpha=0.3, beta=1.3, kappa=1500.0, max_yield=300.0, r_squared=0.9)
+
+    database.save_model_params(str(ACCOUNT_ID), "Search", params, data_read_at=read_at)
+
+    assert [channel_name for _, channel_name, _ in database.fetch_refit_backlog()] == ["Search"]
+
+
+def test_failed_refit_discards_the_stored_model(sqlite_db):
+    _analyze()
+    session = database.get_session()
+    session.query(DailyMetric).filter(DailyMetric.channel_name == "Search", DailyMetric.date > START).delete()
+    session.commit()
+    session.close()
+    _ingest("Search", START + timedelta(days=1))
+    failed_fits = HILL_FIT_DURATION.count(outcome="insufficient_data")
+
+    run_refit_backlog()
+
+    session = database.get_session()
+    assert session.query(MMMModel).filter(MMMModel.channel_name == "Search").count() == 0
+    session.close()
+    assert HILL_FIT_DURATION.count(outcome="insufficient_data") == failed_fits + 1
+
+
+def test_refit_backlog_endpoint_lists_pending_channels(sqlite_db):
+    _analyze()
+    _ingest("Search", START + timedelta(days=60))
+    app = FastAPI()
+    app.include_router(analysis.router)
+    client = TestClient(app)
+
+    response = client.get("/api/refit-backlog", params={"account_id": str(ACCOUNT_ID)})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["pending"] == 1
+    assert body["worker_running"] is False
+    assert body["channels"][0]["channel_name"] == "Search"
+    assert body["channels"][0]["waiting_seconds"] >= 0
+
+
+def test_only_ingest_and_background_refits_move_the_data_fingerprint(sqlite_db):
+    def fingerprint() -> str:
+        return database.fetch_data_fingerprint(str(ACCOUNT_ID))
+
+    initial = fingerprint()
+    _analyze()
+    assert fingerprint() == initial
+
+    _ingest("Search", START + timedelta(days=60))
+    ingested = fingerprint()
+    assert ingested != initial
+
+    run_refit_backlog()
+    assert fingerprint() != ingested
+
+
+def test_repeat_analysis_revalidates_after_saving_its_own_fits(sqlite_db):
+    app = FastAPI()
+    app.include_router(analysis.router)
+    client = TestClient(app)
+    body = {"account_id": str(ACCOUNT_ID), "target_cpa": 20.0}
+
+    first = client.post("/api/analyze-channels", json=body)
+    repeat = client.post("/api/analyze-channels", json=body, headers={"If-None-Match": first.headers["etag"]})
+
+    assert first.status_code == 200
+    assert repeat.status_code == 304
+
+
+def test_failing_refit_backs_off_and_stops_after_max_attempts(sqlite_db, monkeypatch):
+    monkeypatch.setenv("REFIT_RETRY_BACKOFF_SECONDS", "0")
+    monkeypatch.setenv("REFIT_MAX_ATTEMPTS", "2")
+    attempts = []
+
+    def failing_refit(account_id, channel_name):
+        attempts.append(channel_name)
+        raise RuntimeError("fit crashed")
+
+    monkeypatch.setattr(refit_worker, "refit_channel", failing_refit)
+    _analyze()
+    _ingest("Search", START + timedelta(days=60))
+
+    for _ in range(4):
+        run_refit_backlog()
+    assert attempts == ["Search", "Search"]
+    assert database.fetch_refit_backlog(due_at=datetime.now(timezone.utc)) == []
+    assert [channel for _, channel, _ in database.fetch_refit_backlog()] == ["Search"]
+
+    _ingest("Search", START + timedelta(days=61))
+    run_refit_backlog()
+    assert attempts == ["Search", "Search", "Search"]
+
+
+def test_failed_refit_waits_for_its_backoff(sqlite_db, monkeypatch):
+    monkeypatch.setattr(refit_worker, "refit_channel", lambda account_id, channel_name: 1 / 0)
+    _analyze()
+    _ingest("Search", START + timedelta(days=60))
+
+    run_refit_backlog()
+
+    assert database.fetch_refit_backlog(due_at=datetime.now(timezone.utc)) == []
+    later = datetime.now(timezone.utc) + timedelta(seconds=get_settings().refit_retry_backoff_seconds + 1)
+    assert [channel for _, channel, _ in database.fetch_refit_backlog(due_at=later)] == ["Search"]
+
+
+def test_only_one_worker_claims_a_marked_channel(sqlite_db):
+    _analyze()
+    _ingest("Search", START + timedelta(days=60))
+
+    assert database.claim_refit(str(ACCOUNT_ID), "Search") == 1
+    assert database.claim_refit(str(ACCOUNT_ID), "Search") is None
+    assert run_refit_backlog() == 0
+
+    database.release_refit(str(ACCOUNT_ID), "Search")
+    assert run_refit_backlog() == 1
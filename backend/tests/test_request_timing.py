@@ -0,0 +1,108 @@
+import json
+import logging
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from app import config, main
+from app.routers import analysis
+from app.services.hill_function import HillFitResult
+from app.services.timing import start_request_timings, stop_request_timings, timing_span
+
+
+def _patch_analysis(monkeypatch) -> None:
+    monkeypatch.setattr(main, "init_db", lambda: None)
+    monkeypatch.setattr(analysis, "fetch_channels_for_account", lambda account_id: ["Search", "Display"])
+    monkeypatch.setattr(
+        analysis,
+        "fetch_daily_metrics",
+        lambda account_id, channel_name: (
+            np.array([100.0, 110.0, 120.0, 130.0]),
+            np.array([20.0, 21.0, 22.0, 23.0]),
+            None,
+        ),
+    )
+    monkeypatch.setattr(
+        analysis,
+        "fit_hill_model",
+        lambda spend, conversions: HillFitResult(
+            alpha=0.3,
+            beta=1.0,
+            kappa=200.0,
+            max_yield=1000.0,
+            r_squared=0.95,
+            status="success",
+        ),
+    )
+    monkeypatch.setattr(analysis, "get_current_spend", lambda account_id, channel_name: 130.0)
+    monkeypatch.setattr(analysis, "save_model_params", lambda *args, **kwargs: None)
+    monkeypatch.setattr(analysis, "fetch_stored_fits", lambda account_id: {})
+    monkeypatch.setattr(analysis, "fetch_data_fingerprint", lambda account_id: "fingerprint")
+
+
+def test_timing_span_is_noop_outside_traced_request():
+    with timing_span("hill_fit") as span:
+        assert span is None
+
+
+def test_timing_spans_aggregate_per_name():
+    timings, token = start_request_timings()
+    try:
+        for _ in range(3):
+            with timing_span("hill_fit"):
+                pass
+    finally:
+        stop_request_timings(token)
+
+    assert timings.as_dict()["hill_fit"]["count"] == 3
+    assert 'hill_fit;dur=' in timings.server_timing_header()
+
+
+def test_analyze_channels_returns_server_timing_header_when_enabled(monkeypatch):
+    monkeypatch.setenv("SERVER_TIMING_ENABLED", "true")
+    _patch_analysis(monkeypatch)
+    config.get_settings.cache_clear()
+
+    with TestClient(main.app) as client:
+        response = client.post(
+            "/api/analyze-channels",
+            json={"account_id": "demo-account", "target_cpa": 50.0},
+        )
+
+    assert response.status_code == 200
+    header = response.headers["Server-Timing"]
+    for stage in ("db_channels", "db_fetch", "hill_fit", "db_save_params", "curve_points", "total"):
+        assert f"{stage};dur=" in header
+    assert 'hill_fit;dur=' in header and 'desc="x2"' in header
+
+
+def test_server_timing_header_absent_by_default(monkeypatch):
+    _patch_analysis(monkeypatch)
+    config.get_settings.cache_clear()
+
+    with TestClient(main.app) as client:
+        response = client.post(
+            "/api/analyze-channels",
+            json={"account_id": "demo-account", "target_cpa": 50.0},
+        )
+
+    assert response.status_code == 200
+    assert "Server-Timing" not in response.headers
+
+
+def test_request_timings_are_logged_as_structured_json(monkeypatch, caplog):
+    monkeypatch.setenv("LOG_REQUEST_TIMINGS", "true")
+    _patch_analysis(monkeypatch)
+    config.get_settings.cache_clear()
+
+    with caplog.at_level(logging.INFO, logger="app.timing"):
+        with TestClient(main.app) as client:
+            client.post(
+                "/api/analyze-channels",
+                json={"account_id": "demo-account", "target_cpa": 50.0},
+            )
+
+    records = [json.loads(record.getMessage()) for record in caplog.records if record.name == "app.timing"]
+    assert len(records) == 1
+    assert records[0]["path"] == "/api/analyze-channels"
+    assert records[0]["spans"]["hill_fit"]["count"] == 2
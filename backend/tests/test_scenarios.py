@@ -1,16 +1,18 @@
+import asyncio
 from datetime import datetime
 from types import SimpleNamespace
 from typing import Literal
 import uuid
 
 import numpy as np
+import pytest
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
 from app.models.schemas import MarginalCpaResult
 from app.routers import scenarios
 from app.routers.analysis import ChannelComputation
-from app.services.hill_function import HillFitResult
+from app.services.hill_function import HillFitResult, calculate_marginal_cpa
 
 
 def _build_client() -> TestClient:
@@ -205,6 +207,11 @@ def test_scenario_save_and_list_roundtrip(monkeypatch):
 
     monkeypatch.setattr(scenarios, "save_scenario", fake_save_scenario)
     monkeypatch.setattr(scenarios, "list_scenarios", fake_list_scenarios)
+    monkeypatch.setattr(
+        scenarios,
+        "fetch_scenarios_fingerprint",
+        lambda query_account_id: str(len(fake_list_scenarios(query_account_id))),
+    )
 
     client = _build_client()
     create_response = client.post(
@@ -334,3 +341,456 @@ def test_recommend_scenario_blocks_low_confidence_when_policy_is_block(monkeypat
     assert recommendations["Search"]["is_action_blocked"] is True
     assert recommendations["Search"]["blocked_reason"] is not None
     assert "Action blocked by low-confidence policy" in recommendations["Search"]["blocked_reason"]
+
+
+def test_recommend_scenario_optimal_mode_equalizes_marginal_cpa_and_keeps_locks(monkeypatch):
+    efficient = HillFitResult(alpha=0.0, beta=1.0, kappa=400.0, max_yield=1000.0, r_squared=0.95, status="success")
+    saturated = HillFitResult(alpha=0.0, beta=1.0, kappa=60.0, max_yield=200.0, r_squared=0.95, status="success")
+
+    monkeypatch.setattr(
+        scenarios,
+        "compute_account_channel_analysis",
+        lambda account_id, target_cpa, target_cpa_overrides=None: [
+            _channel_computation("Search", 100.0, 0.5, "green", fit_result=efficient),
+            _channel_computation("Display", 100.0, 2.0, "red", fit_result=saturated),
+            _channel_computation("Brand", 100.0, 1.0, "yellow", fit_result=efficient),
+            _channel_computation("Organic", 100.0, None, "grey", fit_result=None),
+        ],
+    )
+
+    client = _build_client()
+    response = client.post(
+        "/api/scenarios/recommend",
+        json={
+            "account_id": str(uuid.uuid4()),
+            "target_cpa": 1.0,
+            "budget_delta_percent": 5,
+            "locked_channels": ["Brand"],
+            "allocation_mode": "optimal",
+        },
+    )
+
+    assert response.status_code == 200
+    payload = response.json()
+    recommendations = {row["channel_name"]: row for row in payload["recommendations"]}
+
+    assert recommendations["Brand"]["recommended_spend"] == 100.0
+    assert recommendations["Organic"]["recommended_spend"] == 100.0
+    assert recommendations["Search"]["action"] == "increase"
+    assert recommendations["Display"]["action"] == "decrease"
+    assert payload["projected_summary"]["projected_total_spend"] == pytest.approx(420.0, abs=0.02)
+    assert recommendations["Search"]["projected_marginal_cpa"] == pytest.approx(
+        recommendations["Display"]["projected_marginal_cpa"],
+        abs=0.01,
+    )
+
+
+def _working_channel(name: str, spend: float, fit_result: HillFitResult, traffic_light: str = "green") -> dict:
+    return {
+        "channel_name": name,
+        "traffic_light": traffic_light,
+        "current_spend": spend,
+        "recommended_spend": spend,
+        "min_spend": 0.0,
+        "max_spend": float("inf"),
+        "current_marginal_cpa": None,
+        "target_cpa": 50.0,
+        "fit_result": fit_result,
+        "prior_adstock_state": 0.0,
+        "locked": False,
+        "policy_hold": False,
+    }
+
+
+def test_incremental_rebalancer_follows_live_marginal_cpa():
+    # "Small" starts cheapest but saturates quickly; "Large" keeps scaling.
+    small = HillFitResult(alpha=0.0, beta=1.0, kappa=50.0, max_yield=20.0, r_squared=0.95, status="success")
+    large = HillFitResult(alpha=0.0, beta=1.0, kappa=5000.0, max_yield=400.0, r_squared=0.95, status="success")
+    channels = [_working_channel("Small", 10.0, small), _working_channel("Large", 1000.0, large)]
+
+    scenarios._rebalance_budget_incremental(channels, target_total_spend=1510.0, increment=0.10)
+
+    spends = {channel["channel_name"]: channel["recommended_spend"] for channel in channels}
+    assert sum(spends.values()) == pytest.approx(1510.0, abs=1510.0 * 0.005)
+    # Spend keeps flowing to "Small" only while its live marginal CPA is lower,
+    # so both channels finish within one 10% step of each other.
+    small_cpa = calculate_marginal_cpa(spends["Small"], small, prior_adstock_state=0.0)
+    large_cpa = calculate_marginal_cpa(spends["Large"], large, prior_adstock_state=0.0)
+    assert small_cpa == pytest.approx(large_cpa, rel=0.25)
+    assert spends["Small"] > 50.0
+
+
+def test_legacy_greedy_mode_is_still_available(monkeypatch):
+    shared_fit = HillFitResult(alpha=0.0, beta=1.0, kappa=100.0, max_yield=1000.0, r_squared=0.95, status="success")
+    monkeypatch.setattr(
+        scenarios,
+        "compute_account_channel_analysis",
+        lambda account_id, target_cpa, target_cpa_overrides=None: [
+            _channel_computation("Search", 100.0, 30.0, "green", fit_result=shared_fit),
+            _channel_computation("Brand", 100.0, 48.0, "yellow", fit_result=shared_fit),
+        ],
+    )
+    legacy_calls = []
+    original = scenarios._rebalance_budget
+
+    def spy(*args, **kwargs):
+        legacy_calls.append(args)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(scenarios, "_rebalance_budget", spy)
+
+    client = _build_client()
+    response = client.post(
+        "/api/scenarios/recommend",
+        json={
+            "account_id": str(uuid.uuid4()),
+            "target_cpa": 50.0,
+            "budget_delta_percent": 20,
+            "allocation_mode": "greedy_legacy",
+        },
+    )
+
+    assert response.status_code == 200
+    assert len(legacy_calls) == 1
+    assert response.json()["projected_summary"]["projected_total_spend"] == pytest.approx(240.0, abs=12.0)
+
+
+def test_incremental_rebalancer_scales_to_hundreds_of_channels():
+    fits = [
+        HillFitResult(alpha=0.2, beta=1.0, kappa=500.0 + 10 * idx, max_yield=100.0, r_squared=0.9, status="success")
+        for idx in range(400)
+    ]
+    channels = [_working_channel(f"Entity {idx}", 200.0, fit) for idx, fit in enumerate(fits)]
+
+    scenarios._rebalance_budget_incremental(channels, target_total_spend=400 * 200.0 * 1.3, increment=0.10)
+
+    total = sum(channel["recommended_spend"] for channel in channels)
+    assert abs(total - 104_000.0) <= 104_000.0 * 0.005
+
+
+def test_sweep_fits_once_and_returns_monotone_frontier(monkeypatch):
+    efficient = HillFitResult(alpha=0.3, beta=1.0, kappa=400.0, max_yield=1000.0, r_squared=0.95, status="success")
+    saturated = HillFitResult(alpha=0.0, beta=1.2, kappa=150.0, max_yield=300.0, r_squared=0.95, status="success")
+    fit_calls = []
+
+    def fake_compute(account_id, target_cpa, target_cpa_overrides=None):
+        fit_calls.append(account_id)
+        return [
+            _channel_computation("Search", 100.0, 0.5, "green", target_cpa=1.0, fit_result=efficient),
+            _channel_computation("Display", 100.0, 2.0, "red", target_cpa=1.0, fit_result=saturated),
+            _channel_computation("Organic", 50.0, None, "grey", target_cpa=1.0, fit_result=None),
+        ]
+
+    monkeypatch.setattr(scenarios, "compute_account_channel_analysis", fake_compute)
+
+    client = _build_client()
+    response = client.post(
+        "/api/scenarios/sweep",
+        json={
+            "account_id": str(uuid.uuid4()),
+            "target_cpa": 1.0,
+            "budget_delta_percents": [50],
+            "budget_delta_range": {"start": -20, "stop": 20, "step": 10},
+        },
+    )
+
+    assert response.status_code == 200
+    payload = response.json()
+    assert len(fit_calls) == 1
+    assert payload["current_total_spend"] == 250.0
+    assert [point["budget_delta_percent"] for point in payload["points"]] == [-20, -10, 0, 10, 20, 50]
+
+    spends = [point["total_spend"] for point in payload["points"]]
+    conversions = [point["projected_conversions"] for point in payload["points"]]
+    assert spends == sorted(spends)
+    assert conversions == sorted(conversions)
+    assert spends[-1] == pytest.approx(375.0, abs=0.05)
+
+    allocations = {row["channel_name"]: row for row in payload["points"][-1]["allocations"]}
+    assert allocations["Organic"]["recommended_spend"] == 50.0
+    assert allocations["Organic"]["projected_conversions"] is None
+    assert allocations["Search"]["projected_conversions"] > 0
+
+
+def test_scenario_endpoints_compute_analysis_off_the_event_loop(monkeypatch):
+    fit = HillFitResult(alpha=0.3, beta=1.0, kappa=400.0, max_yield=1000.0, r_squared=0.95, status="success")
+    computed_on_event_loop = []
+
+    def fake_compute(account_id, target_cpa, target_cpa_overrides=None):
+        try:
+            asyncio.get_running_loop()
+            computed_on_event_loop.append(True)
+        except RuntimeError:
+            computed_on_event_loop.append(False)
+        return [_channel_computation("Search", 100.0, 0.5, "green", target_cpa=1.0, fit_result=fit)]
+
+    monkeypatch.setattr(scenarios, "compute_account_channel_analysis", fake_compute)
+    client = _build_client()
+    account_id = str(uuid.uuid4())
+
+    recommended = client.post("/api/scenarios/recommend", json={"account_id": account_id, "target_cpa": 1.0})
+    swept = client.post(
+        "/api/scenarios/sweep",
+        json={"account_id": account_id, "target_cpa": 1.0, "budget_delta_percents": [10]},
+    )
+
+    assert recommended.status_code == 200
+    assert swept.status_code == 200
+    assert computed_on_event_loop == [False, False]
+
+
+def test_sweep_rejects_reversed_range(monkeypatch):
+    monkeypatch.setattr(
+        scenarios,
+        "compute_account_channel_analysis",
+        lambda account_id, target_cpa, target_cpa_overrides=None: [],
+    )
+
+    response = _build_client().post(
+        "/api/scenarios/sweep",
+        json={
+            "account_id": str(uuid.uuid4()),
+            "budget_delta_range": {"start": 20, "stop": -20, "step": 10},
+        },
+    )
+
+    assert response.status_code == 400
+    assert "reversed" in response.json()["detail"]
+
+
+def test_sweep_rejects_oversized_range(monkeypatch):
+    monkeypatch.setattr(
+        scenarios,
+        "compute_account_channel_analysis",
+        lambda account_id, target_cpa, target_cpa_overrides=None: [],
+    )
+
+    client = _build_client()
+    response = client.post(
+        "/api/scenarios/sweep",
+        json={
+            "account_id": str(uuid.uuid4()),
+            "budget_delta_range": {"start": -50, "stop": 50, "step": 0.1},
+        },
+    )
+
+    assert response.status_code == 400
+
+
+def test_recommend_scenario_reports_projected_conversions_and_blended_cpa(monkeypatch):
+    fit = HillFitResult(alpha=0.0, beta=1.0, kappa=100.0, max_yield=1000.0, r_squared=0.95, status="success")
+    monkeypatch.setattr(
+        scenarios,
+        "compute_account_channel_analysis",
+        lambda account_id, target_cpa, target_cpa_overrides=None: [
+            _channel_computation("Search", 100.0, 30.0, "green", fit_result=fit),
+            _channel_computation("Display", 100.0, 70.0, "red", fit_result=fit),
+            _channel_computation("Organic", 100.0, None, "grey", fit_result=None),
+        ],
+    )
+
+    client = _build_client()
+    response = client.post(
+        "/api/scenarios/recommend",
+        json={"account_id": str(uuid.uuid4()), "target_cpa": 50.0, "budget_delta_percent": 0},
+    )
+
+    assert response.status_code == 200
+    payload = response.json()
+    recommendations = {row["channel_name"]: row for row in payload["recommendations"]}
+
+    def conversions_at(spend):
+        return 1000.0 * spend / (100.0 + spend)
+
+    search = recommendations["Search"]
+    assert search["current_conversions"] == pytest.approx(conversions_at(100.0), abs=0.01)
+    assert search["projected_conversions"] == pytest.approx(conversions_at(110.0), abs=0.01)
+    assert search["projected_cpa"] == pytest.approx(110.0 / conversions_at(110.0), abs=0.01)
+    assert recommendations["Organic"]["projected_conversions"] is None
+    assert recommendations["Organic"]["projected_cpa"] is None
+
+    summary = payload["projected_summary"]
+    expected_projected = conversions_at(110.0) + conversions_at(90.0)
+    assert summary["current_conversions"] == pytest.approx(2 * conversions_at(100.0), abs=0.01)
+    assert summary["projected_conversions"] == pytest.approx(expected_projected, abs=0.01)
+    # Blended CPA excludes spend on the unmodeled channel.
+    assert summary["projected_cpa"] == pytest.approx(200.0 / expected_projected, abs=0.01)
+
+
+def test_recommend_scenario_weekly_projection_shows_adstock_ramp(monkeypatch):
+    carryover_fit = HillFitResult(alpha=0.6, beta=1.0, kappa=400.0, max_yield=1000.0, r_squared=0.95, status="success")
+
+    def computation(name, spend, marginal_cpa, light):
+        item = _channel_computation(name, spend, marginal_cpa, light, fit_result=carryover_fit)
+        # Steady state at the current spend: adstock = spend / (1 - alpha).
+        item.prior_adstock_state = spend / (1 - carryover_fit.alpha)
+        return item
+
+    monkeypatch.setattr(
+        scenarios,
+        "compute_account_channel_analysis",
+        lambda account_id, target_cpa, target_cpa_overrides=None: [
+            computation("Search", 100.0, 30.0, "green"),
+            computation("Display", 100.0, 40.0, "green"),
+        ],
+    )
+
+    client = _build_client()
+    response = client.post(
+        "/api/scenarios/recommend",
+        json={
+            "account_id": str(uuid.uuid4()),
+            "target_cpa": 50.0,
+            "budget_delta_percent": 10,
+            "horizon_weeks": 4,
+        },
+    )
+
+    assert response.status_code == 200
+    weeks = response.json()["weekly_projection"]
+    assert [week["week"] for week in weeks] == [1, 2, 3, 4]
+    assert all(week["baseline_spend"] == 1400.0 for week in weeks)
+    assert all(week["spend"] == pytest.approx(1540.0, abs=0.1) for week in weeks)
+    # Baseline sits at steady state; the scenario's lift builds as adstock accumulates.
+    assert weeks[0]["baseline_conversions"] == pytest.approx(weeks[3]["baseline_conversions"], rel=1e-6)
+    assert 0 < weeks[0]["incremental_conversions"] < weeks[1]["incremental_conversions"]
+    assert weeks[3]["incremental_conversions"] == pytest.approx(weeks[2]["incremental_conversions"], rel=0.01)
+
+
+def test_recommend_scenario_omits_weekly_projection_by_default(monkeypatch):
+    monkeypatch.setattr(
+        scenarios,
+        "compute_account_channel_analysis",
+        lambda account_id, target_cpa, target_cpa_overrides=None: [
+            _channel_computation("Search", 100.0, 30.0, "green", fit_result=None),
+        ],
+    )
+
+    response = _build_client().post(
+        "/api/scenarios/recommend",
+        json={"account_id": str(uuid.uuid4()), "target_cpa": 50.0},
+    )
+
+    assert response.status_code == 200
+    assert response.json()["weekly_projection"] == []
+
+
+def test_recommend_scenario_respects_channel_spend_constraints(monkeypatch):
+    efficient = HillFitResult(alpha=0.0, beta=1.0, kappa=400.0, max_yield=1000.0, r_squared=0.95, status="success")
+    saturated = HillFitResult(alpha=0.0, beta=1.0, kappa=60.0, max_yield=200.0, r_squared=0.95, status="success")
+    monkeypatch.setattr(
+        scenarios,
+        "compute_account_channel_analysis",
+        lambda account_id, target_cpa, target_cpa_overrides=None: [
+            _channel_computation("Search", 100.0, 0.5, "green", fit_result=efficient),
+            _channel_computation("Display", 100.0, 2.0, "red", fit_result=saturated),
+        ],
+    )
+    constraints = [
+        {"channel_name": "search", "max_change_percent": 10},
+        {"channel_name": "Display", "min_spend": 95.0},
+    ]
+
+    client = _build_client()
+    for mode in ("greedy", "optimal"):
+        response = client.post(
+            "/api/scenarios/recommend",
+            json={
+                "account_id": str(uuid.uuid4()),
+                "target_cpa": 1.0,
+                "budget_delta_percent": 50,
+                "allocation_mode": mode,
+                "channel_constraints": constraints,
+            },
+        )
+
+        assert response.status_code == 200
+        recommendations = {row["channel_name"]: row for row in response.json()["recommendations"]}
+        assert recommendations["Search"]["recommended_spend"] <= 110.0 + 1e-6
+        assert recommendations["Display"]["recommended_spend"] >= 95.0 - 1e-6
+
+
+def test_recommend_scenario_rejects_infeasible_or_legacy_constraints(monkeypatch):
+    fit = HillFitResult(alpha=0.0, beta=1.0, kappa=400.0, max_yield=1000.0, r_squared=0.95, status="success")
+    monkeypatch.setattr(
+        scenarios,
+        "compute_account_channel_analysis",
+        lambda account_id, target_cpa, target_cpa_overrides=None: [
+            _channel_computation("Search", 100.0, 0.5, "green", fit_result=fit),
+        ],
+    )
+    client = _build_client()
+
+    infeasible = client.post(
+        "/api/scenarios/recommend",
+        json={
+            "account_id": str(uuid.uuid4()),
+            "target_cpa": 1.0,
+            "channel_constraints": [{"channel_name": "Search", "min_spend": 200.0, "max_change_percent": 10}],
+        },
+    )
+    legacy = client.post(
+        "/api/scenarios/recommend",
+        json={
+            "account_id": str(uuid.uuid4()),
+            "target_cpa": 1.0,
+            "allocation_mode": "greedy_legacy",
+            "channel_constraints": [{"channel_name": "Search", "max_spend": 150.0}],
+        },
+    )
+
+    assert infeasible.status_code == 400
+    assert "Search" in infeasible.json()["detail"]
+    assert legacy.status_code == 400
+
+
+def test_greedy_mode_clamps_maintained_channels_into_their_bounds(monkeypatch):
+    fit = HillFitResult(alpha=0.0, beta=1.0, kappa=100.0, max_yield=500.0, r_squared=0.95, status="success")
+    monkeypatch.setattr(
+        scenarios,
+        "compute_account_channel_analysis",
+        lambda account_id, target_cpa, target_cpa_overrides=None: [
+            _channel_computation("Search", 100.0, 1.0, "yellow", fit_result=fit),
+            _channel_computation("Display", 100.0, 1.0, "yellow", fit_result=fit),
+        ],
+    )
+
+    client = _build_client()
+    for mode in ("greedy", "optimal"):
+        response = client.post(
+            "/api/scenarios/recommend",
+            json={
+                "account_id": str(uuid.uuid4()),
+                "target_cpa": 1.0,
+                "budget_delta_percent": 0,
+                "allocation_mode": mode,
+                "channel_constraints": [{"channel_name": "Search", "min_spend": 150.0}],
+            },
+        )
+
+        assert response.status_code == 200
+        recommendations = {row["channel_name"]: row for row in response.json()["recommendations"]}
+        assert recommendations["Search"]["recommended_spend"] >= 150.0 - 1e-6
+
+
+def test_recommend_scenario_rejects_constraints_for_unknown_channels(monkeypatch):
+    fit = HillFitResult(alpha=0.0, beta=1.0, kappa=400.0, max_yield=1000.0, r_squared=0.95, status="success")
+    monkeypatch.setattr(
+        scenarios,
+        "compute_account_channel_analysis",
+        lambda account_id, target_cpa, target_cpa_overrides=None: [
+            _channel_computation("Search", 100.0, 0.5, "green", fit_result=fit),
+        ],
+    )
+
+    response = _build_client().post(
+        "/api/scenarios/recommend",
+        json={
+            "account_id": str(uuid.uuid4()),
+            "target_cpa": 1.0,
+            "channel_constraints": [{"channel_name": "Serach", "max_spend": 150.0}],
+        },
+    )
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Unknown channels: Serach"
@@ -0,0 +1,77 @@
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+
+import pytest
+
+from app.routers import analysis
+from app.services.metrics import ANALYSIS_SINGLE_FLIGHT
+from app.services.single_flight import SingleFlight
+
+
+def _run_concurrently(count: int, fn):
+    barrier = threading.Barrier(count)
+
+    def call(index):
+        barrier.wait()
+        return fn(index)
+
+    with ThreadPoolExecutor(max_workers=count) as pool:
+        return list(pool.map(call, range(count)))
+
+
+def test_concurrent_calls_share_one_run():
+    flights = SingleFlight()
+    runs = []
+
+    def compute():
+        runs.append(1)
+        time.sleep(0.2)
+        return {"value": 42}
+
+    results = _run_concurrently(5, lambda index: flights.do("key", compute))
+
+    assert len(runs) == 1
+    assert all(result == {"value": 42} for result, _ in results)
+    assert sorted(shared for _, shared in results) == [False, True, True, True, True]
+    assert flights.in_flight() == 0
+
+
+def test_followers_receive_the_leaders_exception():
+    flights = SingleFlight()
+
+    def compute():
+        time.sleep(0.2)
+        raise ValueError("fit failed")
+
+    def call(index):
+        with pytest.raises(ValueError, match="fit failed"):
+            flights.do("key", compute)
+
+    _run_concurrently(3, call)
+    assert flights.in_flight() == 0
+
+
+def test_identical_analysis_requests_coalesce_and_count_saved_computations(monkeypatch):
+    runs = []
+
+    def compute(account_id, target_cpa, *args):
+        runs.append((account_id, target_cpa))
+        time.sleep(0.2)
+        return []
+
+    monkeypatch.setattr(analysis, "_compute_account_channel_analysis", compute)
+    monkeypatch.setattr(analysis, "fetch_data_fingerprint", lambda account_id: "fingerprint")
+    followers_before = ANALYSIS_SINGLE_FLIGHT.value(role="follower")
+
+    _run_concurrently(
+        4,
+        lambda index: analysis.compute_account_channel_analysis("ACCOUNT", target_cpa=20.0),
+    )
+    _run_concurrently(
+        2,
+        lambda index: analysis.compute_account_channel_analysis("account", target_cpa=20.0 + index),
+    )
+
+    assert len(runs) == 3
+    assert ANALYSIS_SINGLE_FLIGHT.value(role="follower") - followers_before == 3
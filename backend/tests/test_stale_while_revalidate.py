@@ -0,0 +1,114 @@
+import threading
+import time
+
+import numpy as np
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.models.schemas import MarginalCpaResult
+from app.routers import analysis
+
+
+class FakeAccount:
+    """Account data whose analysis is slow and reports which data version it saw."""
+
+    def __init__(self):
+        self.version = 1
+        self.runs = 0
+        self.release = threading.Event()
+        self.release.set()
+
+    def fingerprint(self, account_id):
+        return f"v{self.version}"
+
+    def compute(self, account_id, target_cpa, *args):
+        version = self.version
+        self.release.wait(5)
+        self.runs += 1
+        return [
+            analysis.ChannelComputation(
+                result=MarginalCpaResult(
+                    channel_name="Search",
+                    current_spend=100.0 * version,
+                    marginal_cpa=10.0,
+                    target_cpa=target_cpa,
+                    traffic_light="green",
+                    recommendation="Scale",
+                    model_params=None,
+                ),
+                fit_result=None,
+                spend_history=np.array([]),
+                prior_adstock_state=None,
+            )
+        ]
+
+
+def _client(monkeypatch) -> tuple[TestClient, FakeAccount]:
+    account = FakeAccount()
+    monkeypatch.setattr(analysis, "fetch_data_fingerprint", account.fingerprint)
+    monkeypatch.setattr(analysis, "_compute_account_channel_analysis", account.compute)
+    app = FastAPI()
+    app.include_router(analysis.router)
+    return TestClient(app), account
+
+
+def _post(client: TestClient, freshness: str = "stale_while_revalidate") -> dict:
+    response = client.post(
+        "/api/analyze-channels",
+        json={"account_id": "demo", "target_cpa": 20.0, "freshness": freshness},
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_first_request_computes_and_repeats_are_served_from_the_snapshot(monkeypatch):
+    client, account = _client(monkeypatch)
+
+    first = _post(client)
+    second = _post(client)
+
+    assert account.runs == 1
+    assert first["data_fingerprint"] == second["data_fingerprint"] == "v1"
+    assert second["stale"] is False and second["revalidating"] is False
+    assert second["computed_at"] == first["computed_at"]
+    assert second["age_seconds"] >= 0
+
+
+def test_changed_data_serves_stale_result_while_refreshing(monkeypatch):
+    client, account = _client(monkeypatch)
+    _post(client)
+
+    account.version = 2
+    account.release.clear()
+    started = time.perf_counter()
+    stale = _post(client)
+    also_stale = _post(client)
+    elapsed = time.perf_counter() - started
+    account.release.set()
+
+    deadline = time.monotonic() + 5
+    refreshed = _post(client)
+    while refreshed["stale"] and time.monotonic() < deadline:
+        time.sleep(0.02)
+        refreshed = _post(client)
+
+    assert elapsed < 1.0
+    assert stale["stale"] is True and stale["revalidating"] is True
+    assert stale["channels"][0]["current_spend"] == 100.0
+    assert also_stale["data_fingerprint"] == "v1"
+    assert refreshed["stale"] is False
+    assert refreshed["data_fingerprint"] == "v2"
+    assert refreshed["channels"][0]["current_spend"] == 200.0
+    # One initial run plus a single background refresh for both stale reads.
+    assert account.runs == 2
+
+
+def test_fresh_mode_always_recomputes_and_reports_fingerprint(monkeypatch):
+    client, account = _client(monkeypatch)
+
+    first = _post(client, freshness="fresh")
+    second = _post(client, freshness="fresh")
+
+    assert account.runs == 2
+    assert first["data_fingerprint"] == "v1"
+    assert second["stale"] is False
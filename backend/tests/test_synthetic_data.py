@@ -0,0 +1,81 @@
+from dataclasses import replace
+from datetime import date
+
+import pandas as pd
+from sqlalchemy import create_engine, func, select
+
+from app.models.db_models import Account, Base, DailyMetric
+from app.services import database
+from app.services.synthetic_data import (
+    SyntheticDataConfig,
+    generate_synthetic_metrics,
+    iter_synthetic_metrics,
+)
+
+
+def test_generator_produces_full_grid_and_is_reproducible():
+    config = SyntheticDataConfig(
+        accounts=3,
+        channels_per_account=14,
+        days=60,
+        end_date=date(2025, 3, 31),
+        seed=7,
+        accounts_per_batch=2,
+    )
+
+    frame = generate_synthetic_metrics(config)
+
+    assert len(frame) == 3 * 14 * 60
+    assert frame["account_id"].nunique() == 3
+    assert frame["channel_name"].nunique() == 14
+    assert frame["date"].min() == date(2025, 1, 31)
+    assert frame["date"].max() == date(2025, 3, 31)
+    assert (frame["spend"] > 0).all()
+    assert (frame["conversions"] >= 0).all()
+
+    pd.testing.assert_frame_equal(
+        frame.astype(str),
+        generate_synthetic_metrics(config).astype(str),
+    )
+
+
+def test_generated_rows_do_not_depend_on_batch_size():
+    config = SyntheticDataConfig(accounts=5, channels_per_account=3, days=30, missing_day_rate=0.1)
+
+    batched = generate_synthetic_metrics(replace(config, accounts_per_batch=2))
+    whole = generate_synthetic_metrics(replace(config, accounts_per_batch=50))
+
+    pd.testing.assert_frame_equal(batched.astype(str), whole.astype(str))
+
+
+def test_generator_applies_weekend_factor_and_missing_days():
+    config = SyntheticDataConfig(
+        accounts=1,
+        channels_per_account=1,
+        days=700,
+        weekend_factor=0.5,
+        daily_variance=0.0,
+        spend_growth=0.0,
+        missing_day_rate=0.2,
+        seed=3,
+    )
+
+    frame = generate_synthetic_metrics(config)
+    weekdays = pd.to_datetime(frame["date"]).dt.dayofweek
+
+    assert 500 < len(frame) < 620
+    assert frame.loc[weekdays >= 5, "spend"].max() < frame.loc[weekdays < 5, "spend"].min()
+
+
+def test_bulk_insert_writes_accounts_and_metrics(monkeypatch, tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'synthetic.sqlite'}")
+    Base.metadata.create_all(bind=engine)
+    monkeypatch.setattr(database, "get_engine", lambda: engine)
+
+    config = SyntheticDataConfig(accounts=3, channels_per_account=2, days=30, accounts_per_batch=2)
+    inserted = database.bulk_insert_daily_metrics(iter_synthetic_metrics(config))
+
+    assert inserted == 3 * 2 * 30
+    with engine.connect() as connection:
+        assert connection.execute(select(func.count()).select_from(Account)).scalar_one() == 3
+        assert connection.execute(select(func.count()).select_from(DailyMetric)).scalar_one() == 180
@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+
+from app.services.hill_function import (
+    HillFitResult,
+    calculate_marginal_cpa,
+    calculate_marginal_cpa_array,
+    calculate_marginal_cpa_bands,
+    calculate_marginal_cpa_interval,
+    fit_hill_model,
+    generate_marginal_curve_points,
+    hill_function,
+)
+
+
+def _noisy_series(noise: float, seed: int = 11) -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    spend = rng.uniform(200, 3000, 120)
+    conversions = hill_function(spend, 300.0, 1.3, 1200.0) * rng.normal(1, noise, spend.size)
+    return spend, conversions
+
+
+def test_fit_keeps_parameter_covariance_and_bands_bracket_marginal_cpa():
+    spend, conversions = _noisy_series(noise=0.05)
+    fit = fit_hill_model(spend, conversions)
+
+    assert fit.status == "success"
+    assert fit.covariance is not None and fit.covariance.shape == (3, 3)
+
+    levels = np.linspace(300.0, 4000.0, 25)
+    lower, upper = calculate_marginal_cpa_bands(levels, fit)
+    point = calculate_marginal_cpa_array(levels, fit)
+    assert np.all(lower < point)
+    assert np.all(point < upper)
+
+
+def test_bands_widen_with_noisier_data():
+    quiet_spend, quiet_conversions = _noisy_series(noise=0.02)
+    noisy_spend, noisy_conversions = _noisy_series(noise=0.15)
+    quiet = fit_hill_model(quiet_spend, quiet_conversions)
+    noisy = fit_hill_model(noisy_spend, noisy_conversions)
+
+    quiet_lower, quiet_upper = calculate_marginal_cpa_interval(1500.0, quiet)
+    noisy_lower, noisy_upper = calculate_marginal_cpa_interval(1500.0, noisy)
+
+    quiet_width = quiet_upper / quiet_lower
+    noisy_width = noisy_upper / noisy_lower
+    assert noisy_width > quiet_width
+
+
+def test_band_matches_finite_difference_propagation():
+    covariance = np.diag([25.0, 0.0025, 400.0])
+    fit = HillFitResult(
+        alpha=0.0, beta=1.2, kappa=1000.0, max_yield=250.0, r_squared=0.9, status="success", covariance=covariance
+    )
+    spend = 800.0
+
+    theta = np.array([fit.max_yield, fit.beta, fit.kappa])
+
+    def lift(values):
+        return float(
+            hill_function(np.array([spend * 1.1]), *values)[0] - hill_function(np.array([spend]), *values)[0]
+        )
+
+    gradient = np.array(
+        [(lift(theta + step) - lift(theta - step)) / (2 * step[i]) for i, step in enumerate(np.diag(theta * 1e-6))]
+    )
+    margin = 1.96 * np.sqrt(gradient @ covariance @ gradient)
+    delta_spend = spend * 0.1
+
+    lower, upper = calculate_marginal_cpa_interval(spend, fit)
+
+    assert lower == pytest.approx(delta_spend / (lift(theta) + margin), rel=1e-5)
+    assert upper == pytest.approx(delta_spend / (lift(theta) - margin), rel=1e-5)
+    assert lower < calculate_marginal_cpa(spend, fit, prior_adstock_state=0.0) < upper
+
+
+def test_curve_points_carry_bands_only_when_covariance_is_known():
+    base = dict(alpha=0.2, beta=1.0, kappa=900.0, max_yield=200.0, r_squared=0.9, status="success")
+    without = HillFitResult(**base)
+    with_cov = HillFitResult(**base, covariance=np.diag([16.0, 0.01, 900.0]))
+
+    plain_points, _ = generate_marginal_curve_points(600.0, without, target_cpa=40.0)
+    banded_points, _ = generate_marginal_curve_points(600.0, with_cov, target_cpa=40.0)
+
+    assert "marginal_cpa_lower" not in plain_points[0]
+    assert [point["marginal_cpa"] for point in banded_points] == [point["marginal_cpa"] for point in plain_points]
+    assert all(point["marginal_cpa_lower"] <= point["marginal_cpa"] for point in banded_points)
+    assert all(
+        point["marginal_cpa_upper"] is None or point["marginal_cpa_upper"] >= point["marginal_cpa"]
+        for point in banded_points
+    )
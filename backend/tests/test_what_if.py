@@ -0,0 +1,177 @@
+import asyncio
+import time
+
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from app import config
+from app.routers import analysis, what_if
+from app.services.fit_cache import FIT_CACHE
+from app.services.hill_function import HillFitResult
+
+ACCOUNT_ID = "0b6a4f0e-55a2-4d1c-9b53-0d5a0a6b7a11"
+FIT = HillFitResult(alpha=0.0, beta=1.0, kappa=100.0, max_yield=1000.0, r_squared=0.95, status="success")
+
+
+def _build_client() -> TestClient:
+    app = FastAPI()
+    app.include_router(what_if.router)
+    return TestClient(app)
+
+
+def _patch_analysis(monkeypatch, calls: list) -> None:
+    def fetch_daily_metrics(account_id, channel_name):
+        calls.append(channel_name)
+        return np.array([100.0, 100.0]), np.array([20.0, 20.0]), None
+
+    monkeypatch.setattr(analysis, "fetch_channels_for_account", lambda account_id: ["Search", "Display"])
+    monkeypatch.setattr(analysis, "fetch_daily_metrics", fetch_daily_metrics)
+    monkeypatch.setattr(analysis, "fit_hill_model", lambda spend, conversions: FIT)
+    monkeypatch.setattr(analysis, "get_current_spend", lambda account_id, channel_name: 100.0)
+    monkeypatch.setattr(analysis, "save_model_params", lambda *args, **kwargs: None)
+    monkeypatch.setattr(analysis, "fetch_stored_fits", lambda account_id: {})
+    monkeypatch.setattr(analysis, "fetch_data_fingerprint", lambda account_id: "fingerprint")
+
+
+def test_what_if_warms_cache_once_then_serves_from_cached_fits(monkeypatch):
+    calls: list = []
+    _patch_analysis(monkeypatch, calls)
+    client = _build_client()
+
+    first = client.post("/api/what-if", json={"account_id": ACCOUNT_ID, "target_cpa": 1.0})
+    second = client.post(
+        "/api/what-if",
+        json={"account_id": ACCOUNT_ID, "target_cpa": 1.0, "spends": {"search": 20.0, "Display": 400.0}},
+    )
+
+    assert first.status_code == 200
+    assert second.status_code == 200
+    assert calls == ["Search", "Display"]
+
+    channels = {row["channel_name"]: row for row in second.json()["channels"]}
+    # Marginal CPA for beta=1: 0.1 s / (H(1.1 s) - H(s)) with H(s) = 1000 s / (100 + s).
+    assert channels["Search"]["marginal_cpa"] == pytest.approx(0.1452, abs=0.01)
+    assert channels["Search"]["traffic_light"] == "green"
+    assert channels["Display"]["traffic_light"] == "red"
+    assert channels["Display"]["projected_conversions"] == pytest.approx(800.0, abs=0.01)
+    assert second.json()["total_spend"] == 420.0
+
+
+def test_cold_account_is_fitted_off_the_event_loop(monkeypatch):
+    _patch_analysis(monkeypatch, [])
+    fitted_on_event_loop = []
+
+    def fit_hill_model(spend, conversions):
+        try:
+            asyncio.get_running_loop()
+            fitted_on_event_loop.append(True)
+        except RuntimeError:
+            fitted_on_event_loop.append(False)
+        return FIT
+
+    monkeypatch.setattr(analysis, "fit_hill_model", fit_hill_model)
+    client = _build_client()
+
+    assert client.post("/api/what-if", json={"account_id": ACCOUNT_ID}).status_code == 200
+    FIT_CACHE.clear()
+    with client.websocket_connect("/api/what-if/ws") as websocket:
+        websocket.send_json({"account_id": ACCOUNT_ID})
+        assert len(websocket.receive_json()["channels"]) == 2
+
+    assert fitted_on_event_loop == [False] * 4
+
+
+def test_what_if_rejects_unknown_channels(monkeypatch):
+    _patch_analysis(monkeypatch, [])
+    client = _build_client()
+
+    response = client.post("/api/what-if", json={"account_id": ACCOUNT_ID, "spends": {"TikTok": 10.0}})
+
+    assert response.status_code == 400
+    assert "TikTok" in response.json()["detail"]
+
+
+def test_ingest_invalidation_drops_cached_fits(monkeypatch):
+    calls: list = []
+    _patch_analysis(monkeypatch, calls)
+    client = _build_client()
+
+    client.post("/api/what-if", json={"account_id": ACCOUNT_ID})
+    FIT_CACHE.invalidate(ACCOUNT_ID.upper())
+    client.post("/api/what-if", json={"account_id": ACCOUNT_ID})
+
+    assert len(calls) == 4
+
+
+def test_ingest_during_a_fit_keeps_its_results_out_of_the_cache(monkeypatch):
+    calls: list = []
+    _patch_analysis(monkeypatch, calls)
+    fit_and_ingest = analysis.fetch_daily_metrics
+
+    def fetch_daily_metrics(account_id, channel_name):
+        FIT_CACHE.invalidate(account_id)
+        return fit_and_ingest(account_id, channel_name)
+
+    monkeypatch.setattr(analysis, "fetch_daily_metrics", fetch_daily_metrics)
+    client = _build_client()
+
+    response = client.post("/api/what-if", json={"account_id": ACCOUNT_ID})
+
+    assert response.status_code == 200
+    assert len(response.json()["channels"]) == 2
+    assert FIT_CACHE.get_account(ACCOUNT_ID) is None
+
+
+def test_what_if_websocket_streams_evaluations(monkeypatch):
+    _patch_analysis(monkeypatch, [])
+    client = _build_client()
+
+    with client.websocket_connect("/api/what-if/ws") as websocket:
+        websocket.send_json({"account_id": ACCOUNT_ID, "target_cpa": 1.0, "spends": {"Search": 50.0}})
+        first = websocket.receive_json()
+        websocket.send_json({"account_id": ACCOUNT_ID, "spends": {"Nope": 1.0}})
+        error = websocket.receive_json()
+
+    assert {row["channel_name"]: row["spend"] for row in first["channels"]} == {"Search": 50.0, "Display": 100.0}
+    assert error["status_code"] == 400
+
+
+def test_what_if_websocket_requires_api_key_when_enabled(monkeypatch):
+    monkeypatch.setenv("REQUIRE_API_KEY", "true")
+    monkeypatch.setenv("APP_API_KEY", "test-secret")
+    config.get_settings.cache_clear()
+    client = _build_client()
+
+    with pytest.raises(WebSocketDisconnect):
+        with client.websocket_connect("/api/what-if/ws") as websocket:
+            websocket.receive_json()
+
+    _patch_analysis(monkeypatch, [])
+    with client.websocket_connect("/api/what-if/ws?api_key=test-secret") as websocket:
+        websocket.send_json({"account_id": ACCOUNT_ID})
+        assert len(websocket.receive_json()["channels"]) == 2
+
+
+def test_hot_path_evaluation_stays_in_single_digit_milliseconds():
+    from app.models.schemas import WhatIfRequest
+    from app.services.fit_cache import CachedChannelFit
+
+    cached = FIT_CACHE.put_account(
+        ACCOUNT_ID,
+        [
+            CachedChannelFit(channel_name=f"Entity {idx}", fit_result=FIT, prior_adstock_state=50.0, current_spend=100.0)
+            for idx in range(200)
+        ],
+    )
+    request = WhatIfRequest(account_id=ACCOUNT_ID, spends={"Entity 3": 250.0})
+
+    samples = []
+    for _ in range(50):
+        started = time.perf_counter()
+        what_if.evaluate_what_if(request, cached, increment=0.10)
+        samples.append(time.perf_counter() - started)
+
+    assert sorted(samples)[int(len(samples) * 0.99) - 1] < 0.01
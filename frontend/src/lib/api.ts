@@ -30,6 +30,8 @@ export interface CurvePointPayload {
   spend: number
   marginal_cpa: number
   zone: 'green' | 'yellow' | 'red'
+  marginal_cpa_lower?: number | null
+  marginal_cpa_upper?: number | null
 }
 
 export interface CurrentPointPayload {
@@ -43,6 +45,8 @@ export interface MarginalCpaResult {
   channel_name: string
   current_spend: number
   marginal_cpa: number | null
+  marginal_cpa_lower?: number | null
+  marginal_cpa_upper?: number | null
   target_cpa: number
   effective_target_cpa?: number
   target_source?: 'default' | 'override'
@@ -50,6 +54,9 @@ export interface MarginalCpaResult {
   recommendation: string
   data_quality_state?: DataQualityState
   data_quality_reason?: string | null
+  uncertainty_method?: 'covariance' | 'bootstrap' | null
+  bootstrap_samples?: number | null
+  bootstrap_timed_out?: boolean | null
   model_params: HillParameters | null
   curve_points?: CurvePointPayload[]
   current_point?: CurrentPointPayload | null
@@ -57,6 +64,11 @@ export interface MarginalCpaResult {
 
 export interface ChannelAnalysisResponse {
   channels: MarginalCpaResult[]
+  data_fingerprint?: string | null
+  computed_at?: string | null
+  age_seconds?: number | null
+  stale?: boolean
+  revalidating?: boolean
 }
 
 export interface DefaultAccountResponse {
@@ -90,6 +102,9 @@ export interface ScenarioChannelRecommendationPayload {
   spend_delta_percent: number
   current_marginal_cpa: number | null
   projected_marginal_cpa: number | null
+  current_conversions?: number | null
+  projected_conversions?: number | null
+  projected_cpa?: number | null
   traffic_light: 'green' | 'yellow' | 'red' | 'grey'
   locked: boolean
   data_quality_state?: DataQualityState
@@ -108,6 +123,11 @@ export interface ScenarioProjectedSummaryPayload {
   channels_maintain: number
   channels_locked: number
   channels_insufficient_data: number
+  current_conversions?: number | null
+  projected_conversions?: number | null
+  conversions_delta?: number | null
+  current_cpa?: number | null
+  projected_cpa?: number | null
 }
 
 export interface ScenarioRecommendationResponse {
@@ -165,26 +185,45 @@ export interface GoogleAdsSyncResponse {
   date_range: { start: string; end: string }
 }
 
+// Last analysis per request body, revalidated with If-None-Match. Browsers do
+// not cache POST responses, so the ETag round trip is done by hand here.
+const analysisCache = new Map<string, { etag: string; body: ChannelAnalysisResponse }>()
+
 export async function analyzeChannels(
   accountId: string,
   targetCpa: number = 50,
   targetCpaOverrides: TargetCpaOverridePayload[] = []
 ): Promise<ChannelAnalysisResponse> {
+  const body = JSON.stringify({
+    account_id: accountId,
+    target_cpa: targetCpa,
+    target_cpa_overrides: targetCpaOverrides,
+  })
+  const cached = analysisCache.get(body)
+  const headers = jsonHeaders()
+  if (cached) {
+    headers['If-None-Match'] = cached.etag
+  }
+
   const response = await fetch(`${API_URL}/api/analyze-channels`, {
     method: 'POST',
-    headers: jsonHeaders(),
-    body: JSON.stringify({
-      account_id: accountId,
-      target_cpa: targetCpa,
-      target_cpa_overrides: targetCpaOverrides,
-    }),
+    headers,
+    body,
   })
 
+  if (response.status === 304 && cached) {
+    return cached.body
+  }
   if (!response.ok) {
     throw new Error(`API error: ${response.status}`)
   }
 
-  return response.json()
+  const result: ChannelAnalysisResponse = await response.json()
+  const etag = response.headers.get('ETag')
+  if (etag) {
+    analysisCache.set(body, { etag, body: result })
+  }
+  return result
 }
 
 export async function getDefaultAccount(): Promise<DefaultAccountResponse> {
@@ -238,8 +277,10 @@ export async function saveScenario(
 }
 
 export async function listScenarios(accountId: string): Promise<ScenarioListResponse> {
+  // no-cache: the browser revalidates its copy with If-None-Match on every call.
   const response = await fetch(`${API_URL}/api/scenarios/${accountId}`, {
     headers: apiHeaders(),
+    cache: 'no-cache',
   })
 
   if (!response.ok) {